@@ -0,0 +1,64 @@
+import asyncio
+import contextlib
+import io
+
+from hex_flow_oracle.core.event_buffer import AsyncEventBuffer
+from hex_flow_oracle.core.rate_limiting import AdaptiveRateLimiter
+from hex_flow_oracle.events.address_lookup import AddressLookup
+from hex_flow_oracle.events.event_processor import EventProcessor
+from hex_flow_oracle.output.binary_format import PoolRecord
+from hex_flow_oracle.storage.pool_graph import PoolGraph
+
+from .bench_decode import TOKEN0, TOKEN1, V2_LOG, V3_LOG
+from .harness import benchmark
+
+@benchmark("rate_limiter_acquire")
+async def bench_rate_limiter_acquire():
+    """Lock, window sweep and monitor update on the allow path"""
+    # RateMonitor draws a tqdm bar on stderr
+    with contextlib.redirect_stderr(io.StringIO()):
+        limiter = AdaptiveRateLimiter(initial_rate=10**9, window_size=0.01)
+    monitor_task = next(t for t in asyncio.all_tasks() if t is not asyncio.current_task())
+
+    async def op():
+        await limiter.acquire()
+
+    async def cleanup():
+        monitor_task.cancel()
+        await asyncio.gather(monitor_task, return_exceptions=True)
+        with contextlib.redirect_stderr(io.StringIO()):
+            limiter.close()
+    op.cleanup = cleanup
+    return op
+
+@benchmark("event_buffer_roundtrip")
+async def bench_event_buffer_roundtrip():
+    buffer = AsyncEventBuffer(max_size=1000)
+
+    async def op():
+        await buffer.process_with_backpressure(V2_LOG)
+        buffer.get_nowait()
+    return op
+
+@benchmark("event_processor_batch")
+async def bench_event_processor_batch():
+    """Routing one batch of ten subscription frames to no-op handlers"""
+    async def noop(log):
+        pass
+    lookup = AddressLookup({(log["address"], log["topics"][0]): noop for log in (V2_LOG, V3_LOG)})
+    processor = EventProcessor(lookup)
+    batch = [{"params": {"result": log}} for log in (V2_LOG, V3_LOG) * 5]
+    return lambda: processor.process_batch(batch)
+
+@benchmark("pool_graph_paths_2hop")
+async def bench_pool_graph_paths_2hop():
+    """Routes from one token to WETH in a graph of 10k tokens paired with WETH and USDC"""
+    weth, usdc = bytes.fromhex(TOKEN0[-40:]), bytes.fromhex(TOKEN1[-40:])
+    graph = PoolGraph()
+    graph.add(PoolRecord(version=3, token0=usdc, token1=weth, pool=bytes(19) + b"\1", fee=500))
+    for n in range(1, 10_001):
+        token = n.to_bytes(20, "big")
+        for quote, pool in ((weth, 2 * n), (usdc, 2 * n + 1)):
+            graph.add(PoolRecord(version=2, token0=token, token1=quote, pool=(10**6 + pool).to_bytes(20, "big"), fee=3000))
+    source = (5000).to_bytes(20, "big")
+    return lambda: graph.paths(source, weth, max_hops=2)
@@ -0,0 +1,89 @@
+import json
+
+from hex_flow_oracle.events.factory_registry import FactoryRegistry, decode_v2_log, decode_v3_log
+from hex_flow_oracle.output.binary_format import PoolRecord
+from hex_flow_oracle.security.token_security import is_token_safe
+
+from .harness import benchmark
+
+TOKEN0 = "0x000000000000000000000000c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+TOKEN1 = "0x000000000000000000000000a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+
+V2_LOG = {
+    "address": "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f",
+    "topics": [
+        "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9",
+        TOKEN0,
+        TOKEN1,
+    ],
+    "data": "0x000000000000000000000000b4e16d0168e52d35cacd2c6185b44281ec28c9dc"
+            "0000000000000000000000000000000000000000000000000000000000000001",
+    "blockNumber": "0x1312d00",
+    "transactionHash": "0x" + "ab" * 32,
+    "logIndex": "0x3",
+}
+
+V3_LOG = {
+    "address": "0x1f98431c8ad98523631ae4a59f267346ea31f984",
+    "topics": [
+        "0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118",
+        TOKEN0,
+        TOKEN1,
+        "0x0000000000000000000000000000000000000000000000000000000000000bb8",
+    ],
+    "data": "0x000000000000000000000000000000000000000000000000000000000000003c"
+            "00000000000000000000000088e6a0c2ddd26feeb64f039a2c41296fcb3f5640",
+    "blockNumber": "0x1312d00",
+    "transactionHash": "0x" + "cd" * 32,
+    "logIndex": "0x7",
+}
+
+# A GoPlus response rendered the way check_token_security sees it
+SAFE_RESPONSE = str({
+    "code": 1,
+    "result": {
+        TOKEN0[-40:]: {
+            "is_honeypot": "0", "is_blacklisted": "0", "can_take_back_ownership": "0",
+            "cannot_buy": "0", "cannot_sell_all": "0", "personal_slippage_modifiable": "0",
+            "slippage_modifiable": "0", "sell_tax": "0", "buy_tax": "0", "is_airdrop_scam": "0",
+            "is_proxy": "0", "trading_cooldown": "0", "transfer_pausable": "0", "is_in_dex": "1",
+            "holder_count": "1520", "total_supply": "1000000000",
+        }
+    },
+})
+
+@benchmark("frame_decode")
+def bench_frame_decode():
+    """Subscription frame to handler, as the listener loop does it"""
+    frame = json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                        "params": {"subscription": "0x1", "result": V2_LOG}})
+    registry = FactoryRegistry.from_config({"uniswap_v2": ("v2", V2_LOG["address"])})
+
+    def op():
+        log = json.loads(frame)["params"]["result"]
+        registry.lookup(log).decode(log)
+    return op
+
+@benchmark("registry_lookup_64_factories")
+def bench_registry_lookup():
+    """(address, topic0) dispatch with 64 factories registered; should match a 2-factory table"""
+    factories = {f"fork_{i}": ("v2" if i % 2 else "v3", f"0x{i:040x}") for i in range(62)}
+    factories.update(uniswap_v2=("v2", V2_LOG["address"]), uniswap_v3=("v3", V3_LOG["address"]))
+    registry = FactoryRegistry.from_config(factories)
+    return lambda: registry.lookup(V3_LOG)
+
+@benchmark("decode_v2_log")
+def bench_decode_v2_log():
+    return lambda: decode_v2_log(V2_LOG)
+
+@benchmark("decode_v3_log")
+def bench_decode_v3_log():
+    return lambda: decode_v3_log(V3_LOG)
+
+@benchmark("is_token_safe")
+def bench_is_token_safe():
+    return lambda: is_token_safe(SAFE_RESPONSE)
+
+@benchmark("pool_record_encode")
+def bench_pool_record_encode():
+    return lambda: PoolRecord.from_log(V2_LOG, 2, True, True, chain_id=1, received_ns=0).encode()
@@ -0,0 +1,52 @@
+import numpy as np
+
+from price_utils import batch_price_impact, calculate_optimal_amounts, calculate_price_impact
+from v3_math import PoolState, batch_swap, get_sqrt_ratio_at_tick, pack_pools, simulate_swap
+
+from .harness import benchmark
+
+RESERVES = np.array([5_000.0, 10_000_000.0])
+
+@benchmark("price_impact")
+def bench_price_impact():
+    amounts = np.array([10.0, 20_000.0])
+    return lambda: calculate_price_impact(amounts, RESERVES)
+
+@benchmark("optimal_amounts")
+def bench_optimal_amounts():
+    return lambda: calculate_optimal_amounts(2_000.0, RESERVES, 1.0)
+
+@benchmark("batch_price_impact_1000x8")
+def bench_batch_price_impact():
+    """1000 new pools scored across 8 trade sizes in one pass"""
+    rng = np.random.default_rng(0)
+    reserves = rng.uniform(1e3, 1e7, size=(1000, 2))
+    amounts = np.logspace(0, 5, 8)
+    batch_price_impact(reserves, amounts)
+    return lambda: batch_price_impact(reserves, amounts)
+
+def _v3_pools(count):
+    liquidity = 10**18
+    return [
+        PoolState(
+            sqrt_price_x96=get_sqrt_ratio_at_tick(i % 60),
+            tick=i % 60,
+            liquidity=2 * liquidity,
+            fee=3000,
+            ticks=[(-600, liquidity), (-120, liquidity), (120, -liquidity), (600, -liquidity)]
+        )
+        for i in range(count)
+    ]
+
+@benchmark("v3_simulate_swap_exact")
+def bench_v3_simulate_swap():
+    """Exact integer swap crossing one initialized tick"""
+    pool = _v3_pools(1)[0]
+    return lambda: simulate_swap(pool, 10**16, True)
+
+@benchmark("v3_batch_swap_1000x8")
+def bench_v3_batch_swap():
+    packed = pack_pools(_v3_pools(1000))
+    amounts = np.logspace(12, 17, 8)
+    batch_swap(packed, amounts)
+    return lambda: batch_swap(packed, amounts)
@@ -0,0 +1,38 @@
+from time import time
+
+from hex_flow_oracle.core.address import to_address
+from hex_flow_oracle.security.security_cache import SecurityCache
+
+from .harness import benchmark
+
+TOKENS = [
+    "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+    "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
+    "0xdAC17F958D2ee523a2206206994597C13D831ec7",
+    "0x6B175474E89094C44Da98b954EedeAC495271d0F",
+    "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599",
+]
+
+def _warm_cache(size=1000):
+    cache = SecurityCache(max_size=size)
+    now = time()
+    cache.cache = {to_address(f"0x{i:040x}"): (True, now) for i in range(size)}
+    cache.cache.update({to_address(token): (True, now) for token in TOKENS})
+    return cache
+
+@benchmark("security_cache_hit")
+def bench_security_cache_hit():
+    cache = _warm_cache()
+    token = to_address(TOKENS[0])
+    return lambda: cache.get_or_check(token)
+
+@benchmark("security_cache_batch_hit")
+def bench_security_cache_batch_hit():
+    cache = _warm_cache()
+    return lambda: cache.batch_check(TOKENS)
+
+@benchmark("security_cache_cleanup")
+def bench_security_cache_cleanup():
+    """Expiry sweep over a full cache with nothing to evict"""
+    cache = _warm_cache()
+    return cache.cleanup
@@ -0,0 +1,72 @@
+import inspect
+import json
+import time
+
+# name -> setup function returning the operation to time (sync or async callable)
+BENCHMARKS = {}
+
+DEFAULT_THRESHOLD_PERCENT = 25.0
+
+def benchmark(name):
+    """Register a benchmark; the decorated setup may itself be async"""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+async def _time(op, is_async, iterations):
+    if is_async:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await op()
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        op()
+    return time.perf_counter() - start
+
+async def measure(setup, min_time=0.1, repeats=5):
+    """Best-of-``repeats`` nanoseconds per operation"""
+    op = setup()
+    if inspect.isawaitable(op):
+        op = await op
+    cleanup = getattr(op, "cleanup", None)
+    try:
+        # Lambdas wrapping a coroutine call are async too
+        probe = op()
+        is_async = inspect.isawaitable(probe)
+        if is_async:
+            await probe
+        # Warm up (numba compilation, caches) and calibrate the iteration count
+        iterations = 1
+        while await _time(op, is_async, iterations) < min_time and iterations < 1 << 24:
+            iterations *= 4
+        timings = [await _time(op, is_async, iterations) for _ in range(repeats)]
+    finally:
+        if cleanup:
+            await cleanup()
+    return min(timings) / iterations * 1e9
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"threshold_percent": DEFAULT_THRESHOLD_PERCENT, "results": {}}
+
+def save_baseline(path, results, threshold_percent):
+    with open(path, "w") as f:
+        json.dump({
+            "threshold_percent": threshold_percent,
+            "results": {name: round(ns, 1) for name, ns in sorted(results.items())},
+        }, f, indent=2)
+        f.write("\n")
+
+def compare(results, baseline, threshold_percent):
+    """Rows of (name, ns/op, baseline ns/op, change %, regressed)"""
+    rows = []
+    for name, ns in results.items():
+        base = baseline.get(name)
+        change = (ns / base - 1) * 100 if base else None
+        rows.append((name, ns, base, change, change is not None and change > threshold_percent))
+    return rows
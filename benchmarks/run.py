@@ -0,0 +1,67 @@
+"""Run the micro-benchmarks and compare them against benchmarks/baseline.json.
+
+    python -m benchmarks.run                    # compare, exit 1 on regression
+    python -m benchmarks.run --save-baseline    # record this machine's numbers
+    python -m benchmarks.run --filter security  # only matching benchmarks
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import pkgutil
+import sys
+
+from .harness import BENCHMARKS, compare, load_baseline, measure, save_baseline
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def load_benchmarks():
+    package = os.path.dirname(__file__)
+    for module in pkgutil.iter_modules([package]):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"{__package__}.{module.name}")
+
+async def run_all(names, min_time):
+    results = {}
+    for name in names:
+        results[name] = await measure(BENCHMARKS[name], min_time=min_time)
+        print(f"  {name:<28} {results[name]:>12.1f} ns/op", file=sys.stderr)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="hex-flow-oracle micro-benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--threshold", type=float, help="Allowed slowdown in percent (default: from baseline)")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Seconds per timing repeat")
+    args = parser.parse_args(argv)
+
+    load_benchmarks()
+    names = sorted(name for name in BENCHMARKS if args.filter in name)
+    baseline = load_baseline(args.baseline)
+    threshold = args.threshold if args.threshold is not None else baseline["threshold_percent"]
+
+    print(f"Running {len(names)} benchmarks", file=sys.stderr)
+    results = asyncio.run(run_all(names, args.min_time))
+
+    if args.save_baseline:
+        merged = dict(baseline["results"], **results)
+        save_baseline(args.baseline, merged, threshold)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    regressions = 0
+    print(f"\n{'benchmark':<28} {'ns/op':>12} {'baseline':>12} {'change':>9}")
+    for name, ns, base, change, regressed in compare(results, baseline["results"], threshold):
+        base_text = f"{base:.1f}" if base else "-"
+        change_text = f"{change:+.1f}%" if change is not None else "new"
+        print(f"{name:<28} {ns:>12.1f} {base_text:>12} {change_text:>9}{'  REGRESSION' if regressed else ''}")
+        regressions += regressed
+    if regressions:
+        print(f"\n{regressions} benchmark(s) slower than baseline by more than {threshold:g}%")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
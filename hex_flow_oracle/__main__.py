@@ -1,5 +1,5 @@
-import asyncio
-from .main import main
+from .main import cli
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    cli()
+ 
\ No newline at end of file
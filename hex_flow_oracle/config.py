@@ -1,5 +1,3 @@
-from web3 import Web3
-
 quicknode_ws_url = "wss://frequent-broken-smoke.quiknode.pro/9eb6428ae8ecb819e78a6ab9596f4ddce0b145c9"
 
 # Factory Addresses - Ethereum Mainnet
@@ -26,12 +24,223 @@ FACTORY_ADDRESSES = {
     }
 }
 
-# Set active factory addresses based on network
-uniswap_v2_factory_address = Web3.to_checksum_address(FACTORY_ADDRESSES[NETWORK]["v2"])
-uniswap_v3_factory_address = Web3.to_checksum_address(FACTORY_ADDRESSES[NETWORK]["v3"])
+# Chain IDs stamped into binary output records
+CHAIN_IDS = {
+    "mainnet": 1,
+    "goerli": 5,
+    "arbitrum": 42161,
+    "optimism": 10,
+    "polygon": 137
+}
+CHAIN_ID = CHAIN_IDS[NETWORK]
+
+# Set active factory addresses based on network. FACTORY_ADDRESSES are stored
+# checksummed, so no web3 import is needed here; networks without a V2
+# deployment get None.
+uniswap_v2_factory_address = FACTORY_ADDRESSES[NETWORK].get("v2")
+uniswap_v3_factory_address = FACTORY_ADDRESSES[NETWORK].get("v3")
+
+# Forks emitting the same PairCreated ("v2") / PoolCreated ("v3") events as Uniswap
+FORK_FACTORIES = {
+    "mainnet": {
+        "sushiswap_v2": ("v2", "0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac"),
+        "pancakeswap_v2": ("v2", "0x1097053Fd2ea711dad45caCcc45EfF7548fCB362"),
+        "pancakeswap_v3": ("v3", "0x0BFbCF9fa4f9C56B0F40a671Ad40E0805A091865"),
+    },
+}
+
+# Every factory watched on NETWORK as name -> (kind, address). The kind selects
+# the creation event and decoder (events/factory_registry.py); all factories are
+# covered by one log subscription per SUBSCRIPTION_MAX_ADDRESSES addresses.
+FACTORIES = dict(
+    {f"uniswap_{kind}": (kind, address) for kind, address in FACTORY_ADDRESSES[NETWORK].items()},
+    **FORK_FACTORIES.get(NETWORK, {})
+)
+SUBSCRIPTION_MAX_ADDRESSES = 1000
 
 # Event Topics (same across all networks)
 v2_pair_created_topic = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
-v3_pool_created_topic = "0x783cca1c0412dd0d695e784568c96da2087fba7ca78f2288a3f1f3100f367fc8"
+v3_pool_created_topic = "0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118"
+
+CLEAN_MODE = False  # Set to True for clean mode, False for normal mode
+
+# Output format: "text" for human-readable lines, "binary" for length-prefixed
+# records on stdout (see hex_flow_oracle/output/binary_format.py for the layout).
+# In CLEAN_MODE only approved pools are written; otherwise every pool is written
+# with its verdict flags set.
+OUTPUT_FORMAT = "text"
+
+# Local fan-out server pushing approved pools to many subscribers as binary records.
+# Set FANOUT_SOCKET_PATH to None to listen on FANOUT_HOST:FANOUT_PORT instead.
+FANOUT_ENABLED = False
+FANOUT_SOCKET_PATH = "/tmp/hex-flow-oracle.sock"
+FANOUT_HOST = "127.0.0.1"
+FANOUT_PORT = 8765
+FANOUT_QUEUE_SIZE = 1000  # Per-subscriber queue bound
+FANOUT_SLOW_CONSUMER_POLICY = "drop"  # "drop" or "disconnect"
+
+# Append-only journal of every decoded pool and its verdict, queried with
+# hex_flow_oracle.storage.pool_journal.JournalReader. It also checkpoints the
+# lowest block still being handled, which the listener backfills from after a
+# restart or reconnect, in eth_getLogs requests of JOURNAL_BACKFILL_BLOCKS blocks
+# so a long outage stays within provider range and result limits.
+JOURNAL_ENABLED = False
+JOURNAL_DIR = "journal"
+JOURNAL_SEGMENT_RECORDS = 100_000  # Records per segment file
+JOURNAL_FSYNC = False  # fsync after every append (slower, survives power loss)
+JOURNAL_BACKFILL_BLOCKS = 1000
+
+# In-memory index of every pool seen, served as a local HTTP query API
+# (GET /pools?token=0x...&fee=3000, see hex_flow_oracle/storage/pool_index.py)
+POOL_INDEX_ENABLED = False
+POOL_INDEX_HOST = "127.0.0.1"
+POOL_INDEX_PORT = 8766
+# Also keep a token graph (tokens as nodes, pools as edges) and serve routes
+# between two tokens (GET /paths?from=0x...&to=0x...&max_hops=2)
+POOL_GRAPH_ENABLED = True
+# Pools one /paths query may examine; 3-hop routes through hub tokens reach this
+POOL_GRAPH_MAX_VISITS = 100_000
+
+# Columnar export of every decoded pool and verdict for analytics (requires pyarrow)
+EXPORT_ENABLED = False
+EXPORT_DIR = "exports"
+EXPORT_FORMAT = "parquet"  # "parquet" or "arrow" (Arrow IPC)
+EXPORT_ROW_GROUP_SIZE = 10_000
+EXPORT_ROTATE_ROWS = 1_000_000
+# Files are closed this long after their first row; rows not yet in a full row
+# group are held in memory until then, so this also bounds what a crash loses
+EXPORT_ROTATE_SECONDS = 3600.0
+
+# Logging: records are queued to a background thread and written to a rotating file
+LOG_LEVEL = "INFO"
+LOG_DIR = "logs"
+LOG_FILE = "hex_flow_oracle.log"
+LOG_FORMAT = "json"  # "json" for structured lines, "text" for the classic format
+LOG_MAX_BYTES = 50 * 1024 * 1024  # Rotate once the file reaches this size...
+LOG_ROTATE_SECONDS = 24 * 3600  # ...or this age, whichever comes first
+LOG_BACKUP_COUNT = 14  # Rotated files to keep
+
+# Prometheus metrics endpoint (GET /metrics): per-stage latency quantiles,
+# buffer/cache/limiter gauges and GoPlus request and error counters
+METRICS_ENABLED = False
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
 
-CLEAN_MODE = False  # Set to True for clean mode, False for normal mode 
\ No newline at end of file
+# End-to-end tracing of each pool event (receive, decode, security lookups, emit).
+# Slow traces are always kept, others sampled; `kill -USR1 <pid>` dumps the ring
+# buffer to TRACE_DUMP_PATH, and TRACE_STREAM_PATH streams every kept trace.
+TRACE_ENABLED = False
+TRACE_BUFFER_SIZE = 1000
+TRACE_SAMPLE_RATE = 0.01
+TRACE_SLOW_THRESHOLD_MS = 500.0
+TRACE_STREAM_PATH = None
+TRACE_DUMP_PATH = "traces.jsonl"
+
+# Buffer between the websocket reader and the handlers. Reading pauses once the
+# buffer is EVENT_BUFFER_HIGH_WATERMARK full and resumes at the low watermark.
+# Policies: "block" (the reader waits for space, nothing is lost), or the opt-in
+# "drop_oldest", "drop_newest" and "coalesce" (duplicate logs with the same
+# transaction hash and log index replace each other; drops the oldest when full).
+EVENT_BUFFER_SIZE = 1000
+EVENT_BUFFER_POLICY = "block"
+EVENT_BUFFER_HIGH_WATERMARK = 0.8
+EVENT_BUFFER_LOW_WATERMARK = 0.2
+# Events are handled concurrently, at most EVENT_CONCURRENCY at a time; the rest
+# wait in the buffer. The number in flight backs off to no less than half of
+# EVENT_CONCURRENCY only while handler time (not queue wait) is above
+# EVENT_TARGET_LATENCY seconds and well above its uncongested level.
+EVENT_CONCURRENCY = 16
+EVENT_TARGET_LATENCY = 1.0
+
+# Decode websocket frames in SHARD_WORKERS worker processes, keeping the event
+# loop for socket I/O. Frames are partitioned by "token" (token0 hash), or by
+# "chain", which sends everything from a single-chain deployment to one worker,
+# and are exchanged through shared-memory slots of SHARD_SLOT_SIZE bytes.
+SHARDING_ENABLED = False
+SHARD_WORKERS = 2
+SHARD_PARTITION = "token"
+SHARD_SLOTS = 64  # In-flight frames per worker
+SHARD_SLOT_SIZE = 1 << 20  # Larger frames (e.g. big backfills) are decoded in-process
+
+# Run the provider websocket on its own event loop in a separate thread, so
+# handler CPU spikes cannot delay recv() or keep-alive pings. Events cross to
+# the processing loop through a thread-safe handoff (latency in /metrics).
+NETWORK_THREAD_ENABLED = False
+
+# Use uvloop for the event loops when it is installed (pip install hex-flow-oracle[fast])
+USE_UVLOOP = True
+
+# Token security verdicts are cached per token for SECURITY_CACHE_TTL seconds,
+# keeping at most SECURITY_CACHE_SIZE tokens. Failed lookups are not cached.
+SECURITY_CACHE_TTL = 3600
+SECURITY_CACHE_SIZE = 1000
+
+# Startup: connecting, subscribing, security cache warming and factory validation
+# run concurrently. Successful factory validations are cached in
+# VALIDATION_CACHE_PATH, keyed by chain, address and code hash, so a restart
+# only re-reads each factory's code instead of repeating the probe calls.
+RPC_HTTP_URL = quicknode_ws_url.replace("wss://", "https://")
+VALIDATE_FACTORIES = True
+VALIDATION_CACHE_PATH = ".cache/factory_validation.json"
+# Base tokens whose verdicts are fetched at startup, before the first pool needs them
+WARM_TOKENS = {
+    "mainnet": [
+        "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",  # WETH
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",  # USDC
+        "0xdAC17F958D2ee523a2206206994597C13D831ec7",  # USDT
+        "0x6B175474E89094C44Da98b954EedeAC495271d0F",  # DAI
+    ],
+}
+STARTUP_WARM_TOKENS = WARM_TOKENS.get(NETWORK, [])
+
+# Read token metadata (name, symbol, decimals, total supply) and pool state
+# (V2 reserves, V3 slot0/liquidity) for each approved pool through Multicall3.
+# Pools detected within ENRICHMENT_WINDOW seconds share one RPC round-trip;
+# results are logged as JSON.
+ENRICHMENT_ENABLED = False
+ENRICHMENT_WINDOW = 0.05
+ENRICHMENT_APPROVED_ONLY = True
+MULTICALL_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"  # Multicall3, same on all chains
+
+# Follow Mint/Burn/Sync/Swap logs of each approved pool for WATCHLIST_WINDOW
+# seconds after detection, to catch initial liquidity and early rugs. Pools are
+# split across up to WATCHLIST_MAX_CONNECTIONS subscriptions of at most
+# WATCHLIST_ADDRESSES_PER_CONNECTION addresses, and each subscription's filter
+# is replaced at most once per WATCHLIST_UPDATE_INTERVAL seconds.
+WATCHLIST_ENABLED = False
+WATCHLIST_WINDOW = 3600.0
+WATCHLIST_ADDRESSES_PER_CONNECTION = 1000
+WATCHLIST_MAX_CONNECTIONS = 4
+WATCHLIST_UPDATE_INTERVAL = 2.0
+WATCHLIST_RUG_DROP = 0.9  # Flag a pool once this fraction of its peak liquidity is gone
+
+# Mempool mode: follow newPendingTransactions for createPair/createPool calls
+# to the factories and start the security checks of both tokens before the
+# pool is mined. The PairCreated/PoolCreated log is then matched to its pending
+# transaction (lead time in /metrics). Entries never mined are dropped after
+# MEMPOOL_PENDING_TTL seconds. Needs a provider that exposes the mempool.
+MEMPOOL_ENABLED = False
+MEMPOOL_PENDING_TTL = 300.0
+MEMPOOL_MAX_PENDING = 10_000
+
+# Honeypot simulation: buy and sell each new token through a V2 router with
+# eth_call, as a synthetic account funded by state overrides, and measure the
+# buy/sell tax and whether it can be sold at all. Runs alongside GoPlus: a
+# failed simulation rejects the token, and a passed one stands in for GoPlus
+# while GoPlus has no data for the token yet. Tokens checked within
+# HONEYPOT_SIMULATION_WINDOW seconds are simulated in one batch. Needs an RPC
+# provider that supports eth_call state overrides (geth, erigon, reth, most hosted).
+HONEYPOT_SIMULATION_ENABLED = False
+HONEYPOT_SIMULATION_AMOUNT = 10**17  # Wei spent on the simulated buy
+HONEYPOT_SIMULATION_WINDOW = 0.05
+HONEYPOT_MAX_TAX = 0.0  # Same bar as the GoPlus buy_tax/sell_tax criteria
+HONEYPOT_ROUTERS = {
+    "mainnet": {
+        "router": "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D",  # Uniswap V2 Router02
+        "weth": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+    },
+    "polygon": {
+        "router": "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff",  # QuickSwap
+        "weth": "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"  # WMATIC
+    }
+}
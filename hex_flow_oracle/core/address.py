@@ -0,0 +1,68 @@
+from typing import Dict, Union
+
+class Address(bytes):
+    """Canonical 20-byte address.
+
+    Instances are interned, so every spelling of an address (mixed case,
+    checksummed, 32-byte topic, raw bytes) resolves to the same object. Being
+    bytes, an Address hashes and compares equal to its raw 20 bytes, packs
+    straight into binary records and is a cheap dict key. ``str()`` gives the
+    lowercase hex form; the EIP-55 checksum form is computed once on demand.
+    """
+    __slots__ = ()
+
+    def __new__(cls, value: Union[str, bytes]) -> "Address":
+        return to_address(value)
+
+    def __str__(self) -> str:
+        return "0x" + self.hex()
+
+    def __repr__(self) -> str:
+        return f"Address({str(self)!r})"
+
+    @property
+    def checksum(self) -> str:
+        cached = _checksums.get(self)
+        if cached is None:
+            cached = _checksums[self] = _to_checksum(self.hex())
+        return cached
+
+# Raw 20 bytes -> interned Address; addresses seen by the oracle only grow by
+# the number of distinct tokens and pools, so entries are never evicted
+_interned: Dict[bytes, Address] = {}
+# String spellings seen so far -> Address, to skip hex parsing on repeats
+_by_string: Dict[str, Address] = {}
+_checksums: Dict[bytes, str] = {}
+
+_MAX_STRING_CACHE = 100_000
+
+def _intern(raw: bytes) -> Address:
+    address = _interned.get(raw)
+    if address is None:
+        if len(raw) != 20:
+            raise ValueError(f"Address must be 20 bytes, got {len(raw)}")
+        address = _interned[raw] = bytes.__new__(Address, raw)
+    return address
+
+def _to_checksum(hex_lower: str) -> str:
+    from eth_hash.auto import keccak  # Deferred: pulls in a hashing backend
+    digest = keccak(hex_lower.encode()).hex()
+    return "0x" + "".join(
+        char.upper() if int(nibble, 16) >= 8 else char
+        for char, nibble in zip(hex_lower, digest)
+    )
+
+def to_address(value: Union[str, bytes, "Address"]) -> Address:
+    """Intern an address given as a hex string (with or without 0x, any case,
+    or a 32-byte left-padded topic) or as raw bytes"""
+    if type(value) is Address:
+        return value
+    if isinstance(value, str):
+        address = _by_string.get(value)
+        if address is None:
+            digits = value[2:] if value[:2] in ("0x", "0X") else value
+            address = _intern(bytes.fromhex(digits[-40:] if len(digits) == 64 else digits))
+            if len(_by_string) < _MAX_STRING_CACHE:
+                _by_string[value] = address
+        return address
+    return _intern(bytes(value))
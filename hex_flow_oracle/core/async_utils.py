@@ -28,4 +28,27 @@ class AsyncRetryContext:
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if exc is not None and self._local.attempt < self.max_retries and self.should_retry(exc): 
\ No newline at end of file
+        if exc is not None and self._local.attempt < self.max_retries and self.should_retry(exc): 
+            self._local.attempt += 1
+            delay = self.backoff_base ** self._local.attempt
+            await asyncio.sleep(delay)
+            return True
+        return False
+
+class WeakCache(Generic[T]):
+    """Advanced caching system using weak references"""
+    def __init__(self):
+        self._cache = weakref.WeakValueDictionary()
+        self._pending = weakref.WeakSet()
+        self._lock = Lock()
+
+    async def get_or_create(self, key: str, factory: Callable[[], Any]) -> T:
+        """Get item from cache or create using factory lambda"""
+        async with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+            result = await factory()
+            self._cache[key] = result
+            self._pending.add(result)
+            return result
@@ -0,0 +1,62 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Type, TypeVar, Generic
+
+T = TypeVar('T')
+
+class DIContainer(Generic[T]):
+    """Dependency injection container with async factories.
+
+    A factory is a class or any callable, sync or async. Singletons resolved
+    concurrently are instantiated once; other callers wait for that instance.
+    """
+    def __init__(self):
+        self._services: Dict[Type[T], T] = {}
+        self._factories: Dict[Type[T], Callable[[], Any]] = {}
+        self._singletons = set()
+        self._pending: Dict[Type[T], asyncio.Future] = {}
+
+    def register(self, interface: Type[T], implementation: Callable[[], Any], singleton: bool = True):
+        if singleton:
+            self._singletons.add(interface)
+        self._factories[interface] = implementation
+
+    def register_instance(self, interface: Type[T], instance: T):
+        self._singletons.add(interface)
+        self._services[interface] = instance
+
+    def __contains__(self, interface) -> bool:
+        return interface in self._services or interface in self._factories
+
+    def get(self, interface: Type[T], default=None):
+        """An already resolved singleton, without instantiating it"""
+        return self._services.get(interface, default)
+
+    async def _instantiate(self, impl: Callable[[], Any]) -> T:
+        instance = impl()
+        if inspect.isawaitable(instance):
+            instance = await instance
+        return instance
+
+    async def resolve(self, interface: Type[T]) -> T:
+        if interface in self._services:
+            return self._services[interface]
+        if interface not in self._singletons:
+            return await self._instantiate(self._factories[interface])
+
+        pending = self._pending.get(interface)
+        if pending is None:
+            pending = self._pending[interface] = asyncio.ensure_future(
+                self._instantiate(self._factories[interface])
+            )
+        try:
+            instance = await asyncio.shield(pending)
+        finally:
+            if pending.done():
+                self._pending.pop(interface, None)
+        self._services[interface] = instance
+        return instance
+
+    async def resolve_all(self, *interfaces: Type[T]) -> list:
+        """Resolve several services concurrently"""
+        return await asyncio.gather(*(self.resolve(interface) for interface in interfaces))
@@ -1,30 +1,242 @@
-from asyncio import Queue, Event, CancelledError, sleep
+from asyncio import CancelledError, get_running_loop, wait_for, TimeoutError as AsyncTimeoutError
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Hashable, List, Optional
+
+class OverflowPolicy(Enum):
+    BLOCK = "block"              # Producers wait for space
+    DROP_OLDEST = "drop_oldest"  # Evict the oldest buffered event to make room
+    DROP_NEWEST = "drop_newest"  # Discard the incoming event
+    COALESCE = "coalesce"        # Replace a buffered event with the same key; drop oldest otherwise
 
 class AsyncEventBuffer:
-    """Buffered async iterator for event processing"""
-    def __init__(self, max_size=1000):
-        self.buffer = Queue(maxsize=max_size)
-        self._done = Event()
-        self._background_tasks = set()
+    """Bounded ring buffer of events with overflow policies, watermarks and bulk draining.
+
+    ``on_high_watermark`` fires once occupancy reaches ``high_watermark`` and
+    ``on_low_watermark`` once it falls back to ``low_watermark``, so upstream
+    readers can pause instead of the buffer stalling or dropping.
+    """
+    def __init__(
+        self,
+        max_size=1000,
+        policy=OverflowPolicy.BLOCK,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        high_watermark=0.8,
+        low_watermark=0.2,
+        on_high_watermark: Optional[Callable[[], None]] = None,
+        on_low_watermark: Optional[Callable[[], None]] = None
+    ):
+        self.max_size = max_size
+        self.policy = OverflowPolicy(policy)
+        if self.policy is OverflowPolicy.COALESCE and key is None:
+            raise ValueError("COALESCE policy needs a key function")
+        self.key = key
+        self.high_watermark = max(1, int(max_size * high_watermark))
+        self.low_watermark = int(max_size * low_watermark)
+        self.on_high_watermark = on_high_watermark
+        self.on_low_watermark = on_low_watermark
+        self.above_high_watermark = False
+
+        self._slots = [None] * max_size
+        self._keys = [None] * max_size
+        self._head = 0
+        self._count = 0
+        # Key -> absolute sequence number of its slot, for COALESCE
+        self._positions = {}
+        self._popped = 0
+        self._getters = deque()
+        self._putters = deque()
+        self._closed = False
+
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return self._count
+
+    def qsize(self) -> int:
+        return self._count
+
+    def full(self) -> bool:
+        return self._count >= self.max_size
+
+    def empty(self) -> bool:
+        return self._count == 0
+
+    @property
+    def occupancy(self) -> float:
+        return self._count / self.max_size
+
+    @property
+    def dropped(self) -> int:
+        return self.dropped_oldest + self.dropped_newest
+
+    def stats(self) -> dict:
+        return {
+            "size": self._count,
+            "capacity": self.max_size,
+            "occupancy": self.occupancy,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "coalesced": self.coalesced,
+        }
+
+    @staticmethod
+    def _wake(waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _append(self, event, key):
+        count = self._count
+        index = self._head + count
+        if index >= self.max_size:
+            index -= self.max_size
+        self._slots[index] = event
+        if key is not None:
+            self._keys[index] = key
+            self._positions[key] = self._popped + count
+        self._count = count = count + 1
+        self.enqueued += 1
+        if count >= self.high_watermark and not self.above_high_watermark:
+            self.above_high_watermark = True
+            if self.on_high_watermark:
+                self.on_high_watermark()
+        if self._getters:
+            self._wake(self._getters)
+
+    def _pop(self):
+        index = self._head
+        event = self._slots[index]
+        self._slots[index] = None
+        key = self._keys[index]
+        if key is not None:
+            self._keys[index] = None
+            if self._positions.get(key) == self._popped:
+                del self._positions[key]
+        index += 1
+        self._head = 0 if index == self.max_size else index
+        self._count -= 1
+        self._popped += 1
+        return event
+
+    def _after_pop(self):
+        if self.above_high_watermark and self._count <= self.low_watermark:
+            self.above_high_watermark = False
+            if self.on_low_watermark:
+                self.on_low_watermark()
+        if self._putters:
+            self._wake(self._putters)
+
+    def put_nowait(self, event) -> bool:
+        """Add an event without waiting; returns False if it was dropped.
+
+        Under BLOCK a full buffer rejects the event, as the caller chose not to wait.
+        """
+        if self._closed:
+            raise RuntimeError("AsyncEventBuffer is closed")
+        key = None
+        if self.policy is OverflowPolicy.COALESCE:
+            key = self.key(event)
+            position = self._positions.get(key)
+            if position is not None:
+                self._slots[(self._head + position - self._popped) % self.max_size] = event
+                self.coalesced += 1
+                return True
+        if self._count >= self.max_size:
+            if self.policy in (OverflowPolicy.DROP_OLDEST, OverflowPolicy.COALESCE):
+                self._pop()
+                self.dropped_oldest += 1
+            else:
+                self.dropped_newest += 1
+                return False
+        self._append(event, key)
+        return True
+
+    async def put(self, event) -> bool:
+        """Add an event, waiting for space under the BLOCK policy"""
+        if self._count >= self.max_size and self.policy is OverflowPolicy.BLOCK:
+            while self._count >= self.max_size and not self._closed:
+                waiter = get_running_loop().create_future()
+                self._putters.append(waiter)
+                try:
+                    await waiter
+                except CancelledError:
+                    waiter.cancel()
+                    # Pass the wakeup on if space freed up while we were cancelled
+                    if self._count < self.max_size:
+                        self._wake(self._putters)
+                    raise
+        return self.put_nowait(event)
+
+    async def process_with_backpressure(self, event) -> bool:
+        return await self.put(event)
+
+    def get_nowait(self):
+        if not self._count:
+            raise IndexError("AsyncEventBuffer is empty")
+        event = self._pop()
+        self.dequeued += 1
+        self._after_pop()
+        return event
+
+    async def _wait_for_event(self):
+        while not self._count:
+            if self._closed:
+                raise StopAsyncIteration
+            waiter = get_running_loop().create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            except CancelledError:
+                waiter.cancel()
+                if self._count:
+                    self._wake(self._getters)
+                raise
+
+    async def get(self):
+        await self._wait_for_event()
+        return self.get_nowait()
+
+    async def get_many(self, n: int, timeout: Optional[float] = None) -> List[Any]:
+        """Wait up to ``timeout`` for at least one event, then drain up to ``n`` at once.
+
+        Returns an empty list on timeout or once the buffer is closed and drained.
+        """
+        try:
+            if timeout is None:
+                await self._wait_for_event()
+            else:
+                await wait_for(self._wait_for_event(), timeout)
+        except (AsyncTimeoutError, StopAsyncIteration):
+            return []
+        events = []
+        for _ in range(min(n, self._count)):
+            events.append(self._pop())
+        self.dequeued += len(events)
+        self._after_pop()
+        for _ in range(len(events) - 1):
+            self._wake(self._putters)
+        return events
+
+    def close(self):
+        """Stop accepting events; consumers drain what is left, then iteration stops"""
+        self._closed = True
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
 
     def __aiter__(self):
         return self
 
     async def __anext__(self):
-        try:
-            return await self.buffer.get()
-        except CancelledError:
-            if not self._done.is_set():
-                raise
-            raise StopAsyncIteration
-
-    async def process_with_backpressure(self, event):
-        if self.buffer.full():
-            await self.apply_backpressure()
-        await self.buffer.put(event)
-
-    async def apply_backpressure(self):
-        buffer_size = self.buffer.qsize()
-        if buffer_size > self.buffer.maxsize * 0.9:
-            delay = (buffer_size / self.buffer.maxsize) ** 2
-            await sleep(delay) 
\ No newline at end of file
+        return await self.get()
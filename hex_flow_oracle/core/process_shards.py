@@ -0,0 +1,203 @@
+"""Process-pool sharding for CPU-bound pipeline stages.
+
+A stage is a plain ``bytes -> bytes`` function named by ``"module:function"``.
+Each worker process owns a shared-memory block split into fixed-size slots:
+the event loop copies a payload into a free slot and sends only the slot
+number and length down a pipe; the worker runs the stage, writes its output
+back into the same slot and replies with the slot number and output length.
+Nothing is pickled on the hot path.
+"""
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import struct
+import zlib
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional
+
+_MESSAGE = struct.Struct("<Ii")  # slot, payload/output length or status
+
+STATUS_FAILED = -1      # The stage raised
+STATUS_TOO_LARGE = -2   # Output did not fit the slot
+
+def load_stage(path: str) -> Callable[[bytes], bytes]:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which would unlink it when this worker exits
+        memory = SharedMemory(name=name)
+        resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+def _worker_main(stage_path, memory_name, slot_size, conn):
+    stage = load_stage(stage_path)
+    memory = _attach(memory_name)
+    buf = memory.buf
+    try:
+        while True:
+            message = conn.recv_bytes()
+            if not message:
+                break
+            slot, length = _MESSAGE.unpack(message)
+            offset = slot * slot_size
+            try:
+                output = stage(bytes(buf[offset:offset + length]))
+                status = len(output)
+                if status > slot_size:
+                    status = STATUS_TOO_LARGE
+                else:
+                    buf[offset:offset + status] = output
+            except Exception:
+                status = STATUS_FAILED
+            conn.send_bytes(_MESSAGE.pack(slot, status))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del buf
+        memory.close()
+
+class _Shard:
+    def __init__(self, index, context, stage_path, slots, slot_size):
+        self.index = index
+        self.slot_size = slot_size
+        self.memory = SharedMemory(create=True, size=slots * slot_size)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(stage_path, self.memory.name, slot_size, child_conn),
+            name=f"hex-flow-shard-{index}",
+            daemon=True
+        )
+        self._child_conn = child_conn
+        self.free = deque(range(slots))
+        self.pending = {}
+        self.slot_waiters = deque()
+
+    def wake_slot_waiter(self):
+        while self.slot_waiters:
+            waiter = self.slot_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+class ShardPool:
+    """Runs one CPU-bound stage across worker processes, partitioned by key.
+
+    Payloads with the same key (e.g. a chain id or token address) always go to
+    the same worker; payloads without a key are spread round-robin. A payload
+    or result that does not fit a slot is handled in-process instead.
+    """
+    def __init__(self, stage: str, workers=2, slots=64, slot_size=1 << 20, start_method="spawn"):
+        self.stage_path = stage
+        self.workers = workers
+        self.slots = slots
+        self.slot_size = slot_size
+        self._context = multiprocessing.get_context(start_method)
+        self._local_stage = load_stage(stage)
+        self._shards = []
+        self._next = 0
+        self.submitted = 0
+        self.local_fallbacks = 0
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        for index in range(self.workers):
+            shard = _Shard(index, self._context, self.stage_path, self.slots, self.slot_size)
+            shard.process.start()
+            shard._child_conn.close()
+            loop.add_reader(shard.conn.fileno(), self._on_readable, shard)
+            self._shards.append(shard)
+        return self
+
+    def shard_for(self, key: Optional[bytes]) -> int:
+        if key is None:
+            self._next = (self._next + 1) % self.workers
+            return self._next
+        return zlib.crc32(key) % self.workers
+
+    def _run_locally(self, payload: bytes) -> asyncio.Future:
+        self.local_fallbacks += 1
+        future = asyncio.get_running_loop().create_future()
+        try:
+            future.set_result(self._local_stage(payload))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    async def submit(self, payload: bytes, key: Optional[bytes] = None) -> asyncio.Future:
+        """Hand a payload to its shard; waits only for a free slot, returns the result future"""
+        if len(payload) > self.slot_size:
+            return self._run_locally(payload)
+        shard = self._shards[self.shard_for(key)]
+        while not shard.free:
+            waiter = asyncio.get_running_loop().create_future()
+            shard.slot_waiters.append(waiter)
+            await waiter
+        slot = shard.free.popleft()
+        offset = slot * self.slot_size
+        shard.memory.buf[offset:offset + len(payload)] = payload
+        future = asyncio.get_running_loop().create_future()
+        shard.pending[slot] = (future, payload)
+        shard.conn.send_bytes(_MESSAGE.pack(slot, len(payload)))
+        self.submitted += 1
+        return future
+
+    async def run(self, payload: bytes, key: Optional[bytes] = None) -> bytes:
+        return await (await self.submit(payload, key))
+
+    def _on_readable(self, shard):
+        try:
+            while shard.conn.poll():
+                slot, status = _MESSAGE.unpack(shard.conn.recv_bytes())
+                future, payload = shard.pending.pop(slot)
+                if status >= 0:
+                    offset = slot * self.slot_size
+                    result = bytes(shard.memory.buf[offset:offset + status])
+                shard.free.append(slot)
+                shard.wake_slot_waiter()
+                if future.done():
+                    continue
+                if status >= 0:
+                    future.set_result(result)
+                elif status == STATUS_TOO_LARGE:
+                    local = self._run_locally(payload)
+                    if local.exception():
+                        future.set_exception(local.exception())
+                    else:
+                        future.set_result(local.result())
+                else:
+                    future.set_exception(RuntimeError(f"Stage {self.stage_path} failed in shard {shard.index}"))
+        except (EOFError, OSError) as e:
+            logging.error("Shard %d worker exited: %s", shard.index, e)
+            asyncio.get_running_loop().remove_reader(shard.conn.fileno())
+            for future, _ in shard.pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Shard {shard.index} worker exited"))
+            shard.pending.clear()
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for shard in self._shards:
+            loop.remove_reader(shard.conn.fileno())
+            try:
+                shard.conn.send_bytes(b"")
+            except OSError:
+                pass
+        for shard in self._shards:
+            await loop.run_in_executor(None, shard.process.join, 5)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            for future, _ in shard.pending.values():
+                future.cancel()
+            shard.conn.close()
+            shard.memory.close()
+            shard.memory.unlink()
+        self._shards = []
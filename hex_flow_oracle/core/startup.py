@@ -0,0 +1,78 @@
+"""Concurrent startup: every step starts at once and waits only on the steps it
+depends on, so connecting, subscribing, cache warming and factory validation
+overlap instead of running back to back."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from .state_machine import ContractState, StateMachine, startup_transitions
+
+logger = logging.getLogger(__name__)
+
+class StartupOrchestrator:
+    """Runs named startup steps concurrently, respecting declared dependencies.
+
+    The state machine moves to VALIDATING when the steps start and to ACTIVE
+    once they have all finished. If a required step fails the others are
+    cancelled, the state moves to ERROR and the exception propagates; an
+    optional step's failure is only logged. Per-step wall times end up in
+    ``durations``.
+    """
+    def __init__(self, state_machine: Optional[StateMachine] = None):
+        self.state_machine = state_machine or StateMachine(startup_transitions())
+        self._steps: Dict[str, tuple] = {}
+        self.durations: Dict[str, float] = {}
+        self.results: Dict[str, Any] = {}
+
+    @property
+    def state(self) -> ContractState:
+        return self.state_machine.state
+
+    def add_step(self, name: str, step: Callable[[], Awaitable[Any]],
+                 depends_on: Iterable[str] = (), required: bool = True):
+        self._steps[name] = (step, tuple(depends_on), required)
+
+    async def _run_step(self, name, tasks, started):
+        step, depends_on, required = self._steps[name]
+        if depends_on:
+            await asyncio.gather(*(tasks[dependency] for dependency in depends_on))
+        try:
+            result = await step()
+        except Exception as e:
+            if required:
+                raise
+            logger.warning("Optional startup step %s failed: %s", name, e)
+            result = None
+        self.durations[name] = time.perf_counter() - started
+        self.results[name] = result
+        return result
+
+    async def run(self) -> Dict[str, Any]:
+        for name, (_, depends_on, _) in self._steps.items():
+            unknown = set(depends_on) - set(self._steps)
+            if unknown:
+                raise ValueError(f"Startup step {name} depends on unknown steps {sorted(unknown)}")
+
+        await self.state_machine.transition(ContractState.VALIDATING)
+        started = time.perf_counter()
+        tasks = {}
+        for name in self._steps:
+            tasks[name] = asyncio.ensure_future(self._run_step(name, tasks, started))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            await self.state_machine.transition(ContractState.ERROR)
+            raise
+        await self.state_machine.transition(ContractState.ACTIVE)
+        logger.info("Startup finished in %.3fs (%s)", time.perf_counter() - started, ", ".join(
+            f"{name} {duration:.3f}s" for name, duration in self.durations.items()
+        ))
+        return self.results
+
+    async def shutdown(self):
+        if self.state_machine.state is not ContractState.SHUTDOWN:
+            await self.state_machine.transition(ContractState.SHUTDOWN)
@@ -0,0 +1,57 @@
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Set
+from dataclasses import dataclass, field
+from enum import Enum, auto
+
+class ContractState(Enum):
+    INITIALIZING = auto()
+    VALIDATING = auto()
+    ACTIVE = auto()
+    ERROR = auto()
+    SHUTDOWN = auto()
+
+@dataclass
+class StateTransition:
+    from_state: Set[ContractState]
+    to_state: ContractState
+    guards: list[Callable[[], Awaitable[bool]]] = field(default_factory=list)
+    actions: list[Callable[[], Awaitable[None]]] = field(default_factory=list)
+
+class StateMachine:
+    def __init__(self, transitions: Iterable[StateTransition] = ()):
+        self._state = ContractState.INITIALIZING
+        self._transitions: Dict[ContractState, StateTransition] = {}
+        for transition in transitions:
+            self.add_transition(transition)
+
+    @property
+    def state(self) -> ContractState:
+        return self._state
+
+    def add_transition(self, transition: StateTransition):
+        self._transitions[transition.to_state] = transition
+
+    async def transition(self, to_state: ContractState):
+        transition = self._transitions.get(to_state)
+        if not transition or self._state not in transition.from_state:
+            raise ValueError(f"Invalid transition from {self._state} to {to_state}")
+
+        for guard in transition.guards:
+            if not await guard():
+                raise ValueError(f"Guard failed for transition to {to_state}")
+
+        for action in transition.actions:
+            await action()
+
+        logging.getLogger(__name__).debug("State %s -> %s", self._state.name, to_state.name)
+        self._state = to_state
+
+def startup_transitions() -> list[StateTransition]:
+    """INITIALIZING -> VALIDATING -> ACTIVE, with ERROR and SHUTDOWN reachable from any state"""
+    every_state = set(ContractState)
+    return [
+        StateTransition({ContractState.INITIALIZING}, ContractState.VALIDATING),
+        StateTransition({ContractState.VALIDATING}, ContractState.ACTIVE),
+        StateTransition(every_state - {ContractState.SHUTDOWN}, ContractState.ERROR),
+        StateTransition(every_state, ContractState.SHUTDOWN),
+    ]
@@ -1,12 +1,26 @@
-from typing import Dict, Callable, Awaitable, Any
+from typing import Dict, Callable, Awaitable, Any, Optional, Tuple, Union
+
+from ..core.address import Address, to_address
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
 
 class AddressLookup:
-    def __init__(self, address_map: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]]):
-        self.address_map = address_map
+    """Routes logs to handlers by (emitting address, topic0)"""
+    def __init__(self, routes: Dict[Tuple[Union[str, Address], str], Handler]):
+        # Keys are interned Addresses, so any casing of a factory address matches
+        self.routes = {(to_address(address), topic0): handler for (address, topic0), handler in routes.items()}
+
+    @classmethod
+    def from_registry(cls, registry, handlers_by_version: Dict[int, Handler]) -> "AddressLookup":
+        return cls({key: handlers_by_version[factory.version] for key, factory in registry.routes.items()})
+
+    def get(self, log) -> Optional[Handler]:
+        topics = log.get("topics")
+        if not topics:
+            return None
+        return self.routes.get((to_address(log["address"]), topics[0]))
 
     async def route_event(self, log):
-        # Convert to string before calling lower()
-        address = str(log["address"]).lower()
-        handler = self.address_map.get(address)
+        handler = self.get(log)
         if handler:
-            await handler(log) 
\ No newline at end of file
+            await handler(log)
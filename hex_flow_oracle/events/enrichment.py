@@ -0,0 +1,200 @@
+"""On-chain enrichment of newly detected pools.
+
+For each pool, reads ERC-20 name/symbol/decimals/totalSupply of both tokens
+and the pool's V2 ``getReserves`` or V3 ``slot0``/``liquidity``. Pools
+arriving within ``window`` seconds of each other (a fraction of a block) are
+enriched together through one Multicall3 round-trip, and name/symbol/decimals,
+which never change, are cached per token.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from ..core.address import Address, to_address
+from ..network.multicall import Call3, decode_int, decode_string, decode_uint
+from ..output.binary_format import PoolRecord
+
+logger = logging.getLogger(__name__)
+
+NAME = bytes.fromhex("06fdde03")
+SYMBOL = bytes.fromhex("95d89b41")
+DECIMALS = bytes.fromhex("313ce567")
+TOTAL_SUPPLY = bytes.fromhex("18160ddd")
+GET_RESERVES = bytes.fromhex("0902f1ac")
+SLOT0 = bytes.fromhex("3850c7bd")
+LIQUIDITY = bytes.fromhex("1a686502")
+
+@dataclass(frozen=True)
+class TokenMetadata:
+    address: Address
+    name: Optional[str]
+    symbol: Optional[str]
+    decimals: Optional[int]
+
+@dataclass
+class PoolEnrichment:
+    record: PoolRecord
+    token0: TokenMetadata
+    token1: TokenMetadata
+    total_supply0: Optional[int] = None
+    total_supply1: Optional[int] = None
+    # V2
+    reserve0: Optional[int] = None
+    reserve1: Optional[int] = None
+    # V3
+    sqrt_price_x96: Optional[int] = None
+    tick: Optional[int] = None
+    liquidity: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        token = lambda meta, supply: {
+            "address": meta.address.checksum,
+            "name": meta.name,
+            "symbol": meta.symbol,
+            "decimals": meta.decimals,
+            "total_supply": supply,
+        }
+        result = {
+            "pool": to_address(self.record.pool).checksum,
+            "version": self.record.version,
+            "fee": self.record.fee,
+            "block_number": self.record.block_number,
+            "token0": token(self.token0, self.total_supply0),
+            "token1": token(self.token1, self.total_supply1),
+        }
+        if self.record.version == 2:
+            result.update(reserve0=self.reserve0, reserve1=self.reserve1)
+        else:
+            result.update(sqrt_price_x96=self.sqrt_price_x96, tick=self.tick, liquidity=self.liquidity)
+        return result
+
+class PoolEnricher:
+    """Coalesces enrichment requests into Multicall3 batches.
+
+    ``submit`` is a ``pool_sinks`` callable: it enriches approved pools (or
+    every pool with ``approved_only=False``) in the background and hands each
+    PoolEnrichment to ``on_result``.
+    """
+    def __init__(self, multicall, window=0.05, approved_only=True, metadata_cache_size=100_000,
+                 on_result: Optional[Callable[[PoolEnrichment], None]] = None):
+        self.multicall = multicall
+        self.window = window
+        self.approved_only = approved_only
+        self.metadata_cache_size = metadata_cache_size
+        self.on_result = on_result
+        self.metadata: Dict[Address, TokenMetadata] = {}
+        self._pending: List[tuple] = []
+        self._flush_task = None
+        self._tasks = set()
+        self.batches = 0
+        self.enriched = 0
+
+    def submit(self, record: PoolRecord):
+        if self.approved_only and not record.approved:
+            return
+        task = asyncio.get_running_loop().create_task(self._enrich_and_report(record))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _enrich_and_report(self, record):
+        try:
+            enrichment = await self.enrich(record)
+        except Exception as e:
+            logger.error("Enrichment of pool 0x%s failed: %s", record.pool.hex(), e)
+            return
+        if self.on_result:
+            self.on_result(enrichment)
+
+    async def enrich(self, record: PoolRecord) -> PoolEnrichment:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        pending, self._pending, self._flush_task = self._pending, [], None
+        try:
+            await self._flush(pending)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _cache_metadata(self, metadata: TokenMetadata):
+        if metadata.name is None and metadata.symbol is None and metadata.decimals is None:
+            return  # Nothing answered; may be transient, so ask again next time
+        self.metadata[metadata.address] = metadata
+        if len(self.metadata) > self.metadata_cache_size:
+            del self.metadata[next(iter(self.metadata))]
+
+    async def _flush(self, pending):
+        calls = []
+        # (dict, key, decoder) receiving each call's decoded result, in call order
+        slots = []
+
+        def add(target, data, values, key, decode):
+            calls.append(Call3(target, data))
+            slots.append((values, key, decode))
+
+        metadata_calls = {}
+        for record, _ in pending:
+            for token in (to_address(record.token0), to_address(record.token1)):
+                if token in self.metadata or token in metadata_calls:
+                    continue
+                fields = metadata_calls[token] = {}
+                add(token, NAME, fields, "name", decode_string)
+                add(token, SYMBOL, fields, "symbol", decode_string)
+                add(token, DECIMALS, fields, "decimals", decode_uint)
+
+        enrichments = []
+        for record, _ in pending:
+            values = {}
+            enrichments.append(values)
+            add(record.token0, TOTAL_SUPPLY, values, "total_supply0", decode_uint)
+            add(record.token1, TOTAL_SUPPLY, values, "total_supply1", decode_uint)
+            if record.version == 2:
+                add(record.pool, GET_RESERVES, values, "reserves", lambda data: (decode_uint(data, 0), decode_uint(data, 1)))
+            else:
+                add(record.pool, SLOT0, values, "slot0", lambda data: (decode_uint(data, 0), decode_int(data, 1, bits=24)))
+                add(record.pool, LIQUIDITY, values, "liquidity", decode_uint)
+
+        results = await self.multicall.aggregate(calls)
+        self.batches += 1
+        for (values, key, decode), (ok, data) in zip(slots, results):
+            values[key] = decode(data) if ok else None
+
+        fetched = {
+            token: TokenMetadata(token, fields["name"], fields["symbol"], fields["decimals"])
+            for token, fields in metadata_calls.items()
+        }
+        for metadata in fetched.values():
+            self._cache_metadata(metadata)
+
+        for (record, future), values in zip(pending, enrichments):
+            token0, token1 = to_address(record.token0), to_address(record.token1)
+            reserves = values.get("reserves") or (None, None)
+            slot0 = values.get("slot0") or (None, None)
+            enrichment = PoolEnrichment(
+                record=record,
+                token0=self.metadata.get(token0) or fetched.get(token0, TokenMetadata(token0, None, None, None)),
+                token1=self.metadata.get(token1) or fetched.get(token1, TokenMetadata(token1, None, None, None)),
+                total_supply0=values["total_supply0"],
+                total_supply1=values["total_supply1"],
+                reserve0=reserves[0],
+                reserve1=reserves[1],
+                sqrt_price_x96=slot0[0],
+                tick=slot0[1],
+                liquidity=values.get("liquidity"),
+            )
+            self.enriched += 1
+            if not future.done():
+                future.set_result(enrichment)
+
+    async def close(self):
+        tasks = list(self._tasks) + ([self._flush_task] if self._flush_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
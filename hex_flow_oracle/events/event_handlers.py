@@ -1,43 +1,139 @@
+import dataclasses
 import json
-from ..security.token_security import check_token_security
-from ..config import CLEAN_MODE
-
-async def handle_v2_event(log):
-    """Handle V2 PairCreated event"""
-    token0 = "0x" + log["topics"][1][26:]
-    token1 = "0x" + log["topics"][2][26:]
-    pair_address = "0x" + log["data"][26:66]
-    
-    token0_trusted = await check_token_security(token0)
-    token1_trusted = await check_token_security(token1)
-    
-    if CLEAN_MODE:
-        if token0_trusted and token1_trusted:
-            print(f"Trusted V2 Pair: Token0: {token0}, Token1: {token1}, Pair: {pair_address}")
-    else:
-        print("\nV2 PairCreated event:")
-        print(f"Token0: {token0}")
-        print(f"Token1: {token1}")
-        print(f"Pair Address: {pair_address}")
-        print(json.dumps(log, indent=4))
-
-async def handle_v3_event(log):
-    """Handle V3 PoolCreated event"""
-    token0 = "0x" + log["topics"][1][26:]
-    token1 = "0x" + log["topics"][2][26:]
-    fee_tier = int(log["topics"][3], 16)  # V3 specific
-    pool_address = "0x" + log["data"][26:66]
-    
-    token0_trusted = await check_token_security(token0)
-    token1_trusted = await check_token_security(token1)
-    
-    if CLEAN_MODE:
-        if token0_trusted and token1_trusted:
-            print(f"Trusted V3 Pool: Token0: {token0}, Token1: {token1}, Fee: {fee_tier}, Pool: {pool_address}")
-    else:
-        print("\nV3 PoolCreated event:")
-        print(f"Token0: {token0}")
-        print(f"Token1: {token1}")
-        print(f"Fee Tier: {fee_tier}")
-        print(f"Pool Address: {pool_address}")
-        print(json.dumps(log, indent=4)) 
\ No newline at end of file
+import logging
+import sys
+import time
+from ..core.address import to_address
+from .factory_registry import decode_v2_log, decode_v3_log
+from ..security.security_cache import SecurityCache
+from ..output.binary_format import FLAG_TOKEN0_TRUSTED, FLAG_TOKEN1_TRUSTED, PoolRecord, write_record
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import traced, mark
+from ..config import CLEAN_MODE, CHAIN_ID, OUTPUT_FORMAT, SECURITY_CACHE_TTL, SECURITY_CACHE_SIZE
+
+# Callables receiving every decoded PoolRecord, approved or not (e.g. FanoutServer.publish)
+pool_sinks = []
+
+# Verdicts shared by all handlers, so popular base tokens are not re-queried per pool
+security_cache = SecurityCache(ttl=SECURITY_CACHE_TTL, max_size=SECURITY_CACHE_SIZE)
+
+def publish(record):
+    """Hand a PoolRecord to the registered sinks"""
+    for sink in pool_sinks:
+        try:
+            sink(record)
+        except Exception as e:
+            logging.error("Pool sink %r failed: %s", sink, e)
+    return record
+
+def publish_record(log, version, token0_trusted, token1_trusted, received_ns):
+    """Build the PoolRecord for a handled event and hand it to the registered sinks"""
+    return publish(PoolRecord.from_log(
+        log, version, token0_trusted, token1_trusted,
+        chain_id=CHAIN_ID, received_ns=received_ns
+    ))
+
+def emit_binary(record):
+    """Write a framed binary record to stdout"""
+    if CLEAN_MODE and not record.approved:
+        return
+    write_record(sys.stdout.buffer, record)
+
+async def handle_v2_event(log, received_ns=None):
+    """Handle V2 PairCreated event; ``received_ns`` is when the provider's message arrived"""
+    if received_ns is None:
+        received_ns = time.time_ns()
+    token0, token1, pair_address = decode_v2_log(log)
+    
+    with metrics.stage("security_token0").time(), traced("security_token0"):
+        token0_trusted = await security_cache.get_or_check(token0)
+    with metrics.stage("security_token1").time(), traced("security_token1"):
+        token1_trusted = await security_cache.get_or_check(token1)
+    
+    with metrics.stage("publish").time():
+        record = publish_record(log, 2, token0_trusted, token1_trusted, received_ns)
+    
+    with metrics.stage("output").time():
+        if OUTPUT_FORMAT == "binary":
+            emit_binary(record)
+        elif CLEAN_MODE:
+            if token0_trusted and token1_trusted:
+                print(f"Trusted V2 Pair: Token0: {token0}, Token1: {token1}, Pair: {pair_address}")
+        else:
+            print("\nV2 PairCreated event:")
+            print(f"Token0: {token0}")
+            print(f"Token1: {token1}")
+            print(f"Pair Address: {pair_address}")
+            print(json.dumps(log, indent=4))
+    mark("emitted")
+
+async def handle_v3_event(log, received_ns=None):
+    """Handle V3 PoolCreated event; ``received_ns`` is when the provider's message arrived"""
+    if received_ns is None:
+        received_ns = time.time_ns()
+    token0, token1, fee_tier, pool_address = decode_v3_log(log)
+    
+    with metrics.stage("security_token0").time(), traced("security_token0"):
+        token0_trusted = await security_cache.get_or_check(token0)
+    with metrics.stage("security_token1").time(), traced("security_token1"):
+        token1_trusted = await security_cache.get_or_check(token1)
+    
+    with metrics.stage("publish").time():
+        record = publish_record(log, 3, token0_trusted, token1_trusted, received_ns)
+    
+    with metrics.stage("output").time():
+        if OUTPUT_FORMAT == "binary":
+            emit_binary(record)
+        elif CLEAN_MODE:
+            if token0_trusted and token1_trusted:
+                print(f"Trusted V3 Pool: Token0: {token0}, Token1: {token1}, Fee: {fee_tier}, Pool: {pool_address}")
+        else:
+            print("\nV3 PoolCreated event:")
+            print(f"Token0: {token0}")
+            print(f"Token1: {token1}")
+            print(f"Fee Tier: {fee_tier}")
+            print(f"Pool Address: {pool_address}")
+            print(json.dumps(log, indent=4))
+    mark("emitted")
+
+# Handler for the creation logs of each factory kind's PoolRecord version
+HANDLERS_BY_VERSION = {
+    2: handle_v2_event,
+    3: handle_v3_event,
+}
+
+async def handle_pool_record(record):
+    """Handle a pool event decoded off the event loop by a shard worker.
+
+    Same checks and output as the log handlers, minus the raw log dump in
+    non-clean text mode since the log itself stays in the worker.
+    """
+    token0, token1, pool_address = to_address(record.token0), to_address(record.token1), to_address(record.pool)
+    
+    with metrics.stage("security_token0").time(), traced("security_token0"):
+        token0_trusted = await security_cache.get_or_check(token0)
+    with metrics.stage("security_token1").time(), traced("security_token1"):
+        token1_trusted = await security_cache.get_or_check(token1)
+    
+    with metrics.stage("publish").time():
+        record = publish(dataclasses.replace(
+            record,
+            flags=(FLAG_TOKEN0_TRUSTED if token0_trusted else 0) | (FLAG_TOKEN1_TRUSTED if token1_trusted else 0)
+        ))
+    
+    kind = "Pair" if record.version == 2 else "Pool"
+    fee = f", Fee: {record.fee}" if record.version == 3 else ""
+    with metrics.stage("output").time():
+        if OUTPUT_FORMAT == "binary":
+            emit_binary(record)
+        elif CLEAN_MODE:
+            if token0_trusted and token1_trusted:
+                print(f"Trusted V{record.version} {kind}: Token0: {token0}, Token1: {token1}{fee}, {kind}: {pool_address}")
+        else:
+            print(f"\nV{record.version} {kind}Created event (block {record.block_number}):")
+            print(f"Token0: {token0}")
+            print(f"Token1: {token1}")
+            if record.version == 3:
+                print(f"Fee Tier: {record.fee}")
+            print(f"{kind} Address: {pool_address}")
+    mark("emitted")
@@ -1,51 +1,175 @@
 import asyncio
-from asyncio import Queue
 import logging
-from typing import List, Dict, Any
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.event_buffer import AsyncEventBuffer
+from ..monitoring.metrics import LatencyHistogram
+
+# Service time this many times the uncongested one (and above target) means the
+# handlers are slowing each other down, e.g. by queueing on the GoPlus rate limit
+CONGESTION_FACTOR = 2.0
 
 class EventProcessor:
-    def __init__(self, address_lookup):
-        self.queue = Queue()
-        self.batch_size = 10
-        self.batch_timeout = 1.0
+    """Runs events through their handlers as a bounded sliding window.
+
+    A new event starts as soon as any in flight finishes, so a slow security
+    lookup no longer holds back the rest of its batch. How many may be in flight,
+    ``batch_size``, adapts between ``min_batch_size`` (default half of
+    ``concurrency``) and ``concurrency`` by additive increase, multiplicative
+    decrease. The signal is handler service time, excluding queue wait: the
+    window shrinks only when it is above ``target_latency`` and well above the
+    fastest recently seen, i.e. when running more handlers at once is slowing
+    each of them down. Uniformly slow handlers keep the full window. Events are
+    only claimed from the buffer into free slots, so a backlog stays in the
+    buffer, where its overflow policy and watermarks apply.
+    """
+    def __init__(
+        self,
+        address_lookup,
+        buffer: Optional[AsyncEventBuffer] = None,
+        handler: Optional[Callable[[Any], Awaitable[None]]] = None,
+        concurrency=16,
+        target_latency=1.0,
+        min_batch_size=None,
+        max_batch_size=None,
+        batch_timeout=1.0,
+        throughput_window=10.0
+    ):
         self.address_lookup = address_lookup
+        self.buffer = buffer if buffer is not None else AsyncEventBuffer(max_size=10_000)
+        # Defaults to routing subscription frames through the address lookup
+        self.handler = handler or self._route_frame
+        self.concurrency = concurrency
+        self.target_latency = target_latency
+        self.max_batch_size = concurrency if max_batch_size is None else min(max_batch_size, concurrency)
+        floor = max(1, concurrency // 2) if min_batch_size is None else min_batch_size
+        self.min_batch_size = min(floor, self.max_batch_size)
+        self.batch_size = self.max_batch_size
+        self.batch_timeout = batch_timeout
+        self.throughput_window = throughput_window
+
+        self._tasks = set()
+        self._slot_waiters = deque()
+        self._completions = deque()
+        self.latency_ewma = 0.0
+        # Handler time alone, and a slowly rising floor of it (the uncongested time)
+        self.service_ewma = 0.0
+        self.service_baseline = None
+        self.processed = 0
+        self.failed = 0
+        self.queue_wait = LatencyHistogram()
+
+    async def _route_frame(self, event: Dict[str, Any]):
+        if event.get("params") and event["params"].get("result"):
+            await self.address_lookup.route_event(event["params"]["result"])
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def throughput(self) -> float:
+        """Events completed per second over the last ``throughput_window`` seconds"""
+        cutoff = time.perf_counter() - self.throughput_window
+        while self._completions and self._completions[0] < cutoff:
+            self._completions.popleft()
+        return len(self._completions) / self.throughput_window
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queued": len(self.buffer),
+            "batch_size": self.batch_size,
+            "throughput": self.throughput(),
+            "latency_ewma": self.latency_ewma,
+            "service_ewma": self.service_ewma,
+            "queue_wait_p50": self.queue_wait.percentile(0.5),
+            "queue_wait_p99": self.queue_wait.percentile(0.99),
+        }
+
+    async def submit(self, event) -> bool:
+        """Queue an event; returns False if the buffer's overflow policy dropped it"""
+        return await self.buffer.put((time.perf_counter(), event))
 
-    async def process_batch(self, batch: List[Dict[str, Any]]):
+    def _congested(self) -> bool:
+        return (self.service_baseline is not None
+                and self.service_ewma > self.target_latency
+                and self.service_ewma > CONGESTION_FACTOR * self.service_baseline)
+
+    def _adjust_batch_size(self):
+        if self._congested():
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        elif self.batch_size < self.max_batch_size:
+            self.batch_size += 1
+
+    def _record_service(self, service: float):
+        self.service_ewma += 0.2 * (service - self.service_ewma)
+        if self.service_baseline is None or service < self.service_baseline:
+            self.service_baseline = service
+        else:
+            # Drift up slowly so a lasting change in upstream speed is re-learned
+            self.service_baseline += 0.01 * (service - self.service_baseline)
+
+    async def _run(self, enqueued_at: float, event):
+        started = time.perf_counter()
         try:
-            tasks = []
-            for event in batch:
-                if event.get("params") and event.get("params").get("result"):
-                    tasks.append(self.address_lookup.route_event(event["params"]["result"]))
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle any exceptions from the batch
-            for result in results:
-                if isinstance(result, Exception):
-                    logging.error(f"Error processing event: {result}")
-                    
+            await self.handler(event)
+            self.processed += 1
         except Exception as e:
-            logging.error(f"Batch processing error: {e}")
+            self.failed += 1
+            logging.error("Error processing event: %s", e)
+        finished = time.perf_counter()
+        self._record_service(finished - started)
+        self.latency_ewma += 0.2 * (finished - enqueued_at - self.latency_ewma)
+        self._completions.append(finished)
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        while self._slot_waiters:
+            waiter = self._slot_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait_for_slot(self, limit: Optional[int] = None):
+        limit = self.concurrency if limit is None else limit
+        while len(self._tasks) >= limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._slot_waiters.append(waiter)
+            await waiter
+
+    def _start(self, enqueued_at: float, event) -> asyncio.Task:
+        self.queue_wait.record(time.perf_counter() - enqueued_at)
+        task = asyncio.create_task(self._run(enqueued_at, event))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    async def process_batch(self, batch: List[Any]):
+        """Run a batch through the window and wait for all of it to finish"""
+        enqueued_at = time.perf_counter()
+        tasks = []
+        for event in batch:
+            if len(self._tasks) >= self.concurrency:
+                await self._wait_for_slot()
+            tasks.append(self._start(enqueued_at, event))
+        await asyncio.gather(*tasks)
 
     async def process_events(self):
-        while True:
-            batch = []
-            try:
-                # Get first event or wait for timeout
-                batch.append(await asyncio.wait_for(
-                    self.queue.get(), 
-                    timeout=self.batch_timeout
-                ))
-                
-                # Get additional events if available
-                while len(batch) < self.batch_size:
-                    try:
-                        batch.append(self.queue.get_nowait())
-                    except asyncio.QueueEmpty:
-                        break
-                
-                # Process batch
-                await self.process_batch(batch)
-                
-            except asyncio.TimeoutError:
-                if batch:
-                    await self.process_batch(batch) 
\ No newline at end of file
+        """Drain the buffer forever, claiming events only as slots free up"""
+        try:
+            while True:
+                self._adjust_batch_size()
+                if len(self._tasks) >= self.batch_size:
+                    await self._wait_for_slot(self.batch_size)
+                    continue
+                free = self.batch_size - len(self._tasks)
+                for enqueued_at, event in await self.buffer.get_many(free, timeout=self.batch_timeout):
+                    self._start(enqueued_at, event)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,93 @@
+"""Declarative registry of the pool factories watched on a network.
+
+Each factory is configured as ``name -> (kind, address)`` (config.FACTORIES).
+The kind fixes the creation event's topic0, the PoolRecord version and the log
+decoder, so any fork emitting Uniswap's PairCreated/PoolCreated events is
+added with one config line. The registry precompiles a single
+``(address, topic0) -> FactorySpec`` table, so dispatch is one dict lookup
+however many factories are watched.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config import v2_pair_created_topic, v3_pool_created_topic
+from ..core.address import Address, to_address
+
+# PairCreated(address indexed token0, address indexed token1, address pair, uint256)
+V2_PAIR_CREATED_TOPIC = v2_pair_created_topic
+# PoolCreated(address indexed token0, address indexed token1, uint24 indexed fee, int24 tickSpacing, address pool)
+V3_POOL_CREATED_TOPIC = v3_pool_created_topic
+
+def decode_v2_log(log):
+    """Token0, token1 and pair Address of a PairCreated log"""
+    topics = log["topics"]
+    return to_address(topics[1]), to_address(topics[2]), to_address(log["data"][26:66])
+
+def decode_v3_log(log):
+    """Token0, token1, fee tier and pool Address of a PoolCreated log"""
+    topics = log["topics"]
+    # data is (int24 tickSpacing, address pool)
+    return to_address(topics[1]), to_address(topics[2]), int(topics[3], 16), to_address(log["data"][90:130])
+
+@dataclass(frozen=True)
+class FactoryKind:
+    version: int
+    topic0: str
+    decode: Callable
+
+KINDS = {
+    "v2": FactoryKind(2, V2_PAIR_CREATED_TOPIC, decode_v2_log),
+    "v3": FactoryKind(3, V3_POOL_CREATED_TOPIC, decode_v3_log),
+}
+
+@dataclass(frozen=True)
+class FactorySpec:
+    """One watched factory, with its kind's event details copied in for dispatch"""
+    name: str
+    kind: str
+    address: Address
+    version: int
+    topic0: str
+    decode: Callable
+
+class FactoryRegistry:
+    def __init__(self, factories: Iterable[FactorySpec]):
+        self.factories: List[FactorySpec] = list(factories)
+        self.routes: Dict[Tuple[Address, str], FactorySpec] = {
+            (factory.address, factory.topic0): factory for factory in self.factories
+        }
+
+    @classmethod
+    def from_config(cls, factories: Dict[str, Tuple[str, str]]) -> "FactoryRegistry":
+        """Build from ``{name: (kind, address)}``; entries without an address are skipped"""
+        for name, (kind, _) in factories.items():
+            if kind not in KINDS:
+                raise ValueError(f"Unknown kind {kind!r} for factory {name}; expected one of {sorted(KINDS)}")
+        return cls(
+            FactorySpec(name, kind, to_address(address), KINDS[kind].version, KINDS[kind].topic0, KINDS[kind].decode)
+            for name, (kind, address) in factories.items()
+            if address
+        )
+
+    def __len__(self):
+        return len(self.factories)
+
+    def lookup(self, log) -> Optional[FactorySpec]:
+        """The factory that emitted a creation log, or None for any other log"""
+        topics = log.get("topics")
+        if not topics:
+            return None
+        return self.routes.get((to_address(log["address"]), topics[0]))
+
+    def versions(self) -> Dict[Address, int]:
+        return {factory.address: factory.version for factory in self.factories}
+
+    def log_filters(self, max_addresses: int = 1000) -> List[dict]:
+        """``eth_subscribe``/``eth_getLogs`` filters covering every factory, as few as
+        the per-filter address limit allows; each matches all the registry's topics"""
+        addresses = sorted({str(factory.address) for factory in self.factories})
+        topics = sorted({factory.topic0 for factory in self.factories})
+        return [
+            {"address": addresses[i:i + max_addresses], "topics": [topics]}
+            for i in range(0, len(addresses), max_addresses)
+        ]
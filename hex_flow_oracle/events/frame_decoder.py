@@ -0,0 +1,56 @@
+"""Off-loop decoding of raw websocket frames into framed PoolRecords.
+
+``decode_frame`` is the stage run by ``ShardPool`` workers: it takes the raw
+frame prefixed with its receive timestamp and returns the pool creation logs it
+carries as binary_format frames, verdict flags unset. It only depends on the
+config factory table, the registry and binary_format, so worker processes
+start quickly.
+"""
+import json
+import re
+import struct
+
+from ..config import CHAIN_ID, FACTORIES
+from ..output.binary_format import PoolRecord
+from .factory_registry import FactoryRegistry
+
+_RECEIVED = struct.Struct("<Q")
+
+REGISTRY = FactoryRegistry.from_config(FACTORIES)
+
+# First indexed topic (token0) of the first log in a frame
+_TOKEN0_TOPIC = re.compile(rb'"topics"\s*:\s*\[\s*"0x[0-9a-fA-F]{64}"\s*,\s*"0x0{24}([0-9a-fA-F]{40})"')
+
+def encode_payload(message, received_ns: int) -> bytes:
+    if isinstance(message, str):
+        message = message.encode()
+    return _RECEIVED.pack(received_ns) + message
+
+def partition_key(payload: bytes, partition: str) -> bytes:
+    """Shard key for a payload: the chain id, or token0 of the first log it carries"""
+    if partition == "token":
+        match = _TOKEN0_TOPIC.search(payload)
+        if match:
+            return match.group(1).lower()
+    return str(CHAIN_ID).encode()
+
+def decode_frame(payload: bytes) -> bytes:
+    received_ns, = _RECEIVED.unpack_from(payload)
+    message = json.loads(payload[_RECEIVED.size:])
+    if "error" in message:
+        raise ValueError(message["error"])
+    if message.get("params") and message["params"].get("result"):
+        logs = [message["params"]["result"]]
+    else:
+        logs = message.get("result") or []
+    if not isinstance(logs, list):
+        return b""
+
+    out = bytearray()
+    for log in logs:
+        factory = REGISTRY.lookup(log)
+        if factory is None:
+            continue
+        out += PoolRecord.from_log(log, factory.version, False, False, chain_id=CHAIN_ID,
+                                   received_ns=received_ns).to_frame()
+    return bytes(out)
@@ -0,0 +1,180 @@
+"""Mempool mode: spot factory createPair/createPool calls before they are mined.
+
+Pending transactions to the configured factories are decoded by selector,
+and security checks for both tokens start right away through the shared
+SecurityCache. Approvals are cached, so by the time the PairCreated/PoolCreated
+log arrives a block later they are usually ready; a rejection may only mean
+GoPlus has not seen the pool yet, so it is re-checked on the mined log. The log
+is matched back to its pending transaction to measure the lead time.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..core.address import Address, to_address
+from ..output.binary_format import PoolRecord
+
+logger = logging.getLogger(__name__)
+
+CREATE_PAIR_SELECTOR = "0xc9c65396"  # createPair(address,address)
+CREATE_POOL_SELECTOR = "0xa1671295"  # createPool(address,address,uint24)
+
+@dataclass(frozen=True)
+class PendingPool:
+    tx_hash: str
+    version: int
+    token0: Address
+    token1: Address
+    fee: int
+    seen_ns: int
+
+    @property
+    def key(self) -> tuple:
+        return self.version, self.token0, self.token1, self.fee
+
+def decode_factory_call(tx: dict, factories: Dict[Address, int]) -> Optional[PendingPool]:
+    """The pool a pending factory transaction would create, or None"""
+    to = tx.get("to")
+    if not to:
+        return None
+    version = factories.get(to_address(to))
+    data = tx.get("input") or tx.get("data") or ""
+    selector = data[:10].lower()
+    if version == 2 and selector == CREATE_PAIR_SELECTOR and len(data) >= 138:
+        fee = 0
+    elif version == 3 and selector == CREATE_POOL_SELECTOR and len(data) >= 202:
+        fee = int(data[138:202], 16)
+    else:
+        return None
+    token_a, token_b = to_address(data[10:74]), to_address(data[74:138])
+    # Factories sort the pair, so the log will carry the lower address as token0
+    token0, token1 = (token_a, token_b) if token_a < token_b else (token_b, token_a)
+    return PendingPool(tx.get("hash", ""), version, token0, token1, fee, time.time_ns())
+
+class MempoolWatcher:
+    """Tracks pending pool creations and pre-warms their token verdicts"""
+    def __init__(self, factories: Dict[Address, int], security_cache, ttl=300.0, max_pending=10_000,
+                 fetch_window=0.05):
+        self.factories = {to_address(address): version for address, version in factories.items()}
+        self.security_cache = security_cache
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.fetch_window = fetch_window
+        self._by_key: Dict[tuple, PendingPool] = {}
+        self._by_tx: "OrderedDict[str, PendingPool]" = OrderedDict()
+        self._prewarm_tasks = set()
+        self._hashes: List[str] = []
+        self._fetch_task = None
+        self._runner = None
+        self.seen = 0
+        self.matched = 0
+
+    def __len__(self):
+        return len(self._by_tx)
+
+    def on_pending_tx(self, tx: dict) -> Optional[PendingPool]:
+        pending = decode_factory_call(tx, self.factories)
+        if pending is None or pending.tx_hash in self._by_tx:
+            return None
+        self.seen += 1
+        self._by_tx[pending.tx_hash] = pending
+        self._by_key[pending.key] = pending
+        self.expire()
+        for token in (pending.token0, pending.token1):
+            task = asyncio.get_running_loop().create_task(self.security_cache.prewarm(token))
+            self._prewarm_tasks.add(task)
+            task.add_done_callback(self._prewarm_tasks.discard)
+        return pending
+
+    def expire(self, now_ns: Optional[int] = None):
+        """Drop entries older than ``ttl`` (never mined) and the oldest beyond ``max_pending``"""
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        cutoff = now_ns - int(self.ttl * 1e9)
+        while self._by_tx:
+            pending = next(iter(self._by_tx.values()))
+            if pending.seen_ns >= cutoff and len(self._by_tx) <= self.max_pending:
+                break
+            self._remove(pending)
+
+    def _remove(self, pending: PendingPool):
+        self._by_tx.pop(pending.tx_hash, None)
+        if self._by_key.get(pending.key) is pending:
+            del self._by_key[pending.key]
+
+    def match(self, version: int, token0, token1, fee: int = 0, tx_hash: Optional[str] = None) -> Optional[PendingPool]:
+        """Pop the pending entry for a mined pool creation, found by tx hash or by pool key"""
+        pending = self._by_tx.get(tx_hash) if tx_hash else None
+        if pending is None:
+            pending = self._by_key.get((version, to_address(token0), to_address(token1), fee))
+        if pending is None:
+            return None
+        self._remove(pending)
+        self.matched += 1
+        return pending
+
+    def match_log(self, log: dict) -> Optional[PendingPool]:
+        """Match a raw PairCreated/PoolCreated log emitted by one of the factories"""
+        version = self.factories.get(to_address(log["address"]))
+        topics = log.get("topics") or []
+        if version is None or len(topics) < 3:
+            return None
+        fee = int(topics[3], 16) if version == 3 else 0
+        return self.match(version, topics[1], topics[2], fee, log.get("transactionHash"))
+
+    def match_record(self, record: PoolRecord) -> Optional[PendingPool]:
+        return self.match(record.version, record.token0, record.token1, record.fee)
+
+    def start(self, url: str, rpc=None):
+        """Follow ``newPendingTransactions``. If the provider only sends hashes, the
+        bodies are fetched through ``rpc.batch``, one batch per ``fetch_window``"""
+        self._runner = asyncio.get_running_loop().create_task(self._run(url, rpc))
+        return self
+
+    async def close(self):
+        tasks = list(self._prewarm_tasks) + [task for task in (self._fetch_task, self._runner) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, url, rpc):
+        import websockets  # Deferred to keep `import hex_flow_oracle.main` fast
+        while True:
+            try:
+                async with websockets.connect(url) as ws:
+                    # Ask for full transaction bodies; providers without support send hashes
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe",
+                                              "params": ["newPendingTransactions", True]}))
+                    async for message in ws:
+                        await self._on_message(json.loads(message), rpc)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Mempool subscription failed: %s", e)
+            await asyncio.sleep(2)
+
+    async def _on_message(self, message, rpc):
+        if "error" in message:
+            raise RuntimeError(message["error"])
+        result = (message.get("params") or {}).get("result")
+        if isinstance(result, dict):
+            self.on_pending_tx(result)
+        elif isinstance(result, str) and rpc is not None:
+            self._hashes.append(result)
+            if self._fetch_task is None:
+                self._fetch_task = asyncio.ensure_future(self._fetch_after_window(rpc))
+
+    async def _fetch_after_window(self, rpc):
+        await asyncio.sleep(self.fetch_window)
+        hashes, self._hashes, self._fetch_task = self._hashes, [], None
+        try:
+            replies = await rpc.batch([("eth_getTransactionByHash", [tx_hash]) for tx_hash in hashes])
+        except Exception as e:
+            logger.error("Fetching %d pending transactions failed: %s", len(hashes), e)
+            return
+        for tx in replies:
+            if isinstance(tx, dict):
+                self.on_pending_tx(tx)
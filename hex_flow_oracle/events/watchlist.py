@@ -0,0 +1,355 @@
+"""Post-creation watchlist: follows Mint/Burn/Sync/Swap logs of newly approved pools.
+
+Each approved pool is watched for ``window`` seconds after detection. Watched
+addresses are split into shards of at most ``shard_capacity`` addresses, one
+provider subscription per shard, to stay under provider filter-size limits.
+A shard's subscription is only replaced when its address set has changed and
+at most once per ``update_interval``, so a burst of new pools costs one
+re-subscribe per shard rather than one per pool. Each update also fetches the
+new pools' logs since their creation block with one ``eth_getLogs``, since a
+router launch mints in the same transaction that creates the pool.
+"""
+import asyncio
+import heapq
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from ..core.address import Address, to_address
+from ..output.binary_format import PoolRecord
+
+logger = logging.getLogger(__name__)
+
+V2_SYNC_TOPIC = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+V2_MINT_TOPIC = "0x4c209b5fc8ad50758f13e2e1088ba56a560dff690a1c6fef26394f4c03821c4f"
+V2_BURN_TOPIC = "0xdccd412f0b1252819cb1fd330b93224ca42612892bb3f4f789976e6d81936496"
+V2_SWAP_TOPIC = "0xd78ad95fa46c994b6551d0da85fc275fe613ce37657fb8d5e3d130840159d822"
+V3_MINT_TOPIC = "0x7a53080ba414158be7ec69b987b5fb7d07dee101fe85488f0853ae16239d0bde"
+V3_BURN_TOPIC = "0x0c396cd989a39f4459b5fa1aed6a9a8dcdbc45908acfd67e028cd568da98982c"
+V3_SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+
+# Log keys remembered per connection, to record logs delivered by two overlapping
+# subscriptions once
+RECENT_LOGS_SIZE = 1024
+
+EVENT_KINDS = {
+    V2_SYNC_TOPIC: "sync",
+    V2_MINT_TOPIC: "mint",
+    V2_BURN_TOPIC: "burn",
+    V2_SWAP_TOPIC: "swap",
+    V3_MINT_TOPIC: "mint",
+    V3_BURN_TOPIC: "burn",
+    V3_SWAP_TOPIC: "swap",
+}
+
+def _data_word(log, index: int) -> int:
+    start = 2 + 64 * index
+    return int(log["data"][start:start + 64], 16)
+
+@dataclass
+class PoolActivity:
+    """What a watched pool has done since it was detected"""
+    pool: Address
+    version: int
+    added_at: float
+    mints: int = 0
+    burns: int = 0
+    swaps: int = 0
+    first_liquidity_block: Optional[int] = None
+    # V2: latest and peak reserves from Sync
+    reserve0: int = 0
+    reserve1: int = 0
+    peak_reserve0: int = 0
+    peak_reserve1: int = 0
+    # V3: liquidity units added by Mint and removed by Burn
+    liquidity_added: int = 0
+    liquidity_removed: int = 0
+    rug_suspected: bool = False
+
+    def apply(self, kind: str, log, rug_drop: float):
+        """Update from one decoded log; returns True if this log raised the rug flag"""
+        if kind == "swap":
+            self.swaps += 1
+        elif kind == "mint":
+            self.mints += 1
+            if self.first_liquidity_block is None:
+                self.first_liquidity_block = int(log.get("blockNumber") or "0x0", 16)
+            if self.version == 3:
+                # Mint(sender, owner*, tickLower*, tickUpper*, amount, amount0, amount1)
+                self.liquidity_added += _data_word(log, 1)
+        elif kind == "burn":
+            self.burns += 1
+            if self.version == 3:
+                # Burn(owner*, tickLower*, tickUpper*, amount, amount0, amount1)
+                self.liquidity_removed += _data_word(log, 0)
+        elif kind == "sync":
+            self.reserve0, self.reserve1 = _data_word(log, 0), _data_word(log, 1)
+            self.peak_reserve0 = max(self.peak_reserve0, self.reserve0)
+            self.peak_reserve1 = max(self.peak_reserve1, self.reserve1)
+
+        if self.rug_suspected:
+            return False
+        if self.version == 2:
+            drained = any(
+                peak and reserve < peak * (1 - rug_drop)
+                for reserve, peak in ((self.reserve0, self.peak_reserve0), (self.reserve1, self.peak_reserve1))
+            )
+        else:
+            drained = self.liquidity_added > 0 and self.liquidity_removed >= self.liquidity_added * rug_drop
+        self.rug_suspected = drained
+        return drained
+
+def _log_position(log) -> tuple:
+    return int(log.get("blockNumber") or "0x0", 16), int(log.get("logIndex") or "0x0", 16)
+
+class WatchShard:
+    """Addresses covered by one provider subscription; ``version`` bumps on every change"""
+    def __init__(self, index: int, capacity: int):
+        self.index = index
+        self.capacity = capacity
+        self.addresses: Set[Address] = set()
+        self.version = 0
+        # Pools added since the last filter update -> block to fetch their logs from
+        self.backfill: Dict[Address, int] = {}
+
+    @property
+    def has_room(self) -> bool:
+        return len(self.addresses) < self.capacity
+
+    def log_filter(self) -> dict:
+        return {
+            "address": sorted(str(address) for address in self.addresses),
+            "topics": [list(EVENT_KINDS)],
+        }
+
+    def backfill_filter(self) -> Optional[dict]:
+        """``eth_getLogs`` filter for the pools awaiting backfill, which it hands off"""
+        if not self.backfill:
+            return None
+        pools, self.backfill = self.backfill, {}
+        return {
+            "address": sorted(str(address) for address in pools),
+            "topics": [list(EVENT_KINDS)],
+            "fromBlock": hex(min(pools.values())),
+            "toBlock": "latest",
+        }
+
+class PoolWatchlist:
+    """Time-windowed set of watched pools, sharded across subscriptions.
+
+    ``submit`` is a ``pool_sinks`` callable that watches each approved pool.
+    ``on_activity(activity, kind)`` is called for every log from a watched
+    pool, with kind ``"rug"`` once when its liquidity looks drained.
+    """
+    def __init__(self, window=3600.0, shard_capacity=1000, max_shards=4, rug_drop=0.9,
+                 on_activity: Optional[Callable[[PoolActivity, str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.shard_capacity = shard_capacity
+        self.max_shards = max_shards
+        self.rug_drop = rug_drop
+        self.on_activity = on_activity
+        self.clock = clock
+        self.shards: List[WatchShard] = []
+        self.activity: Dict[Address, PoolActivity] = {}
+        self._shard_of: Dict[Address, WatchShard] = {}
+        self._deadlines: Dict[Address, float] = {}
+        self._expiry_heap: List[tuple] = []
+        self._runner = None
+        self.rejected = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._shard_of)
+
+    def __contains__(self, address) -> bool:
+        return to_address(address) in self._shard_of
+
+    def _shard_with_room(self) -> Optional[WatchShard]:
+        for shard in self.shards:
+            if shard.has_room:
+                return shard
+        if len(self.shards) < self.max_shards:
+            self.shards.append(WatchShard(len(self.shards), self.shard_capacity))
+            return self.shards[-1]
+        return None
+
+    def add(self, pool, version: int, now: Optional[float] = None, from_block: Optional[int] = None) -> bool:
+        """Watch a pool for ``window`` seconds from now; False if every shard is full.
+        Logs from ``from_block`` on (its creation block) are fetched when it joins the filter."""
+        pool = to_address(pool)
+        now = self.clock() if now is None else now
+        if pool not in self._shard_of:
+            shard = self._shard_with_room()
+            if shard is None:
+                self.rejected += 1
+                return False
+            shard.addresses.add(pool)
+            shard.version += 1
+            if from_block:
+                shard.backfill[pool] = from_block
+            self._shard_of[pool] = shard
+            self.activity[pool] = PoolActivity(pool, version, now)
+        # Re-adding only pushes the deadline back; the stale heap entry is skipped on expiry
+        self._deadlines[pool] = now + self.window
+        heapq.heappush(self._expiry_heap, (now + self.window, pool))
+        return True
+
+    def submit(self, record: PoolRecord):
+        if record.approved:
+            self.add(record.pool, record.version, from_block=record.block_number)
+
+    def expire(self, now: Optional[float] = None) -> List[Address]:
+        now = self.clock() if now is None else now
+        removed = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            deadline, pool = heapq.heappop(self._expiry_heap)
+            if self._deadlines.get(pool) != deadline:
+                continue
+            del self._deadlines[pool]
+            shard = self._shard_of.pop(pool)
+            shard.addresses.discard(pool)
+            shard.backfill.pop(pool, None)
+            shard.version += 1
+            self.activity.pop(pool, None)
+            removed.append(pool)
+        self.expired += len(removed)
+        return removed
+
+    def record_log(self, log) -> Optional[PoolActivity]:
+        kind = EVENT_KINDS.get((log.get("topics") or [None])[0])
+        activity = self.activity.get(to_address(log["address"])) if kind else None
+        if activity is None:
+            return None
+        rugged = activity.apply(kind, log, self.rug_drop)
+        if self.on_activity:
+            self.on_activity(activity, kind)
+            if rugged:
+                self.on_activity(activity, "rug")
+        return activity
+
+    def start(self, url: str, update_interval: float = 2.0):
+        self._runner = asyncio.get_running_loop().create_task(self._run(url, update_interval))
+        return self
+
+    async def close(self):
+        if self._runner:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+
+    async def _run(self, url, update_interval):
+        """Expire pools and keep one connection per shard"""
+        connections = {}
+        try:
+            while True:
+                self.expire()
+                for shard in self.shards:
+                    if shard.index not in connections:
+                        connections[shard.index] = asyncio.create_task(self._watch_shard(shard, url, update_interval))
+                await asyncio.sleep(update_interval)
+        finally:
+            for task in connections.values():
+                task.cancel()
+            await asyncio.gather(*connections.values(), return_exceptions=True)
+
+    async def _watch_shard(self, shard: WatchShard, url: str, update_interval: float):
+        import websockets  # Deferred to keep `import hex_flow_oracle.main` fast
+        while True:
+            try:
+                async with websockets.connect(url) as ws:
+                    await self._follow(ws, shard, update_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Watchlist shard %d connection failed: %s", shard.index, e)
+            await asyncio.sleep(update_interval)
+
+    async def _follow(self, ws, shard: WatchShard, update_interval: float):
+        # Notifications are accepted from the current subscription and, until its
+        # replacement is confirmed, from the one it replaces, so a filter swap
+        # leaves no gap; logs delivered by both, or by a backfill, are recorded once
+        active: Set[str] = set()
+        subscription_id = None
+        subscribed_version = None
+        request_id = 0
+        pending_subscribe = None
+        last_update = 0.0
+        recent_order, recent = deque(), set()
+        # Live logs of pools being backfilled wait for the backfill, to keep block order
+        pending_backfill = None
+        backfilling: Set[str] = set()
+        held = []
+
+        def record_once(log):
+            key = (log.get("transactionHash"), log.get("logIndex"))
+            if key[0] is not None:
+                if key in recent:
+                    return
+                recent.add(key)
+                recent_order.append(key)
+                if len(recent_order) > RECENT_LOGS_SIZE:
+                    recent.discard(recent_order.popleft())
+            self.record_log(log)
+
+        while True:
+            now = time.monotonic()
+            if (shard.version != subscribed_version and pending_subscribe is None
+                    and pending_backfill is None and now - last_update >= update_interval):
+                request_id += 1
+                if shard.addresses:
+                    pending_subscribe = request_id
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                              "method": "eth_subscribe", "params": ["logs", shard.log_filter()]}))
+                    backfill = shard.backfill_filter()
+                    if backfill:
+                        # Sent after the subscribe, so no log falls between the two
+                        request_id += 1
+                        pending_backfill = request_id
+                        backfilling = set(backfill["address"])
+                        await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                                  "method": "eth_getLogs", "params": [backfill]}))
+                elif subscription_id:
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                              "method": "eth_unsubscribe", "params": [subscription_id]}))
+                    active.discard(subscription_id)
+                    subscription_id = None
+                subscribed_version = shard.version
+                last_update = now
+            try:
+                message = json.loads(await asyncio.wait_for(ws.recv(), timeout=update_interval))
+            except asyncio.TimeoutError:
+                continue
+            if message.get("id") is not None:
+                if message["id"] == pending_backfill:
+                    if "error" in message:
+                        logger.error("Watchlist shard %d backfill failed: %s", shard.index, message["error"])
+                    for log in sorted(message.get("result") or [], key=_log_position):
+                        record_once(log)
+                    for log in held:
+                        record_once(log)
+                    pending_backfill, backfilling, held = None, set(), []
+                elif message["id"] == pending_subscribe:
+                    pending_subscribe = None
+                    if "error" in message:
+                        logger.error("Watchlist shard %d subscribe failed: %s", shard.index, message["error"])
+                        subscribed_version = None
+                        continue
+                    if subscription_id:
+                        request_id += 1
+                        await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                                  "method": "eth_unsubscribe", "params": [subscription_id]}))
+                        active.discard(subscription_id)
+                    subscription_id = message.get("result")
+                    active.add(subscription_id)
+                continue
+            params = message.get("params") or {}
+            log = params.get("result")
+            if not log or params.get("subscription") not in active:
+                continue
+            if backfilling and str(to_address(log["address"])) in backfilling:
+                held.append(log)
+                continue
+            record_once(log)
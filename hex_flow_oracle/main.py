@@ -1,27 +1,167 @@
+import argparse
 import asyncio
 import json
-import websockets
+import signal
+import sys
+import time
+from collections import Counter, deque
 from datetime import datetime
 import logging
 
+from .core.address import to_address
 from .core.async_utils import AsyncRetryContext, WeakCache
-from .core.event_buffer import AsyncEventBuffer
-from .core.rate_limiting import AdaptiveRateLimiter
+from .core.event_buffer import AsyncEventBuffer, OverflowPolicy
+from .core.process_shards import ShardPool
+from .core.rate_limiting import AdaptiveRateLimiter, CircuitState
 from .monitoring.logging_setup import setup_logging
-from .events.event_handlers import handle_v2_event, handle_v3_event
+from .monitoring.metrics import metrics, MetricsServer
+from .monitoring.tracing import TraceRecorder
+from .monitoring.profiler import LoopProfiler
+from .core.di_container import DIContainer
+from .core.startup import StartupOrchestrator
+from .events.event_handlers import HANDLERS_BY_VERSION, handle_pool_record, pool_sinks, security_cache
+from .events.frame_decoder import encode_payload, partition_key
 from .events.address_lookup import AddressLookup
-from .security.security_cache import SecurityCache
+from .events.factory_registry import FactoryRegistry
+from .events.enrichment import PoolEnricher
+from .events.watchlist import PoolWatchlist
+from .events.mempool import MempoolWatcher
+from .events.event_processor import EventProcessor
+from .network.fanout_server import FanoutServer
+from .network.io_thread import NetworkThread, ThreadHandoff
+from .network.multicall import Multicall
+from .network.rpc import JsonRpcClient
+from .security import token_security
+from .security.factory_validation import ValidationCache, validate_factories
+from .security.honeypot import HoneypotSimulator
+from .storage.pool_journal import JournalReader, PoolJournal
+from .storage.pool_graph import PoolGraph
+from .storage.pool_index import PoolIndex, PoolIndexServer
+from .storage.columnar_export import ColumnarExporter
+from .output.binary_format import PoolRecord, iter_frames
 from .config import (
     quicknode_ws_url,
-    uniswap_v2_factory_address,
-    uniswap_v3_factory_address,
-    v2_pair_created_topic,
-    v3_pool_created_topic,
-    CLEAN_MODE
+    FACTORIES,
+    SUBSCRIPTION_MAX_ADDRESSES,
+    CLEAN_MODE,
+    FANOUT_ENABLED,
+    FANOUT_SOCKET_PATH,
+    FANOUT_HOST,
+    FANOUT_PORT,
+    FANOUT_QUEUE_SIZE,
+    FANOUT_SLOW_CONSUMER_POLICY,
+    JOURNAL_ENABLED,
+    JOURNAL_DIR,
+    JOURNAL_SEGMENT_RECORDS,
+    JOURNAL_FSYNC,
+    JOURNAL_BACKFILL_BLOCKS,
+    POOL_INDEX_ENABLED,
+    POOL_INDEX_HOST,
+    POOL_INDEX_PORT,
+    POOL_GRAPH_ENABLED,
+    POOL_GRAPH_MAX_VISITS,
+    EXPORT_ENABLED,
+    EXPORT_DIR,
+    EXPORT_FORMAT,
+    EXPORT_ROW_GROUP_SIZE,
+    EXPORT_ROTATE_ROWS,
+    EXPORT_ROTATE_SECONDS,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+    TRACE_ENABLED,
+    TRACE_BUFFER_SIZE,
+    TRACE_SAMPLE_RATE,
+    TRACE_SLOW_THRESHOLD_MS,
+    TRACE_STREAM_PATH,
+    TRACE_DUMP_PATH,
+    EVENT_BUFFER_SIZE,
+    EVENT_BUFFER_POLICY,
+    EVENT_BUFFER_HIGH_WATERMARK,
+    EVENT_BUFFER_LOW_WATERMARK,
+    EVENT_CONCURRENCY,
+    EVENT_TARGET_LATENCY,
+    SHARDING_ENABLED,
+    SHARD_WORKERS,
+    SHARD_PARTITION,
+    SHARD_SLOTS,
+    SHARD_SLOT_SIZE,
+    NETWORK_THREAD_ENABLED,
+    USE_UVLOOP,
+    CHAIN_ID,
+    RPC_HTTP_URL,
+    VALIDATE_FACTORIES,
+    VALIDATION_CACHE_PATH,
+    STARTUP_WARM_TOKENS,
+    ENRICHMENT_ENABLED,
+    ENRICHMENT_WINDOW,
+    ENRICHMENT_APPROVED_ONLY,
+    MULTICALL_ADDRESS,
+    WATCHLIST_ENABLED,
+    WATCHLIST_WINDOW,
+    WATCHLIST_ADDRESSES_PER_CONNECTION,
+    WATCHLIST_MAX_CONNECTIONS,
+    WATCHLIST_UPDATE_INTERVAL,
+    WATCHLIST_RUG_DROP,
+    MEMPOOL_ENABLED,
+    MEMPOOL_PENDING_TTL,
+    MEMPOOL_MAX_PENDING,
+    NETWORK,
+    HONEYPOT_SIMULATION_ENABLED,
+    HONEYPOT_SIMULATION_AMOUNT,
+    HONEYPOT_SIMULATION_WINDOW,
+    HONEYPOT_MAX_TAX,
+    HONEYPOT_ROUTERS
 )
 
 logger = setup_logging()
 
+BACKFILL_REQUEST_ID = 2
+BACKFILL_HEAD_REQUEST_ID = 3
+# Logs remembered for deduplicating backfilled against live copies
+RECENT_LOGS_SIZE = 512
+
+# Factories watched on NETWORK, with the (address, topic0) dispatch table
+factory_registry = FactoryRegistry.from_config(FACTORIES)
+
+def log_filters():
+    """As few log filters as cover every factory within the provider's address limit"""
+    return factory_registry.log_filters(SUBSCRIPTION_MAX_ADDRESSES)
+
+CIRCUIT_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2
+}
+
+def log_key(entry):
+    """Coalescing key of a buffered (enqueued_at, (log or PoolRecord, received_ns, decoded_ns)) entry"""
+    item = entry[1][0]
+    if isinstance(item, PoolRecord):
+        return item.pool
+    return item.get("transactionHash"), item.get("logIndex")
+
+def register_gauges(rate_limiter, security_cache, event_buffer):
+    metrics.gauge("event_buffer_depth", event_buffer.qsize, "Events waiting in AsyncEventBuffer")
+    metrics.gauge("event_buffer_occupancy", lambda: event_buffer.occupancy, "AsyncEventBuffer fill ratio")
+    metrics.gauge("event_buffer_dropped", lambda: event_buffer.dropped, "Events dropped by the overflow policy")
+    metrics.gauge("event_buffer_coalesced", lambda: event_buffer.coalesced, "Duplicate events coalesced in the buffer")
+    metrics.gauge("security_cache_hit_ratio", lambda: security_cache.hit_rate, "SecurityCache hit ratio")
+    metrics.gauge("security_cache_entries", lambda: len(security_cache.cache), "SecurityCache entries")
+    metrics.gauge("rate_limiter_tokens", rate_limiter.available_tokens, "Requests left in the current rate window")
+    metrics.gauge("rate_limiter_rate", lambda: rate_limiter.current_rate, "Current adaptive request rate")
+    metrics.gauge(
+        "circuit_state",
+        lambda: CIRCUIT_STATE_VALUES[rate_limiter.circuit_state],
+        "Circuit breaker state (0=closed, 1=half-open, 2=open)"
+    )
+
+def register_processor_gauges(processor):
+    metrics.gauge("events_in_flight", lambda: processor.in_flight, "Events being handled concurrently")
+    metrics.gauge("event_batch_size", lambda: processor.batch_size, "Events allowed in flight by the latency target")
+    metrics.gauge("event_throughput", processor.throughput, "Events handled per second")
+    metrics.gauge("event_queue_wait_p99_seconds", lambda: processor.queue_wait.percentile(0.99), "p99 wait before handling starts")
+
 def create_app():
     # Create dependencies
     rate_limiter = AdaptiveRateLimiter(
@@ -32,14 +172,18 @@ def create_app():
         adaptive_factor=0.3
     )
     
-    security_cache = SecurityCache(ttl=3600, max_size=1000)
-    event_buffer = AsyncEventBuffer(max_size=1000)
+    event_buffer = AsyncEventBuffer(
+        max_size=EVENT_BUFFER_SIZE,
+        policy=OverflowPolicy(EVENT_BUFFER_POLICY),
+        key=log_key,
+        high_watermark=EVENT_BUFFER_HIGH_WATERMARK,
+        low_watermark=EVENT_BUFFER_LOW_WATERMARK
+    )
+    
+    # Route each factory's creation logs to the handler for its kind
+    address_lookup = AddressLookup.from_registry(factory_registry, HANDLERS_BY_VERSION)
     
-    # Create address lookup with handlers
-    address_lookup = AddressLookup({
-        str(uniswap_v2_factory_address).lower(): handle_v2_event,
-        str(uniswap_v3_factory_address).lower(): handle_v3_event
-    })
+    register_gauges(rate_limiter, security_cache, event_buffer)
     
     return {
         'rate_limiter': rate_limiter,
@@ -49,97 +193,589 @@ def create_app():
     }
 
 @AsyncRetryContext()
-async def listen_for_pair_created_events():
+async def listen_for_pair_created_events(journal=None, tracer=None, shards=None, network=None, on_subscribed=None,
+                                         mempool=None):
     app = create_app()
     rate_limiter = app['rate_limiter']
     event_buffer = app['event_buffer']
     address_lookup = app['address_lookup']
     
-    # Define event handlers using lambdas
-    event_handlers = {
-        str(uniswap_v2_factory_address).lower(): lambda log: handle_v2_event(log),
-        str(uniswap_v3_factory_address).lower(): lambda log: handle_v3_event(log)
-    }
+    handle_latency = metrics.stage("handle")
+    mempool_lead = metrics.stage("mempool_lead")
+    
+    # Pools recently handled, so backfilled and live copies are handled once; the
+    # deque keeps arrival order for eviction, the set answers membership
+    recent_order = deque()
+    recent_logs = set()
+    
+    def remember(pool):
+        recent_logs.add(pool)
+        recent_order.append(pool)
+        if len(recent_order) > RECENT_LOGS_SIZE:
+            recent_logs.discard(recent_order.popleft())
+    
+    # Pools journaled before a restart are in the backfill again
+    if journal and journal.resume_block is not None:
+        for record in JournalReader(journal.directory).since_block(journal.resume_block):
+            remember(to_address(record.pool))
+    
+    # Blocks of the events being handled; completion order is not block order,
+    # so the journal's resume point is the lowest of them
+    in_flight_blocks = Counter()
+    highest_block = (journal.resume_block or 0) if journal else 0
+    
+    async def dispatch(item, received_ns, decoded_ns):
+        nonlocal highest_block
+        # Logs come from in-process decoding, PoolRecords from shard workers
+        if isinstance(item, PoolRecord):
+            pool, block, handler = to_address(item.pool), item.block_number, handle_pool_record
+            args = (item,)
+        else:
+            handler = address_lookup.get(item)
+            if not handler:
+                return
+            pool, block = _log_pool(item), int(item.get("blockNumber") or "0x0", 16)
+            # Records carry their receive time; a log's is taken here, not when handling starts
+            args = (item, received_ns)
+        if pool in recent_logs:
+            return
+        remember(pool)
+        if mempool:
+            pending = mempool.match_record(item) if isinstance(item, PoolRecord) else mempool.match_log(item)
+            if pending:
+                mempool_lead.record((time.time_ns() - pending.seen_ns) / 1e9)
+        in_flight_blocks[block] += 1
+        highest_block = max(highest_block, block)
+        try:
+            trace = tracer.start(received_ns) if tracer else None
+            if trace:
+                if isinstance(item, PoolRecord):
+                    trace.block_number = item.block_number
+                else:
+                    trace.attach_log(item)
+                trace.marks.append(("decoded", decoded_ns))
+                trace.mark("dequeued")
+            with handle_latency.time():
+                await handler(*args)
+            if trace:
+                tracer.finish(trace)
+        finally:
+            in_flight_blocks[block] -= 1
+            if not in_flight_blocks[block]:
+                del in_flight_blocks[block]
+            if journal and highest_block:
+                journal.checkpoint(min(in_flight_blocks, default=highest_block))
+    
+    processor = EventProcessor(
+        address_lookup,
+        buffer=event_buffer,
+        handler=lambda entry: dispatch(*entry),
+        concurrency=EVENT_CONCURRENCY,
+        target_latency=EVENT_TARGET_LATENCY
+    )
+    register_processor_gauges(processor)
+    
+    # Stop reading the socket while the buffer is above its high watermark
+    reading = asyncio.Event()
+    reading.set()
+    consumer = asyncio.create_task(processor.process_events())
+    
+    try:
+        if network:
+            # The socket loop runs on the network thread and hands events over
+            handoff = ThreadHandoff(asyncio.get_running_loop(), processor.submit, metrics.stage("handoff"))
+            metrics.gauge("handoff_depth", lambda: len(handoff), "Events handed off but not yet buffered")
+            event_buffer.on_high_watermark = lambda: network.call_soon(reading.clear)
+            event_buffer.on_low_watermark = lambda: network.call_soon(reading.set)
+            try:
+                await network.run(_listen(rate_limiter, handoff, reading, journal, shards, on_subscribed))
+            finally:
+                await handoff.close()
+        else:
+            event_buffer.on_high_watermark = reading.clear
+            event_buffer.on_low_watermark = reading.set
+            await _listen(rate_limiter, processor, reading, journal, shards, on_subscribed)
+    finally:
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+# Frames handed to shard workers whose records are not yet queued
+_shard_decodes = set()
+
+async def _queue_shard_output(processor, pending, submitted):
+    try:
+        output = await pending
+    except Exception as e:
+        logger.error("Sharded frame decode failed: %s", e)
+        return
+    metrics.stage("shard_decode").record(time.perf_counter() - submitted)
+    decoded_ns = time.time_ns()
+    for record in iter_frames(output):
+        await processor.submit((record, record.received_ns, decoded_ns))
+
+def _log_pool(log):
+    """Pool address of a PairCreated (three topics) or PoolCreated (four) log"""
+    data = log["data"]
+    return to_address(data[26:66] if len(log["topics"]) == 3 else data[90:130])
+
+async def _request_backfill(ws, rate_limiter, filters, from_block) -> list:
+    """Request the logs of ``filters`` from ``from_block`` to the head, in ranges of
+    JOURNAL_BACKFILL_BLOCKS; the replies come back as BACKFILL_REQUEST_ID messages.
+    Returns the logs notified while the head block was being fetched."""
+    notified = []
+    await ws.send(json.dumps({"jsonrpc": "2.0", "id": BACKFILL_HEAD_REQUEST_ID,
+                              "method": "eth_blockNumber", "params": []}))
+    reply = json.loads(await ws.recv())
+    while reply.get("method") == "eth_subscription":
+        notified.append(reply["params"]["result"])
+        reply = json.loads(await ws.recv())
+    if "result" in reply:
+        head = int(reply["result"], 16)
+    else:
+        # Unknown head: one request per filter, as before chunking
+        logger.error("Could not fetch the head block for backfill: %s", reply.get("error"))
+        head = from_block
+    for start in range(from_block, max(head, from_block) + 1, JOURNAL_BACKFILL_BLOCKS):
+        end = start + JOURNAL_BACKFILL_BLOCKS - 1
+        for subscription_filter in filters:
+            while not await rate_limiter.acquire():
+                await asyncio.sleep(1)
+            await ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": BACKFILL_REQUEST_ID,
+                "method": "eth_getLogs",
+                # The last range runs to "latest", covering blocks mined meanwhile
+                "params": [dict(subscription_filter, fromBlock=hex(start),
+                                toBlock=hex(end) if end < head else "latest")]
+            }))
+    return notified
+
+async def _submit_when_reading(processor, reading, entry):
+    """Submit one of a burst of logs (backfill, early notifications), first waiting
+    out a pause like the socket loop does, so the burst cannot overrun the buffer"""
+    if not reading.is_set():
+        await reading.wait()
+    await processor.submit(entry)
+
+async def _listen(rate_limiter, processor, reading, journal, shards=None, on_subscribed=None):
+    """Provider connection loop; ``processor`` is the EventProcessor, or a
+    ThreadHandoff to it when running on the network thread. ``on_subscribed``
+    is called (from the loop running this) after every successful subscription."""
+    import websockets  # Deferred to keep `import hex_flow_oracle.main` fast
+    decode_latency = metrics.stage("decode")
+    reconnecting = False
     
     while True:
         try:
-            # Add delay between connection attempts
-            await asyncio.sleep(2)
+            # Add delay between reconnection attempts; the first connect is immediate
+            if reconnecting:
+                await asyncio.sleep(2)
+            reconnecting = True
             
             async with websockets.connect(quicknode_ws_url) as ws:
-                # Combine subscriptions into one request
-                subscription = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "eth_subscribe",
-                    "params": [
-                        "logs",
-                        {
-                            "address": [
-                                uniswap_v2_factory_address,
-                                uniswap_v3_factory_address
-                            ],
-                            "topics": [
-                                [v2_pair_created_topic, v3_pool_created_topic]
-                            ]
-                        }
-                    ]
-                }
-
-                while True:  # Retry loop for subscription
-                    if not await rate_limiter.acquire():
-                        await asyncio.sleep(5)
-                        continue
-                        
-                    try:
-                        await ws.send(json.dumps(subscription))
-                        response = await ws.recv()
-                        resp_data = json.loads(response)
-                        
-                        if "error" in resp_data:
+                filters = log_filters()
+                # Logs notified while later filters are still being subscribed
+                early_logs = []
+                for subscription_filter in filters:
+                    subscription = {
+                        "jsonrpc": "2.0",
+                        "id": 1,
+                        "method": "eth_subscribe",
+                        "params": ["logs", subscription_filter]
+                    }
+
+                    while True:  # Retry loop for subscription
+                        if not await rate_limiter.acquire():
+                            await asyncio.sleep(5)
+                            continue
+                            
+                        try:
+                            await ws.send(json.dumps(subscription))
+                            resp_data = json.loads(await ws.recv())
+                            while resp_data.get("method") == "eth_subscription":
+                                early_logs.append(resp_data["params"]["result"])
+                                resp_data = json.loads(await ws.recv())
+                            
+                            if "error" in resp_data:
+                                rate_limiter._handle_failure()
+                                if resp_data["error"].get("code") == -32007:
+                                    await asyncio.sleep(10)
+                                    continue
+                                raise Exception(resp_data["error"])
+                            
+                            rate_limiter._handle_success()
+                            break  # Successfully subscribed
+                            
+                        except Exception as e:
+                            logger.error("Subscription attempt failed: %s", e)
                             rate_limiter._handle_failure()
-                            if resp_data["error"].get("code") == -32007:
-                                await asyncio.sleep(10)
-                                continue
-                            raise Exception(resp_data["error"])
-                        
-                        rate_limiter._handle_success()
-                        break  # Successfully subscribed
-                        
-                    except Exception as e:
-                        logger.error(f"Subscription attempt failed: {e}")
-                        rate_limiter._handle_failure()
-                        await asyncio.sleep(5)
+                            await asyncio.sleep(5)
                 
+                if on_subscribed:
+                    on_subscribed()
                 if not CLEAN_MODE:
-                    logger.info("Successfully subscribed to V2 and V3 events. Listening for new pairs/pools...")
+                    logger.info("Subscribed to %d factories in %d subscription(s). Listening for new pairs/pools...",
+                                len(factory_registry), len(filters))
+                received_ns = time.time_ns()
+                for log in early_logs:
+                    await _submit_when_reading(processor, reading, (log, received_ns, received_ns))
+
+                # Resume from the journal: fetch anything created while we were disconnected.
+                # The resume block is fetched again, in case only part of it was journaled;
+                # pools already handled are skipped by the recent_logs check
+                if journal and journal.resume_block:
+                    notified = await _request_backfill(ws, rate_limiter, filters, journal.resume_block)
+                    received_ns = time.time_ns()
+                    for log in notified:
+                        await _submit_when_reading(processor, reading, (log, received_ns, received_ns))
 
                 # Event listening loop
                 while True:
                     try:
+                        if not reading.is_set():
+                            await reading.wait()
                         message = await ws.recv()
-                        event_data = json.loads(message)
+                        received_ns = time.time_ns()
+                        
+                        if shards:
+                            payload = encode_payload(message, received_ns)
+                            submitted = time.perf_counter()
+                            pending = await shards.submit(payload, partition_key(payload, SHARD_PARTITION))
+                            task = asyncio.create_task(_queue_shard_output(processor, pending, submitted))
+                            _shard_decodes.add(task)
+                            task.add_done_callback(_shard_decodes.discard)
+                            continue
+                        
+                        with decode_latency.time():
+                            event_data = json.loads(message)
+                        decoded_ns = time.time_ns()
 
                         if event_data.get("params") and event_data["params"].get("result"):
-                            log = event_data["params"]["result"]
-                            address = str(log["address"]).lower()
-                            
-                            # Use lambda for handler lookup and execution
-                            handler = event_handlers.get(address)
-                            if handler:
-                                await handler(log)
+                            await processor.submit((event_data["params"]["result"], received_ns, decoded_ns))
+                        elif event_data.get("id") == BACKFILL_REQUEST_ID:
+                            if "error" in event_data:
+                                logger.error("Journal backfill failed: %s", event_data["error"])
+                            for log in event_data.get("result") or []:
+                                await _submit_when_reading(processor, reading, (log, received_ns, decoded_ns))
 
                     except websockets.exceptions.ConnectionClosed as e:
-                        logger.error(f"Connection closed: {e}")
+                        logger.error("Connection closed: %s", e)
                         break
 
         except Exception as e:
-            logger.error(f"Error in event listener: {e}")
+            logger.error("Error in event listener: %s", e)
             rate_limiter._handle_failure()
             await asyncio.sleep(10)
 
+async def start_fanout_server():
+    server = FanoutServer(
+        path=FANOUT_SOCKET_PATH,
+        host=FANOUT_HOST,
+        port=FANOUT_PORT,
+        queue_size=FANOUT_QUEUE_SIZE,
+        policy=FANOUT_SLOW_CONSUMER_POLICY
+    )
+    await server.start()
+    pool_sinks.append(server.publish)
+    return server
+
+def open_journal():
+    journal = PoolJournal(
+        JOURNAL_DIR,
+        segment_records=JOURNAL_SEGMENT_RECORDS,
+        fsync=JOURNAL_FSYNC
+    )
+    pool_sinks.append(journal.append)
+    return journal
+
+async def start_pool_index_server():
+    index = PoolIndex()
+    graph = PoolGraph() if POOL_GRAPH_ENABLED else None
+    server = await PoolIndexServer(index, host=POOL_INDEX_HOST, port=POOL_INDEX_PORT, graph=graph,
+                                   max_path_visits=POOL_GRAPH_MAX_VISITS).start()
+    pool_sinks.append(index.add)
+    if graph is not None:
+        pool_sinks.append(graph.add)
+        metrics.gauge("pool_graph_tokens", lambda: graph.node_count, "Tokens in the pool graph")
+        metrics.gauge("pool_graph_pools", lambda: len(graph), "Pools in the pool graph")
+    return server
+
+def open_exporter():
+    exporter = ColumnarExporter(
+        EXPORT_DIR,
+        fmt=EXPORT_FORMAT,
+        row_group_size=EXPORT_ROW_GROUP_SIZE,
+        rotate_rows=EXPORT_ROTATE_ROWS,
+        rotate_seconds=EXPORT_ROTATE_SECONDS
+    ).start()
+    pool_sinks.append(exporter.append)
+    return exporter
+
+def start_tracer():
+    tracer = TraceRecorder(
+        capacity=TRACE_BUFFER_SIZE,
+        sample_rate=TRACE_SAMPLE_RATE,
+        slow_threshold_ms=TRACE_SLOW_THRESHOLD_MS,
+        stream_path=TRACE_STREAM_PATH
+    )
+    # `kill -USR1 <pid>` dumps the sampled traces on demand
+    if hasattr(signal, "SIGUSR1"):
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGUSR1,
+            lambda: logger.info("Dumped %d traces to %s", tracer.dump(TRACE_DUMP_PATH), TRACE_DUMP_PATH)
+        )
+    return tracer
+
+async def start_shard_pool():
+    shards = ShardPool(
+        "hex_flow_oracle.events.frame_decoder:decode_frame",
+        workers=SHARD_WORKERS,
+        slots=SHARD_SLOTS,
+        slot_size=SHARD_SLOT_SIZE
+    )
+    await shards.start()
+    metrics.gauge("shard_local_fallbacks", lambda: shards.local_fallbacks, "Frames too large for a shard slot")
+    return shards
+
+def start_enricher(rpc):
+    enricher = PoolEnricher(
+        Multicall(rpc, address=MULTICALL_ADDRESS),
+        window=ENRICHMENT_WINDOW,
+        approved_only=ENRICHMENT_APPROVED_ONLY,
+        on_result=lambda enrichment: logger.info("Enriched pool %s", json.dumps(enrichment.to_dict()))
+    )
+    metrics.gauge("enrichment_batches", lambda: enricher.batches, "Multicall round-trips made by PoolEnricher")
+    pool_sinks.append(enricher.submit)
+    return enricher
+
+def report_pool_activity(activity, kind):
+    metrics.inc("watchlist_events_total", help_text="Logs seen on watched pools, by kind", kind=kind)
+    if kind == "mint" and activity.mints == 1:
+        logger.info("First liquidity in pool %s at block %s", activity.pool.checksum, activity.first_liquidity_block)
+    elif kind == "rug":
+        logger.warning("Possible rug: liquidity drained from pool %s", activity.pool.checksum)
+
+def start_watchlist():
+    watchlist = PoolWatchlist(
+        window=WATCHLIST_WINDOW,
+        shard_capacity=WATCHLIST_ADDRESSES_PER_CONNECTION,
+        max_shards=WATCHLIST_MAX_CONNECTIONS,
+        rug_drop=WATCHLIST_RUG_DROP,
+        on_activity=report_pool_activity
+    ).start(quicknode_ws_url, WATCHLIST_UPDATE_INTERVAL)
+    metrics.gauge("watchlist_pools", lambda: len(watchlist), "Pools on the post-creation watchlist")
+    metrics.gauge("watchlist_connections", lambda: len(watchlist.shards), "Watchlist subscriptions")
+    pool_sinks.append(watchlist.submit)
+    return watchlist
+
+def start_mempool(rpc):
+    watcher = MempoolWatcher(
+        factory_registry.versions(),
+        security_cache,
+        ttl=MEMPOOL_PENDING_TTL,
+        max_pending=MEMPOOL_MAX_PENDING
+    ).start(quicknode_ws_url, rpc)
+    metrics.gauge("mempool_pending", lambda: len(watcher), "Pending pool creations not yet mined")
+    metrics.gauge("mempool_seen", lambda: watcher.seen, "Pool creations seen in the mempool")
+    metrics.gauge("mempool_matched", lambda: watcher.matched, "Mined pools matched to a pending transaction")
+    return watcher
+
+def start_honeypot_simulator(rpc):
+    if NETWORK not in HONEYPOT_ROUTERS:
+        raise ValueError(f"No HONEYPOT_ROUTERS entry for network {NETWORK!r}")
+    simulator = HoneypotSimulator(
+        rpc,
+        Multicall(rpc, address=MULTICALL_ADDRESS),
+        HONEYPOT_ROUTERS[NETWORK]["router"],
+        HONEYPOT_ROUTERS[NETWORK]["weth"],
+        amount_in=HONEYPOT_SIMULATION_AMOUNT,
+        window=HONEYPOT_SIMULATION_WINDOW
+    )
+    token_security.honeypot_simulator = simulator
+    token_security.honeypot_max_tax = HONEYPOT_MAX_TAX
+    metrics.gauge("honeypot_simulation_batches", lambda: simulator.batches, "Batched honeypot simulations run")
+    return simulator
+
+def build_container(rpc):
+    """Optional services, registered by type and started on demand"""
+    container = DIContainer()
+    container.register_instance(JsonRpcClient, rpc)
+    container.register(PoolEnricher, lambda: start_enricher(rpc))
+    container.register(PoolWatchlist, start_watchlist)
+    container.register(MempoolWatcher, lambda: start_mempool(rpc))
+    container.register(HoneypotSimulator, lambda: start_honeypot_simulator(rpc))
+    container.register(TraceRecorder, start_tracer)
+    container.register(MetricsServer, lambda: MetricsServer(host=METRICS_HOST, port=METRICS_PORT).start())
+    container.register(FanoutServer, start_fanout_server)
+    container.register(PoolJournal, open_journal)
+    container.register(PoolIndexServer, start_pool_index_server)
+    container.register(ColumnarExporter, open_exporter)
+    container.register(NetworkThread, lambda: NetworkThread().start())
+
+    async def start_shards():
+        # Shard results are read by whichever loop owns the sockets
+        network = container.get(NetworkThread)
+        return await (network.run(start_shard_pool()) if network else start_shard_pool())
+    container.register(ShardPool, start_shards)
+    return container
+
+def enabled_services():
+    return [
+        service for service, enabled in (
+            (TraceRecorder, TRACE_ENABLED),
+            (MetricsServer, METRICS_ENABLED),
+            (FanoutServer, FANOUT_ENABLED),
+            (PoolJournal, JOURNAL_ENABLED),
+            (PoolIndexServer, POOL_INDEX_ENABLED),
+            (ColumnarExporter, EXPORT_ENABLED),
+            (NetworkThread, NETWORK_THREAD_ENABLED),
+            (PoolEnricher, ENRICHMENT_ENABLED),
+            (PoolWatchlist, WATCHLIST_ENABLED),
+            (MempoolWatcher, MEMPOOL_ENABLED),
+            (HoneypotSimulator, HONEYPOT_SIMULATION_ENABLED),
+        )
+        if enabled
+    ]
+
+async def close_services(container):
+    shards, network = container.get(ShardPool), container.get(NetworkThread)
+    if shards:
+        await (network.run(shards.close()) if network else shards.close())
+    if network:
+        await network.stop()
+    if container.get(TraceRecorder):
+        container.get(TraceRecorder).close()
+    if container.get(MetricsServer):
+        await container.get(MetricsServer).close()
+    exporter = container.get(ColumnarExporter)
+    if exporter:
+        pool_sinks.remove(exporter.append)
+        exporter.close()
+    pool_index_server = container.get(PoolIndexServer)
+    if pool_index_server:
+        pool_sinks.remove(pool_index_server.index.add)
+        if pool_index_server.graph is not None:
+            pool_sinks.remove(pool_index_server.graph.add)
+        await pool_index_server.close()
+    journal = container.get(PoolJournal)
+    if journal:
+        pool_sinks.remove(journal.append)
+        journal.close()
+    if container.get(MempoolWatcher):
+        await container.get(MempoolWatcher).close()
+    simulator = container.get(HoneypotSimulator)
+    if simulator:
+        token_security.honeypot_simulator = None
+        await simulator.close()
+    watchlist = container.get(PoolWatchlist)
+    if watchlist:
+        pool_sinks.remove(watchlist.submit)
+        await watchlist.close()
+    enricher = container.get(PoolEnricher)
+    if enricher:
+        pool_sinks.remove(enricher.submit)
+        await enricher.close()
+    fanout_server = container.get(FanoutServer)
+    if fanout_server:
+        pool_sinks.remove(fanout_server.publish)
+        await fanout_server.close()
+
+async def warm_security_cache():
+    results = await asyncio.gather(*(security_cache.get_or_check(token) for token in STARTUP_WARM_TOKENS))
+    logger.info("Warmed security cache with %d of %d tokens", sum(r is not None for r in results), len(results))
+
 async def main():
-    await listen_for_pair_created_events()
+    rpc = JsonRpcClient(RPC_HTTP_URL)
+    container = build_container(rpc)
+    startup = StartupOrchestrator()
+    subscribed = asyncio.Event()
+    listener = None
+
+    async def start_services():
+        await container.resolve_all(*enabled_services())
+        if SHARDING_ENABLED:
+            # Needs the network thread, if any, to be running first
+            await container.resolve(ShardPool)
+
+    async def subscribe():
+        nonlocal listener
+        network = container.get(NetworkThread)
+        loop = asyncio.get_running_loop()
+        listener = asyncio.create_task(listen_for_pair_created_events(
+            container.get(PoolJournal),
+            container.get(TraceRecorder),
+            container.get(ShardPool),
+            network,
+            (lambda: loop.call_soon_threadsafe(subscribed.set)) if network else subscribed.set,
+            container.get(MempoolWatcher)
+        ))
+        waiter = asyncio.ensure_future(subscribed.wait())
+        await asyncio.wait({listener, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        if listener.done():
+            waiter.cancel()
+            listener.result()
+
+    startup.add_step("services", start_services)
+    startup.add_step("subscribe", subscribe, depends_on=["services"])
+    if VALIDATE_FACTORIES:
+        startup.add_step("validate", lambda: validate_factories(
+            rpc, CHAIN_ID, FACTORIES, ValidationCache(VALIDATION_CACHE_PATH)
+        ))
+    if STARTUP_WARM_TOKENS:
+        startup.add_step("warm", warm_security_cache, required=False)
+
+    try:
+        await startup.run()
+        await listener
+    finally:
+        if listener and not listener.done():
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+        await startup.shutdown()
+        await close_services(container)
+        await rpc.close()
+
+async def run_profiled(duration, output_dir):
+    """Run the oracle for ``duration`` seconds under the sampling profiler"""
+    profiler = LoopProfiler(output_dir)
+    profiler.start()
+    task = asyncio.create_task(main())
+    done, _ = await asyncio.wait({task}, timeout=duration)
+    if not done:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    collapsed_path, summary_path = await profiler.stop()
+    print(f"Profile written to {collapsed_path} and {summary_path}", file=sys.stderr)
+
+def install_event_loop():
+    """Switch to uvloop when it is installed and enabled; returns whether it is in use"""
+    if not USE_UVLOOP:
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+def cli(argv=None):
+    """Console entry point for ``hex-flow-oracle``"""
+    parser = argparse.ArgumentParser(prog="hex-flow-oracle")
+    parser.add_argument(
+        "--profile", type=float, metavar="SECONDS",
+        help="run under the sampling profiler for SECONDS, then write a collapsed-stack "
+             "flamegraph file and a loop-lag/slow-callback summary"
+    )
+    parser.add_argument("--profile-dir", default="profile", help="where --profile writes its reports")
+    args = parser.parse_args(argv)
+    if install_event_loop():
+        logger.info("Using uvloop event loop")
+
+    if args.profile:
+        asyncio.run(run_profiled(args.profile, args.profile_dir))
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    cli()
+ 
\ No newline at end of file
@@ -1,13 +1,98 @@
+import atexit
+import json
 import logging
-from datetime import datetime
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime, timezone
+
+from ..config import (
+    LOG_DIR,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_ROTATE_SECONDS
+)
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields"""
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({
+            key: value for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        })
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file exceeds ``maxBytes`` or is older than ``interval`` seconds"""
+    def __init__(self, filename, maxBytes, backupCount, interval):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record):
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records untouched so message formatting happens on the listener thread"""
+    def prepare(self, record):
+        return record
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(f'events_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
-            logging.StreamHandler()
-        ]
+    """Route all logging through a queue drained by a background listener thread.
+
+    Callers only pay for enqueueing a LogRecord; %-style arguments are merged,
+    formatted and written to the rotating file and console off the event loop.
+    Safe to call more than once.
+    """
+    global _listener
+    logger = logging.getLogger('hex_flow_oracle')
+    if _listener is not None:
+        return logger
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    file_handler = SizeAndTimeRotatingFileHandler(
+        os.path.join(LOG_DIR, LOG_FILE),
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        interval=LOG_ROTATE_SECONDS
     )
-    return logging.getLogger('hex_flow_oracle') 
\ No newline at end of file
+    file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    return logger
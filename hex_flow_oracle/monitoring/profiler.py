@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from .metrics import LatencyHistogram
+
+_SLOW_CALLBACK = re.compile(r"Executing (?P<callback>.+) took (?P<seconds>[\d.]+) seconds")
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread.
+
+    Stacks are aggregated in collapsed form (``outer;inner;leaf count``), which
+    flamegraph.pl, speedscope and inferno all read directly.
+    """
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="hex-flow-profiler", daemon=True)
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit=25):
+        """(function, self samples, inclusive samples), by self time"""
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+        return [(name, samples, inclusive[name]) for name, samples in own.most_common(limit)]
+
+class _SlowCallbackCollector(logging.Handler):
+    """Collects asyncio debug-mode "Executing <callback> took N seconds" warnings"""
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.callbacks = []
+
+    def emit(self, record):
+        match = _SLOW_CALLBACK.search(record.getMessage())
+        if match:
+            self.callbacks.append((float(match.group("seconds")), match.group("callback")))
+
+class LoopProfiler:
+    """Sampling profiler, event-loop lag monitor and slow-callback report for one run"""
+    def __init__(self, output_dir="profile", interval=0.005, lag_interval=0.01, slow_callback_duration=0.05):
+        self.output_dir = output_dir
+        self.lag_interval = lag_interval
+        self.slow_callback_duration = slow_callback_duration
+        self.sampler = SamplingProfiler(interval=interval)
+        self.lag = LatencyHistogram()
+        self.slow_callbacks = _SlowCallbackCollector()
+        self._lag_task = None
+        self._started = None
+
+    async def _measure_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag.record(max(0.0, loop.time() - scheduled))
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback_duration
+        logging.getLogger("asyncio").addHandler(self.slow_callbacks)
+        self._started = time.perf_counter()
+        self.sampler.start()
+        self._lag_task = asyncio.create_task(self._measure_lag())
+
+    async def stop(self):
+        elapsed = time.perf_counter() - self._started
+        self.sampler.stop()
+        self._lag_task.cancel()
+        await asyncio.gather(self._lag_task, return_exceptions=True)
+        asyncio.get_running_loop().set_debug(False)
+        logging.getLogger("asyncio").removeHandler(self.slow_callbacks)
+        return self.write_reports(elapsed)
+
+    def write_reports(self, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        collapsed_path = os.path.join(self.output_dir, "profile.collapsed")
+        summary_path = os.path.join(self.output_dir, "profile-summary.txt")
+        self.sampler.write_collapsed(collapsed_path)
+
+        lines = [
+            f"Profiled {elapsed:.1f}s, {self.sampler.samples} stack samples "
+            f"every {self.sampler.interval * 1000:.1f}ms",
+            "",
+            f"Event-loop lag over {self.lag.count} probes every {self.lag_interval * 1000:.0f}ms:",
+        ]
+        for q in (0.5, 0.9, 0.99, 0.999):
+            lines.append(f"  p{q * 100:g}: {self.lag.percentile(q) * 1000:.2f}ms")
+        lines.append(f"  max: {self.lag.max * 1000:.2f}ms")
+        lines += ["", f"Slow callbacks (> {self.slow_callback_duration * 1000:.0f}ms): {len(self.slow_callbacks.callbacks)}"]
+        for seconds, callback in sorted(self.slow_callbacks.callbacks, reverse=True)[:20]:
+            lines.append(f"  {seconds * 1000:8.1f}ms  {callback}")
+        lines += ["", "Top functions by self samples (self, inclusive):"]
+        total = max(self.sampler.samples, 1)
+        for name, own, inclusive in self.sampler.top_functions():
+            lines.append(f"  {own / total:6.1%} {inclusive / total:6.1%}  {name}")
+
+        with open(summary_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return collapsed_path, summary_path
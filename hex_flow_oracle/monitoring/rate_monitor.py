@@ -1,4 +1,3 @@
-from tqdm import tqdm
 import asyncio
 import time
 from collections import deque
@@ -11,6 +10,7 @@ class RateMonitor:
         self.requests = deque()
         self.alert_threshold = alert_threshold
         self.format_description = format_description
+        from tqdm import tqdm  # Deferred: only needed once a rate limiter exists
         self.pbar = tqdm(
             total=15,
             desc=format_description(0),
@@ -0,0 +1,121 @@
+import json
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Trace of the pool event being handled by the current task, if tracing is on
+current_trace: ContextVar[Optional["TraceContext"]] = ContextVar("current_trace", default=None)
+# Span currently open in that trace, so nested code (e.g. executor hops) can annotate it
+current_span: ContextVar[Optional[dict]] = ContextVar("current_span", default=None)
+
+class TraceContext:
+    """Timeline of one pool event from provider receive to emission (wall-clock ns)"""
+    __slots__ = ("received_ns", "block_number", "block_timestamp", "marks", "spans", "finished_ns")
+
+    def __init__(self, received_ns: int):
+        self.received_ns = received_ns
+        self.block_number = None
+        self.block_timestamp = None
+        self.marks = []
+        self.spans = []
+        self.finished_ns = None
+
+    def attach_log(self, log):
+        """Pick block number and, where the provider sends it, block timestamp off the log"""
+        if log.get("blockNumber"):
+            self.block_number = int(log["blockNumber"], 16)
+        if log.get("blockTimestamp"):
+            self.block_timestamp = int(log["blockTimestamp"], 16)
+
+    def mark(self, name: str):
+        self.marks.append((name, time.time_ns()))
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.finished_ns or time.time_ns()
+        return (end - self.received_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        relative = lambda ns: round((ns - self.received_ns) / 1e6, 3) if ns else None
+        return {
+            "block_number": self.block_number,
+            "block_timestamp": self.block_timestamp,
+            # Provider-side delay: block time to our receive time
+            "block_to_receive_ms": (self.received_ns / 1e6 - self.block_timestamp * 1e3)
+                                   if self.block_timestamp else None,
+            "received_ns": self.received_ns,
+            "total_ms": round(self.duration_ms, 3),
+            "marks": {name: relative(ns) for name, ns in self.marks},
+            "spans": [
+                {
+                    "name": span["name"],
+                    "start_ms": relative(span["start"]),
+                    "end_ms": relative(span.get("end")),
+                    # Time spent queued for a default-executor thread before running
+                    "executor_wait_ms": round((span["executor_start"] - span["start"]) / 1e6, 3)
+                                        if "executor_start" in span else None,
+                }
+                for span in self.spans
+            ],
+        }
+
+@contextmanager
+def traced(name: str):
+    """Record a span on the current trace; a no-op when no trace is active"""
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    span = {"name": name, "start": time.time_ns()}
+    trace.spans.append(span)
+    token = current_span.set(span)
+    try:
+        yield span
+    finally:
+        span["end"] = time.time_ns()
+        current_span.reset(token)
+
+def mark(name: str):
+    trace = current_trace.get()
+    if trace is not None:
+        trace.mark(name)
+
+class TraceRecorder:
+    """Samples completed traces into a ring buffer and optionally streams them to a file.
+
+    Traces slower than ``slow_threshold_ms`` are always kept; the rest are kept
+    with probability ``sample_rate``.
+    """
+    def __init__(self, capacity=1000, sample_rate=0.01, slow_threshold_ms=500.0, stream_path=None):
+        self.traces = deque(maxlen=capacity)
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self._stream = open(stream_path, "a", buffering=1 << 16) if stream_path else None
+
+    def start(self, received_ns: Optional[int] = None) -> TraceContext:
+        trace = TraceContext(received_ns or time.time_ns())
+        current_trace.set(trace)
+        return trace
+
+    def finish(self, trace: TraceContext):
+        trace.finished_ns = time.time_ns()
+        current_trace.set(None)
+        if trace.duration_ms >= self.slow_threshold_ms or random.random() < self.sample_rate:
+            self.traces.append(trace)
+            if self._stream:
+                self._stream.write(json.dumps(trace.to_dict()) + "\n")
+
+    def dump(self, path: str) -> int:
+        """Write the buffered traces as JSON lines; returns how many were written"""
+        traces = list(self.traces)
+        with open(path, "w") as f:
+            for trace in traces:
+                f.write(json.dumps(trace.to_dict()) + "\n")
+        return len(traces)
+
+    def close(self):
+        if self._stream:
+            self._stream.close()
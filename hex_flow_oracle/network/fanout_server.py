@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Set
+
+from ..output.binary_format import PoolRecord, read_records_async
+
+logger = logging.getLogger('hex_flow_oracle')
+
+class SlowConsumerPolicy(Enum):
+    DROP = "drop"              # Discard new records while the subscriber queue is full
+    DISCONNECT = "disconnect"  # Close the subscriber connection
+
+@dataclass
+class SubscriberFilter:
+    """Optional per-subscriber filter; ``None`` fields match everything"""
+    chain_ids: Optional[Set[int]] = None
+    fee_tiers: Optional[Set[int]] = None
+    base_tokens: Optional[Set[bytes]] = None
+
+    def matches(self, record: PoolRecord) -> bool:
+        if self.chain_ids is not None and record.chain_id not in self.chain_ids:
+            return False
+        if self.fee_tiers is not None and record.fee not in self.fee_tiers:
+            return False
+        if self.base_tokens is not None and \
+                record.token0 not in self.base_tokens and record.token1 not in self.base_tokens:
+            return False
+        return True
+
+    @classmethod
+    def from_request(cls, request: dict) -> "SubscriberFilter":
+        to_set = lambda key, convert: {convert(v) for v in request[key]} if request.get(key) else None
+        return cls(
+            chain_ids=to_set("chain_id", int),
+            fee_tiers=to_set("fee", int),
+            base_tokens=to_set("base_token", lambda addr: bytes.fromhex(addr[2:] if addr.startswith("0x") else addr))
+        )
+
+class Subscriber:
+    def __init__(self, writer, record_filter: SubscriberFilter, queue_size: int, policy: SlowConsumerPolicy):
+        self.writer = writer
+        self.filter = record_filter
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.sent = 0
+
+    def offer(self, record: PoolRecord, frame: bytes) -> bool:
+        """Queue a frame without blocking; returns False if the subscriber must be disconnected"""
+        if not self.filter.matches(record):
+            return True
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return self.policy is SlowConsumerPolicy.DROP
+        return True
+
+    async def pump(self):
+        """Write queued frames to the socket until cancelled or the peer goes away"""
+        while True:
+            frame = await self.queue.get()
+            self.writer.write(frame)
+            await self.writer.drain()
+            self.sent += 1
+
+class FanoutServer:
+    """Pushes approved pools to many local subscribers over a unix or TCP socket.
+
+    Subscribers may send one JSON line after connecting, e.g.
+    ``{"chain_id": [1], "fee": [500, 3000], "base_token": ["0x..."], "policy": "disconnect"}``,
+    and then receive length-prefixed ``PoolRecord`` frames. Each subscriber has its own
+    bounded queue so a slow reader never delays the oracle or other subscribers.
+    """
+    def __init__(self, path=None, host="127.0.0.1", port=8765, queue_size=1000,
+                 policy=SlowConsumerPolicy.DROP, handshake_timeout=1.0):
+        self.path = path
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.policy = SlowConsumerPolicy(policy)
+        self.handshake_timeout = handshake_timeout
+        self.subscribers = {}
+        self._server = None
+
+    async def start(self):
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        logger.info("Fan-out server listening on %s", self.path or f"{self.host}:{self.port}")
+        return self
+
+    def publish(self, record: PoolRecord):
+        """Fan an approved pool out to every matching subscriber"""
+        if not record.approved or not self.subscribers:
+            return
+        frame = record.to_frame()
+        for subscriber, task in list(self.subscribers.items()):
+            if not subscriber.offer(record, frame):
+                logger.warning("Disconnecting slow fan-out subscriber after %d dropped records", subscriber.dropped)
+                task.cancel()
+
+    async def _handle_client(self, reader, writer):
+        policy = self.policy
+        record_filter = SubscriberFilter()
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.handshake_timeout)
+            if line.strip():
+                request = json.loads(line)
+                record_filter = SubscriberFilter.from_request(request)
+                policy = SlowConsumerPolicy(request.get("policy", policy.value))
+        except asyncio.TimeoutError:
+            pass
+        except (ValueError, TypeError) as e:
+            logger.error("Rejecting fan-out subscriber with bad request: %s", e)
+            writer.close()
+            return
+
+        subscriber = Subscriber(writer, record_filter, self.queue_size, policy)
+        task = asyncio.current_task()
+        self.subscribers[subscriber] = task
+        # Detect disconnects even while nothing is being published
+        eof_watch = asyncio.create_task(reader.read())
+        eof_watch.add_done_callback(lambda _: task.cancel())
+        try:
+            await subscriber.pump()
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            eof_watch.cancel()
+            self.subscribers.pop(subscriber, None)
+            writer.close()
+
+    async def close(self):
+        for task in list(self.subscribers.values()):
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+async def subscribe(path=None, host="127.0.0.1", port=8765, **request):
+    """Client helper: connect to a fan-out server and yield ``PoolRecord``s"""
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    try:
+        async for record in read_records_async(reader):
+            yield record
+    finally:
+        writer.close()
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from ..monitoring.metrics import LatencyHistogram
+
+class NetworkThread:
+    """Private event loop on a background thread for provider sockets.
+
+    Keeps ``ws.recv()`` and keep-alive pings responsive while the processing
+    loop is busy with handlers, output formatting or garbage collection.
+    """
+    def __init__(self, name="hex-flow-network"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def start(self) -> "NetworkThread":
+        self._thread.start()
+        return self
+
+    def run(self, coro: Awaitable) -> asyncio.Future:
+        """Run a coroutine on the network loop; await the result from any other loop"""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def call_soon(self, callback: Callable, *args):
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def _cancel_all(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stop(self):
+        if not self._thread.is_alive():
+            return
+        await self.run(self._cancel_all())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+
+class ThreadHandoff:
+    """Hands items from the network thread to a coroutine on the processing loop.
+
+    The producer side is a lock-free ``deque.append`` plus, only when no drain
+    is already pending, one ``call_soon_threadsafe`` wakeup; the processing loop
+    drains everything queued in one pass. Time from ``put`` to delivery is
+    recorded in ``latency``.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, deliver: Callable[[Any], Awaitable],
+                 latency: Optional[LatencyHistogram] = None):
+        self.loop = loop
+        self.deliver = deliver
+        self.latency = latency or LatencyHistogram()
+        self._items = deque()
+        self._wakeup_pending = False
+        self._drain_task = None
+        self.handed_off = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        """Queue an item; safe to call from any thread"""
+        self._items.append((time.perf_counter(), item))
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            self.loop.call_soon_threadsafe(self._wake)
+
+    async def submit(self, item) -> bool:
+        """``EventProcessor.submit`` stand-in for code running on the network loop"""
+        self.put(item)
+        return True
+
+    def _wake(self):
+        self._wakeup_pending = False
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = self.loop.create_task(self._drain())
+
+    async def _drain(self):
+        while self._items:
+            enqueued, item = self._items.popleft()
+            self.latency.record(time.perf_counter() - enqueued)
+            self.handed_off += 1
+            await self.deliver(item)
+
+    async def close(self):
+        if self._drain_task:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
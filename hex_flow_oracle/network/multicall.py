@@ -0,0 +1,112 @@
+"""Multicall3 ``aggregate3`` batching over JSON-RPC.
+
+Calls are packed into ``aggregate3`` calls of at most ``chunk_size`` entries
+each, and all chunks go out as one JSON-RPC batch, so any number of contract
+reads costs one HTTP round-trip. Every call is made with ``allowFailure``, so
+one reverting token does not fail the others.
+"""
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from ..core.address import to_address
+
+# Deployed at the same address on every major EVM chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+
+class Call3(NamedTuple):
+    target: bytes
+    call_data: bytes
+    allow_failure: bool = True
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+def _padded(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 32)
+
+def encode_aggregate3(calls: Sequence[Call3]) -> bytes:
+    """Calldata for ``aggregate3((address,bool,bytes)[])``"""
+    encoded = []
+    for call in calls:
+        encoded.append(
+            b"\0" * 12 + bytes(to_address(call.target)) +
+            _word(1 if call.allow_failure else 0) +
+            _word(0x60) +
+            _word(len(call.call_data)) +
+            _padded(call.call_data)
+        )
+    # Tuple offsets are relative to the first word after the array length
+    offsets, position = [], 32 * len(encoded)
+    for tuple_data in encoded:
+        offsets.append(_word(position))
+        position += len(tuple_data)
+    return AGGREGATE3_SELECTOR + _word(0x20) + _word(len(calls)) + b"".join(offsets) + b"".join(encoded)
+
+def _read_word(data: bytes, offset: int) -> int:
+    return int.from_bytes(data[offset:offset + 32], "big")
+
+def decode_aggregate3(data: bytes) -> List[Tuple[bool, bytes]]:
+    """``(success, returnData)`` pairs from an ``aggregate3`` result"""
+    array = _read_word(data, 0)
+    count = _read_word(data, array)
+    base = array + 32
+    results = []
+    for i in range(count):
+        start = base + _read_word(data, base + 32 * i)
+        success = _read_word(data, start) != 0
+        data_start = start + _read_word(data, start + 32)
+        length = _read_word(data, data_start)
+        results.append((success, data[data_start + 32:data_start + 32 + length]))
+    return results
+
+class Multicall:
+    """Runs contract reads through Multicall3; ``rpc`` needs ``batch(calls)`` like JsonRpcClient"""
+    def __init__(self, rpc, address: str = MULTICALL3_ADDRESS, chunk_size: int = 200):
+        self.rpc = rpc
+        self.address = str(to_address(address))
+        self.chunk_size = chunk_size
+
+    async def aggregate(self, calls: Sequence[Call3], block: str = "latest",
+                        overrides: Optional[dict] = None) -> List[Tuple[bool, bytes]]:
+        """Results in call order; a chunk whose eth_call fails marks all its calls failed.
+        ``overrides`` is an ``eth_call`` state override set applied to every chunk."""
+        chunks = [calls[i:i + self.chunk_size] for i in range(0, len(calls), self.chunk_size)]
+        extra = [overrides] if overrides else []
+        replies = await self.rpc.batch([
+            ("eth_call", [{"to": self.address, "data": "0x" + encode_aggregate3(chunk).hex()}, block] + extra)
+            for chunk in chunks
+        ])
+        results = []
+        for chunk, reply in zip(chunks, replies):
+            if isinstance(reply, Exception):
+                results.extend((False, b"") for _ in chunk)
+            else:
+                results.extend(decode_aggregate3(bytes.fromhex(reply[2:])))
+        return results
+
+# ABI decoding of the single return values read by the enrichment stage
+
+def decode_uint(data: bytes, index: int = 0) -> Optional[int]:
+    if len(data) < 32 * (index + 1):
+        return None
+    return _read_word(data, 32 * index)
+
+def decode_int(data: bytes, index: int = 0, bits: int = 256) -> Optional[int]:
+    value = decode_uint(data, index)
+    if value is None:
+        return None
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+def decode_string(data: bytes) -> Optional[str]:
+    """ABI ``string``, or the ``bytes32`` some early tokens (e.g. MKR) return instead"""
+    if len(data) == 32:
+        return data.rstrip(b"\0").decode("utf-8", "replace")
+    if len(data) < 64:
+        return None
+    offset = _read_word(data, 0)
+    length = _read_word(data, offset)
+    raw = data[offset + 32:offset + 32 + length]
+    if len(raw) != length:
+        return None
+    return raw.decode("utf-8", "replace")
@@ -35,7 +35,7 @@ class ExponentialBackoffStrategy:
         jitter = delay * self.config.jitter
         actual_delay = delay + (asyncio.get_event_loop().time() % jitter)
 
-        logging.debug(f"Retry attempt {self.attempt}, waiting {actual_delay:.2f}s")
+        logging.debug("Retry attempt %d, waiting %.2fs", self.attempt, actual_delay)
         await asyncio.sleep(actual_delay)
 
     async def handle_error(self, error: Exception) -> None:
@@ -45,7 +45,7 @@ class ExponentialBackoffStrategy:
             await self.wait()
         else:
             # Other errors might need different handling
-            logging.error(f"Unhandled error in retry strategy: {error}")
+            logging.error("Unhandled error in retry strategy: %s", error)
             raise error
 
     def reset(self) -> None:
@@ -0,0 +1,60 @@
+import itertools
+from typing import Any, List, Optional, Sequence, Tuple
+
+class RpcError(Exception):
+    def __init__(self, error: dict):
+        super().__init__(error.get("message", error))
+        self.code = error.get("code")
+
+class JsonRpcClient:
+    """Minimal JSON-RPC over HTTP for the few calls made outside the websocket"""
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._session = None
+        self.requests = 0
+
+    async def _get_session(self):
+        if self._session is None:
+            import aiohttp  # Deferred to keep `import hex_flow_oracle.main` fast
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def post(self, payload):
+        """Send one JSON-RPC request or batch and return the decoded reply"""
+        session = await self._get_session()
+        self.requests += 1
+        async with session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    def _request(self, method: str, params: Optional[list]) -> dict:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+
+    async def call(self, method: str, params: Optional[list] = None) -> Any:
+        reply = await self.post(self._request(method, params))
+        if "error" in reply:
+            raise RpcError(reply["error"])
+        return reply["result"]
+
+    async def batch(self, calls: Sequence[Tuple[str, list]]) -> List[Any]:
+        """Send several calls in one HTTP request; failed calls come back as RpcError instances"""
+        if not calls:
+            return []
+        requests = [self._request(method, params) for method, params in calls]
+        replies = await self.post(requests)
+        if isinstance(replies, dict):
+            # Some providers answer a rejected batch with a single error object
+            raise RpcError(replies.get("error", {"message": "Invalid batch response"}))
+        by_id = {reply.get("id"): reply for reply in replies}
+        results = []
+        for request in requests:
+            reply = by_id.get(request["id"], {"error": {"message": "Missing batch response"}})
+            results.append(RpcError(reply["error"]) if "error" in reply else reply["result"])
+        return results
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,141 @@
+"""Framed binary records for downstream trading consumers.
+
+Each frame is a little-endian ``u16`` payload length followed by the payload:
+
+    offset  size  field
+    0       1     format version (RECORD_VERSION)
+    1       1     factory version (2 or 3)
+    2       1     verdict flags (FLAG_*)
+    3       1     reserved
+    4       4     fee tier (0 for V2)
+    8       4     chain id
+    12      8     block number
+    20      8     receive timestamp, ns since epoch
+    28      20    token0
+    48      20    token1
+    68      20    pair / pool address
+
+Readers must honour the length prefix and ignore trailing payload bytes, so
+fields can be appended later without breaking existing consumers. This module
+has no dependencies outside the standard library and can be vendored as-is.
+"""
+import asyncio
+import struct
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Iterator
+
+RECORD_VERSION = 1
+
+FLAG_TOKEN0_TRUSTED = 0x01
+FLAG_TOKEN1_TRUSTED = 0x02
+FLAG_APPROVED = FLAG_TOKEN0_TRUSTED | FLAG_TOKEN1_TRUSTED
+
+_FRAME_HEADER = struct.Struct("<H")
+_PAYLOAD = struct.Struct("<BBBxIIQQ20s20s20s")
+
+RECORD_SIZE = _PAYLOAD.size
+FRAME_SIZE = _FRAME_HEADER.size + RECORD_SIZE
+
+
+@dataclass(frozen=True)
+class PoolRecord:
+    """Decoded pool creation event together with its security verdict"""
+    version: int
+    token0: bytes
+    token1: bytes
+    pool: bytes
+    fee: int = 0
+    chain_id: int = 1
+    block_number: int = 0
+    received_ns: int = 0
+    flags: int = 0
+
+    @property
+    def approved(self) -> bool:
+        return self.flags & FLAG_APPROVED == FLAG_APPROVED
+
+    @classmethod
+    def from_log(cls, log, version, token0_trusted, token1_trusted,
+                 chain_id=1, received_ns=0):
+        """Build a record straight from a raw PairCreated/PoolCreated log"""
+        topics = log["topics"]
+        flags = (FLAG_TOKEN0_TRUSTED if token0_trusted else 0) | \
+                (FLAG_TOKEN1_TRUSTED if token1_trusted else 0)
+        return cls(
+            version=version,
+            token0=bytes.fromhex(topics[1][26:]),
+            token1=bytes.fromhex(topics[2][26:]),
+            # V2 data is (pair, index); V3 data is (tickSpacing, pool)
+            pool=bytes.fromhex(log["data"][26:66] if version == 2 else log["data"][90:130]),
+            fee=int(topics[3], 16) if version == 3 else 0,
+            chain_id=chain_id,
+            block_number=int(log.get("blockNumber") or "0x0", 16),
+            received_ns=received_ns,
+            flags=flags,
+        )
+
+    def encode(self) -> bytes:
+        """Encode as a payload without the length prefix"""
+        return _PAYLOAD.pack(
+            RECORD_VERSION, self.version, self.flags, self.fee, self.chain_id,
+            self.block_number, self.received_ns, self.token0, self.token1, self.pool
+        )
+
+    def to_frame(self) -> bytes:
+        """Encode as a length-prefixed frame"""
+        return _FRAME_HEADER.pack(RECORD_SIZE) + self.encode()
+
+    @classmethod
+    def decode(cls, payload) -> "PoolRecord":
+        """Decode a payload (without the length prefix)"""
+        (record_version, version, flags, fee, chain_id, block_number,
+         received_ns, token0, token1, pool) = _PAYLOAD.unpack_from(payload)
+        if record_version != RECORD_VERSION:
+            raise ValueError(f"Unsupported record version {record_version}")
+        return cls(version, token0, token1, pool, fee, chain_id,
+                   block_number, received_ns, flags)
+
+
+def write_record(stream: BinaryIO, record: PoolRecord, flush: bool = True):
+    """Write one framed record to a binary stream"""
+    stream.write(record.to_frame())
+    if flush:
+        stream.flush()
+
+
+def iter_frames(buffer) -> Iterator[PoolRecord]:
+    """Decode every complete frame in a bytes-like buffer"""
+    view = memoryview(buffer)
+    offset = 0
+    while offset + _FRAME_HEADER.size <= len(view):
+        (length,) = _FRAME_HEADER.unpack_from(view, offset)
+        end = offset + _FRAME_HEADER.size + length
+        if end > len(view):
+            break
+        yield PoolRecord.decode(view[offset + _FRAME_HEADER.size:end])
+        offset = end
+
+
+def read_records(stream: BinaryIO) -> Iterator[PoolRecord]:
+    """Read framed records from a blocking binary stream until EOF"""
+    while True:
+        header = stream.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        (length,) = _FRAME_HEADER.unpack(header)
+        payload = stream.read(length)
+        if len(payload) < length:
+            return
+        yield PoolRecord.decode(payload)
+
+
+async def read_records_async(reader) -> AsyncIterator[PoolRecord]:
+    """Read framed records from an ``asyncio.StreamReader`` until EOF"""
+    while True:
+        try:
+            header = await reader.readexactly(_FRAME_HEADER.size)
+            (length,) = _FRAME_HEADER.unpack(header)
+            payload = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return
+        yield PoolRecord.decode(payload)
@@ -0,0 +1,103 @@
+"""On-chain validation of the configured factory contracts.
+
+A factory is valid if it has code and answers its version's probe calls. A
+successful validation is cached on disk under (chain id, address, keccak of
+the deployed code), so a restart costs one ``eth_getCode`` per factory and the
+probe calls are only repeated if the code at that address changes.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from ..core.address import to_address
+
+logger = logging.getLogger(__name__)
+
+# factory kind -> (eth_call data, check on the returned hex word)
+FACTORY_PROBES = {
+    "v2": [
+        ("0x574f2ba3", lambda result: len(result) >= 66),  # allPairsLength()
+        ("0x017e7e58", lambda result: len(result) >= 66),  # feeTo()
+    ],
+    "v3": [
+        ("0x8da5cb5b", lambda result: len(result) >= 66),  # owner()
+        # feeAmountTickSpacing(500) == 10; the 0.05% tier is shared by Uniswap and its forks
+        ("0x22afcccb" + f"{500:064x}", lambda result: len(result) >= 66 and int(result, 16) == 10),
+    ],
+}
+
+class ValidationCache:
+    """Successful factory validations, persisted as JSON"""
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, float] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable validation cache %s: %s", path, e)
+
+    @staticmethod
+    def key(chain_id: int, address, code_hash: str) -> str:
+        return f"{chain_id}:{to_address(address)}:{code_hash}"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def add(self, key: str):
+        self.entries[key] = time.time()
+        if not self.path:
+            return
+        # Write-then-rename so a crash mid-write never leaves a corrupt cache
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+def code_hash(code: str) -> str:
+    from eth_hash.auto import keccak  # Deferred: pulls in a hashing backend
+    return keccak(bytes.fromhex(code[2:])).hex()
+
+async def validate_factory(rpc, chain_id: int, kind: str, address, cache: ValidationCache) -> Tuple[bool, str]:
+    """Returns (valid, message) for one factory; ``rpc`` needs an async ``call(method, params)``"""
+    address = str(to_address(address))
+    try:
+        code = await rpc.call("eth_getCode", [address, "latest"])
+        if len(code) <= 2:
+            return False, "No contract code found at address"
+        key = ValidationCache.key(chain_id, address, code_hash(code))
+        if key in cache:
+            return True, "Contract validated (cached)"
+
+        probes = FACTORY_PROBES[kind]
+        results = await asyncio.gather(*(
+            rpc.call("eth_call", [{"to": address, "data": data}, "latest"])
+            for data, _ in probes
+        ))
+        for (data, check), result in zip(probes, results):
+            if not check(result):
+                return False, f"Unexpected result {result} for call {data[:10]}"
+        cache.add(key)
+        return True, "Contract validated successfully"
+    except Exception as e:
+        return False, f"Contract validation failed: {str(e)}"
+
+async def validate_factories(rpc, chain_id: int, factories: Dict[str, Tuple[str, str]], cache: ValidationCache):
+    """Validate ``{name: (kind, address)}`` concurrently; raises ValueError naming the first invalid one"""
+    factories = {name: (kind, address) for name, (kind, address) in factories.items() if address}
+    results = await asyncio.gather(*(
+        validate_factory(rpc, chain_id, kind, address, cache)
+        for kind, address in factories.values()
+    ))
+    for (name, (_, address)), (is_valid, message) in zip(factories.items(), results):
+        if not is_valid:
+            raise ValueError(f"Invalid {name} factory address on chain {chain_id}: {address}\nReason: {message}")
+        logger.info("%s factory (%s): %s", name, address, message)
+    return {name: valid for name, (valid, _) in zip(factories, results)}
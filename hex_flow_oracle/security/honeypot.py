@@ -0,0 +1,273 @@
+"""Buy/sell honeypot simulation through ``eth_call`` with state overrides.
+
+GoPlus often has no record of a token in its first blocks. This measures the
+token directly against its WETH pair on a V2 router, as a synthetic account
+funded through state overrides:
+
+1. One Multicall3 ``eth_call`` quotes the buy of every token and finds the
+   storage slots of its ``balanceOf``/``allowance`` mappings, by overriding
+   candidate slots with distinct values and reading them back. A second one
+   quotes selling the bought amounts.
+2. One JSON-RPC batch of ``eth_call``s buys and sells every token through the
+   router's fee-on-transfer swaps with decreasing ``amountOutMin``. The router
+   checks what actually arrived, so the strictest minimum that still succeeds
+   bounds the transfer tax; a sell that reverts even with no minimum means the
+   token cannot be sold.
+
+Each call runs against its own overridden state, so no trade affects another.
+Tokens are simulated together when they arrive within ``window`` seconds.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..core.address import Address, to_address
+from ..network.multicall import Call3, decode_uint
+
+logger = logging.getLogger(__name__)
+
+GET_AMOUNTS_OUT = bytes.fromhex("d06ca61f")  # getAmountsOut(uint256,address[])
+# swapExactETHForTokensSupportingFeeOnTransferTokens(uint256,address[],address,uint256)
+SWAP_EXACT_ETH_FOR_TOKENS = bytes.fromhex("b6f9de95")
+# swapExactTokensForETHSupportingFeeOnTransferTokens(uint256,uint256,address[],address,uint256)
+SWAP_EXACT_TOKENS_FOR_ETH = bytes.fromhex("791ac947")
+BALANCE_OF = bytes.fromhex("70a08231")
+ALLOWANCE = bytes.fromhex("dd62ed3e")
+
+# Arbitrary account with no code; only exists in the overridden state
+SYNTHETIC_ACCOUNT = to_address("0x00000000000000000000000000000000005eed00")
+# Slot probe values; a read-back of PROBE_BASE + i identifies candidate i
+PROBE_BASE = 0x5eed << 128
+PROBE_SLOTS = 16
+# Taxes tried, strictest first; 1.0 (no minimum) only asks whether the trade works at all
+TAX_STEPS = (0.0, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0)
+DEADLINE = 2**32 - 1
+MAX_UINT = 2**256 - 1
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+def _address_word(address) -> bytes:
+    return b"\0" * 12 + bytes(to_address(address))
+
+def _hex(value: int) -> str:
+    return "0x" + _word(value).hex()
+
+def _path(*addresses) -> bytes:
+    return _word(len(addresses)) + b"".join(_address_word(address) for address in addresses)
+
+def encode_get_amounts_out(amount_in: int, path) -> bytes:
+    return GET_AMOUNTS_OUT + _word(amount_in) + _word(0x40) + _path(*path)
+
+def encode_buy(amount_out_min: int, path, to) -> bytes:
+    return SWAP_EXACT_ETH_FOR_TOKENS + _word(amount_out_min) + _word(0x80) + _address_word(to) + \
+        _word(DEADLINE) + _path(*path)
+
+def encode_sell(amount_in: int, amount_out_min: int, path, to) -> bytes:
+    return SWAP_EXACT_TOKENS_FOR_ETH + _word(amount_in) + _word(amount_out_min) + _word(0xa0) + \
+        _address_word(to) + _word(DEADLINE) + _path(*path)
+
+def _keccak(data: bytes) -> bytes:
+    from eth_hash.auto import keccak  # Deferred: pulls in a hashing backend
+    return keccak(data)
+
+def mapping_slot(key, slot: int, vyper: bool = False) -> bytes:
+    """Storage key of ``mapping[key]`` for a mapping declared at ``slot``"""
+    if vyper:
+        return _keccak(_word(slot) + _address_word(key))
+    return _keccak(_address_word(key) + _word(slot))
+
+def nested_mapping_slot(key1, key2, slot: int, vyper: bool = False) -> bytes:
+    """Storage key of ``mapping[key1][key2]``"""
+    if vyper:
+        return _keccak(mapping_slot(key1, slot, vyper) + _address_word(key2))
+    return _keccak(_address_word(key2) + mapping_slot(key1, slot, vyper))
+
+# Candidate layouts: index i < PROBE_SLOTS is Solidity slot i, the rest Vyper
+LAYOUTS = [(slot, False) for slot in range(PROBE_SLOTS)] + [(slot, True) for slot in range(PROBE_SLOTS)]
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Measured trade behaviour; None fields could not be measured.
+
+    Taxes are upper bounds at the resolution of TAX_STEPS.
+    """
+    token: Address
+    buyable: Optional[bool] = None
+    sellable: Optional[bool] = None
+    buy_tax: Optional[float] = None
+    sell_tax: Optional[float] = None
+
+    @property
+    def conclusive(self) -> bool:
+        return self.buyable is False or self.sellable is not None
+
+    def is_safe(self, max_tax: float = 0.0) -> bool:
+        return bool(
+            self.buyable and self.sellable
+            and self.buy_tax is not None and self.buy_tax <= max_tax
+            and self.sell_tax is not None and self.sell_tax <= max_tax
+        )
+
+def _min_out(expected: int, tax: float) -> int:
+    # Integer arithmetic: a float product can round above the untaxed amount
+    return expected * round((1 - tax) * 10_000) // 10_000
+
+def _measured_tax(outcomes) -> Optional[float]:
+    """Smallest step whose trade succeeded, or None if none did"""
+    for step, reply in zip(TAX_STEPS, outcomes):
+        if not isinstance(reply, Exception):
+            return step
+    return None
+
+class HoneypotSimulator:
+    """Batched buy/sell simulation against V2 WETH pairs.
+
+    ``rpc`` needs ``batch(calls)`` like JsonRpcClient; ``multicall`` is a
+    Multicall over the same transport. ``amount_in`` is the wei spent on the
+    simulated buy.
+    """
+    def __init__(self, rpc, multicall, router, weth, amount_in=10**17, window=0.05):
+        self.rpc = rpc
+        self.multicall = multicall
+        self.router = to_address(router)
+        self.weth = to_address(weth)
+        self.amount_in = amount_in
+        self.window = window
+        self._pending: List[tuple] = []
+        self._flush_task = None
+        self.batches = 0
+
+    async def simulate(self, token) -> SimulationResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((to_address(token), future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        pending, self._pending, self._flush_task = self._pending, [], None
+        try:
+            results = await self.simulate_many(list(dict.fromkeys(token for token, _ in pending)))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for token, future in pending:
+            if not future.done():
+                future.set_result(results[token])
+
+    def _probe_overrides(self, tokens) -> dict:
+        overrides = {}
+        for token in tokens:
+            state = {}
+            for i, (slot, vyper) in enumerate(LAYOUTS):
+                state["0x" + mapping_slot(SYNTHETIC_ACCOUNT, slot, vyper).hex()] = _hex(PROBE_BASE + i)
+                state["0x" + nested_mapping_slot(SYNTHETIC_ACCOUNT, self.router, slot, vyper).hex()] = _hex(PROBE_BASE + i)
+            overrides[str(token)] = {"stateDiff": state}
+        return overrides
+
+    async def _probe(self, tokens) -> List[dict]:
+        """Buy/sell quotes and balance/allowance storage layout of each token"""
+        calls = []
+        for token in tokens:
+            calls += [
+                Call3(self.router, encode_get_amounts_out(self.amount_in, (self.weth, token))),
+                Call3(token, BALANCE_OF + _address_word(SYNTHETIC_ACCOUNT)),
+                Call3(token, ALLOWANCE + _address_word(SYNTHETIC_ACCOUNT) + _address_word(self.router)),
+            ]
+        results = await self.multicall.aggregate(calls, overrides=self._probe_overrides(tokens))
+
+        def layout(ok, data):
+            index = (decode_uint(data) or 0) - PROBE_BASE if ok else -1
+            return LAYOUTS[index] if 0 <= index < len(LAYOUTS) else None
+
+        probes = []
+        for i in range(len(tokens)):
+            (quote_ok, quote), balance, allowance = results[3 * i:3 * i + 3]
+            probes.append({
+                "expected_out": decode_uint(quote, 3) if quote_ok else None,
+                "balance": layout(*balance),
+                "allowance": layout(*allowance),
+            })
+        # Sell quotes need the bought amount, so they are read separately
+        sell_quote_calls = [
+            Call3(self.router, encode_get_amounts_out(probe["expected_out"], (token, self.weth)))
+            for token, probe in zip(tokens, probes) if probe["expected_out"]
+        ]
+        sell_quotes = iter(await self.multicall.aggregate(sell_quote_calls) if sell_quote_calls else [])
+        for probe in probes:
+            if probe["expected_out"]:
+                ok, data = next(sell_quotes)
+                probe["expected_sell_out"] = decode_uint(data, 3) if ok else None
+        return probes
+
+    def _trade_calls(self, token, probe) -> tuple:
+        """(buy calls, sell calls), one per TAX_STEPS entry"""
+        funded = {str(SYNTHETIC_ACCOUNT): {"balance": hex(self.amount_in * 2)}}
+        buys = [
+            ("eth_call", [{
+                "from": str(SYNTHETIC_ACCOUNT),
+                "to": str(self.router),
+                "value": hex(self.amount_in),
+                "data": "0x" + encode_buy(_min_out(probe["expected_out"], step), (self.weth, token), SYNTHETIC_ACCOUNT).hex(),
+            }, "latest", funded])
+            for step in TAX_STEPS
+        ]
+        if not (probe["balance"] and probe["allowance"] and probe.get("expected_sell_out")):
+            return buys, []
+        amount = probe["expected_out"]
+        holding = dict(funded)
+        holding[str(token)] = {"stateDiff": {
+            "0x" + mapping_slot(SYNTHETIC_ACCOUNT, *probe["balance"]).hex(): _hex(amount),
+            "0x" + nested_mapping_slot(SYNTHETIC_ACCOUNT, self.router, *probe["allowance"]).hex(): _hex(MAX_UINT),
+        }}
+        sells = [
+            ("eth_call", [{
+                "from": str(SYNTHETIC_ACCOUNT),
+                "to": str(self.router),
+                "data": "0x" + encode_sell(amount, _min_out(probe["expected_sell_out"], step),
+                                           (token, self.weth), SYNTHETIC_ACCOUNT).hex(),
+            }, "latest", holding])
+            for step in TAX_STEPS
+        ]
+        return buys, sells
+
+    async def simulate_many(self, tokens) -> Dict[Address, SimulationResult]:
+        tokens = [to_address(token) for token in tokens]
+        probes = await self._probe(tokens)
+        calls, spans = [], {}
+        for token, probe in zip(tokens, probes):
+            if probe["expected_out"] is None:
+                continue  # No WETH pair with liquidity on this router
+            buys, sells = self._trade_calls(token, probe)
+            spans[token] = (len(calls), len(buys), len(sells))
+            calls += buys + sells
+        replies = await self.rpc.batch(calls) if calls else []
+        self.batches += 1
+
+        results = {}
+        for token in tokens:
+            if token not in spans:
+                results[token] = SimulationResult(token)
+                continue
+            start, buys, sells = spans[token]
+            buy_tax = _measured_tax(replies[start:start + buys])
+            # Without a known storage layout the sell cannot be set up, so it stays unknown
+            sell_tax = _measured_tax(replies[start + buys:start + buys + sells]) if sells else None
+            results[token] = SimulationResult(
+                token,
+                buyable=buy_tax is not None,
+                sellable=(sell_tax is not None) if sells else None,
+                buy_tax=buy_tax,
+                sell_tax=sell_tax,
+            )
+        return results
+
+    async def close(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
@@ -1,24 +1,96 @@
 from time import time
 import asyncio
-from web3 import Web3
+from ..core.address import to_address
 from ..security.token_security import check_token_security
 
 class SecurityCache:
+    """Token verdicts keyed by interned Address, so every casing of a token shares one entry.
+
+    Failed lookups (``None``) are not cached, and concurrent lookups of the same
+    token share a single GoPlus request. ``prewarm`` checks tokens speculatively,
+    before their pool exists, and its verdicts are finished by ``get_or_check``
+    once the pool is mined.
+    """
     def __init__(self, ttl=3600, max_size=1000):
         self.cache = {}
         self.ttl = ttl
         self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        self._speculative = {}
+        # Speculative verdicts, which hold once the token's pool is mined
+        self.premined = {}
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
 
-    async def get_or_check(self, token_address: str):
+    def _store(self, address, result, now):
+        if result is None:
+            return
+        # Re-insert so dict order stays oldest-first, then evict beyond max_size
+        self.cache.pop(address, None)
+        self.cache[address] = (result, now)
+        if len(self.cache) > self.max_size:
+            del self.cache[next(iter(self.cache))]
+
+    async def get_or_check(self, token_address):
+        address = to_address(token_address)
         now = time()
-        if token_address in self.cache:
-            result, timestamp = self.cache[token_address]
-            if now - timestamp < self.ttl:
-                return result
+        entry = self.cache.get(address)
+        if entry is not None and now - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
         
-        result = await check_token_security(token_address)
-        self.cache[token_address] = (result, now)
-        return result
+        self.misses += 1
+        # Lookups come from mined pool logs, which settle the is_in_dex that a
+        # speculative verdict waived, so it is final
+        entry = self.premined.pop(address, None)
+        if entry is not None and now - entry[1] < self.ttl:
+            self._store(address, *entry)
+            return entry[0]
+        pending = self._inflight.get(address) or self._speculative.get(address)
+        if pending is None:
+            pending = self._inflight[address] = asyncio.ensure_future(self._check(address, now))
+        return await asyncio.shield(pending)
+
+    async def prewarm(self, token_address):
+        """Check a token whose pool is not mined yet (mempool mode).
+
+        GoPlus cannot report ``is_in_dex`` before the pool exists, so the verdict
+        waives it and is kept in ``premined`` until a mined lookup claims it.
+        """
+        address = to_address(token_address)
+        now = time()
+        for entry in (self.cache.get(address), self.premined.get(address)):
+            if entry is not None and now - entry[1] < self.ttl:
+                return entry[0]
+        pending = self._inflight.get(address) or self._speculative.get(address)
+        if pending is None:
+            pending = self._speculative[address] = asyncio.ensure_future(self._check_speculative(address, now))
+        return await asyncio.shield(pending)
+
+    async def _check_speculative(self, address, now):
+        try:
+            result = await check_token_security(str(address), in_dex=True)
+            if result is not None:
+                self.premined.pop(address, None)
+                self.premined[address] = (result, now)
+                if len(self.premined) > self.max_size:
+                    del self.premined[next(iter(self.premined))]
+            return result
+        finally:
+            del self._speculative[address]
+
+    async def _check(self, address, now):
+        try:
+            result = await check_token_security(str(address))
+            self._store(address, result, now)
+            return result
+        finally:
+            del self._inflight[address]
 
     async def cleanup(self):
         """Remove expired entries and trim cache size"""
@@ -35,26 +107,32 @@ class SecurityCache:
             
     async def _fetch_security_info(self, addresses):
         """Fetch security info for multiple addresses"""
-        tasks = [check_token_security(addr) for addr in addresses]
+        tasks = [check_token_security(str(addr)) for addr in addresses]
         return await asyncio.gather(*tasks)
 
     async def batch_check(self, token_addresses):
-        """Check multiple tokens at once"""
-        # Use map with lambda to transform addresses
-        checksum_addresses = list(map(lambda addr: Web3.to_checksum_address(addr), token_addresses))
+        """Check multiple tokens at once; results are keyed by checksum address"""
+        # Use map with lambda to canonicalize addresses
+        addresses = list(map(lambda addr: to_address(addr), token_addresses))
         
         # Use filter with lambda to find uncached tokens
-        uncached = list(filter(lambda addr: addr not in self.cache, checksum_addresses))
+        uncached = list(filter(lambda addr: addr not in self.cache, addresses))
+        self.misses += len(uncached)
+        self.hits += len(addresses) - len(uncached)
         
         # Fetch uncached tokens
         if uncached:
             results = await self._fetch_security_info(uncached)
             
-            # Use lambda in dictionary comprehension
-            self.cache.update({
-                addr: (result, time()) 
-                for addr, result in zip(uncached, results)
-            })
+            now = time()
+            for addr, result in zip(uncached, results):
+                self._store(addr, result, now)
+            fetched = dict(zip(uncached, results))
+        else:
+            fetched = {}
             
         # Return all results
-        return {addr: self.cache[addr][0] for addr in checksum_addresses} 
\ No newline at end of file
+        return {
+            addr.checksum: self.cache[addr][0] if addr in self.cache else fetched.get(addr)
+            for addr in addresses
+        }
@@ -1,29 +1,81 @@
-from goplus.token import Token
 import asyncio
-from time import time
-from web3 import Web3
+from time import time, time_ns
+from ..monitoring.metrics import metrics
+from ..monitoring.tracing import current_span
 
-# Initialize Token checker, add access token if needed
-token_checker = Token(access_token=None)
+# GoPlus Token checker, created on first use (importing goplus is slow); add access token if needed
+token_checker = None
+# Optional HoneypotSimulator (security/honeypot.py), set when HONEYPOT_SIMULATION_ENABLED;
+# its verdict is combined with GoPlus in is_token_safe
+honeypot_simulator = None
+honeypot_max_tax = 0.0
 
-async def check_token_security(token_address):
-    """Make token security check non-blocking"""
+def get_token_checker():
+    global token_checker
+    if token_checker is None:
+        from goplus.token import Token
+        token_checker = Token(access_token=None)
+    return token_checker
+
+def _query_token_security(token_address, span=None):
+    if span is not None:
+        # Lets traces separate executor queueing from GoPlus response time
+        span["executor_start"] = time_ns()
+    return get_token_checker().token_security(
+        chain_id="1",
+        addresses=[token_address],
+        **{"_request_timeout": 10}
+    )
+
+async def check_token_security(token_address, in_dex=False):
+    """Make token security check non-blocking; ``in_dex`` as in is_token_safe"""
+    metrics.inc("goplus_requests_total", help_text="GoPlus token security requests")
+    span = current_span.get()
+    simulation = None
+    if honeypot_simulator is not None:
+        simulation = asyncio.ensure_future(_simulate(token_address))
     try:
         # Run blocking API call in thread pool
         response = await asyncio.get_event_loop().run_in_executor(
             None,
-            lambda: token_checker.token_security(
-                chain_id="1",
-                addresses=[token_address],
-                **{"_request_timeout": 10}
-            )
+            lambda: _query_token_security(token_address, span)
         )
         data_str = str(response)
-        return "'trust_list': '1'" in data_str or is_token_safe(data_str)
+        if "'trust_list': '1'" in data_str:
+            return True
+        return is_token_safe(data_str, await simulation if simulation else None, in_dex)
     except Exception as e:
-        return False
+        metrics.inc("goplus_errors_total", help_text="GoPlus token security requests that failed")
+        # Without GoPlus, a conclusive simulation still decides
+        result = await simulation if simulation else None
+        if result is not None and result.conclusive:
+            return is_token_safe("", result, in_dex)
+        # Unknown rather than unsafe, so callers such as SecurityCache do not cache it
+        return None
+    finally:
+        if simulation and not simulation.done():
+            simulation.cancel()
+
+async def _simulate(token_address):
+    try:
+        return await honeypot_simulator.simulate(token_address)
+    except Exception:
+        metrics.inc("honeypot_simulation_errors_total", help_text="Honeypot simulations that failed")
+        return None
+
+def is_token_safe(data_str, simulation=None, in_dex=False):
+    """GoPlus criteria, plus the measured taxes and sellability of ``simulation``
+    (a honeypot.SimulationResult) when it is conclusive. A failed simulation is
+    decisive; a passed one stands in for GoPlus until GoPlus has the token.
+
+    ``in_dex`` waives GoPlus's ``is_in_dex``, for callers that know the token has
+    (or is about to have) a pool, e.g. a mempool pool creation."""
+    if simulation is not None and simulation.conclusive:
+        if not simulation.is_safe(honeypot_max_tax):
+            return False
+        if "'is_honeypot'" not in data_str:
+            return True
 
-def is_token_safe(data_str):
     safety_criteria = [
         "'is_honeypot': '0'",
         "'is_blacklisted': '0'",
@@ -41,6 +93,9 @@ def is_token_safe(data_str):
         "'is_in_dex': '1'"
     ]
 
+    if in_dex:
+        safety_criteria.pop()
+
     for criterion in safety_criteria:
         if criterion not in data_str:
             return False
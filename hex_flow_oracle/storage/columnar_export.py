@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from ..output.binary_format import PoolRecord, FLAG_TOKEN0_TRUSTED, FLAG_TOKEN1_TRUSTED
+
+# pyarrow is optional (see requirements.txt) and slow to import, so it is
+# loaded on first use rather than with the package
+pa = None
+pq = None
+
+def _load_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Columnar export requires pyarrow: pip install pyarrow") from None
+        pa, pq = pyarrow, pyarrow.parquet
+
+logger = logging.getLogger(__name__)
+
+_IN_PROGRESS_SUFFIX = ".inprogress"
+
+def pool_schema():
+    _load_pyarrow()
+    return pa.schema([
+        ("version", pa.uint8()),
+        ("chain_id", pa.uint32()),
+        ("block_number", pa.uint64()),
+        ("received_at", pa.timestamp("ns", tz="UTC")),
+        ("token0", pa.binary(20)),
+        ("token1", pa.binary(20)),
+        ("pool", pa.binary(20)),
+        ("fee", pa.uint32()),
+        ("token0_trusted", pa.bool_()),
+        ("token1_trusted", pa.bool_()),
+        ("approved", pa.bool_()),
+    ])
+
+class ColumnarExporter:
+    """Streams pool records and their verdicts into rotating Parquet or Arrow IPC files.
+
+    Rows are buffered column-wise and written one row group (Parquet) or record
+    batch (Arrow) at a time, on a dedicated writer thread so encoding and disk
+    I/O stay off the event loop. A row group is only closed when it is full or
+    its file rotates, so slow periods do not produce files of tiny row groups;
+    ``start`` rotates files ``rotate_seconds`` after their first row, which
+    bounds how long a row stays in memory. Files are written under an
+    ``.inprogress`` name and renamed once closed, so readers globbing
+    ``*.parquet`` only see complete files.
+    """
+    def __init__(self, directory, fmt="parquet", row_group_size=10_000,
+                 rotate_rows=1_000_000, rotate_seconds=3600.0, compression="zstd"):
+        _load_pyarrow()
+        if fmt not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        self.compression = compression
+        self.schema = pool_schema()
+        os.makedirs(directory, exist_ok=True)
+
+        self._columns = self._empty_columns()
+        # Rows and age of the current file, buffered or written; rotation is
+        # decided here, on the loop
+        self._file_rows = 0
+        self._file_started = None
+        # One thread keeps row groups in order; the writer state below is only
+        # touched from it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="columnar-export")
+        self._timer = None
+        self._writer = None
+        self._path = None
+
+    def _empty_columns(self):
+        return {name: [] for name in self.schema.names}
+
+    def append(self, record: PoolRecord):
+        if self._file_started is None:
+            self._file_started = time.monotonic()
+        columns = self._columns
+        columns["version"].append(record.version)
+        columns["chain_id"].append(record.chain_id)
+        columns["block_number"].append(record.block_number)
+        columns["received_at"].append(record.received_ns)
+        columns["token0"].append(record.token0)
+        columns["token1"].append(record.token1)
+        columns["pool"].append(record.pool)
+        columns["fee"].append(record.fee)
+        columns["token0_trusted"].append(bool(record.flags & FLAG_TOKEN0_TRUSTED))
+        columns["token1_trusted"].append(bool(record.flags & FLAG_TOKEN1_TRUSTED))
+        columns["approved"].append(record.approved)
+
+        self._file_rows += 1
+        if self._file_rows >= self.rotate_rows:
+            self._submit(rotate=True)
+        elif len(columns["version"]) >= self.row_group_size:
+            self._submit()
+
+    def _submit(self, rotate=False):
+        """Hand the buffered rows to the writer thread, closing the file after them if ``rotate``"""
+        columns, self._columns = self._columns, self._empty_columns()
+        if rotate:
+            self._file_rows = 0
+            self._file_started = None
+        future = self._executor.submit(self._write, columns, rotate)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception():
+            logger.error("Columnar export write failed: %s", future.exception())
+
+    def start(self):
+        """Rotate files on a timer; needs a running event loop"""
+        self._timer = asyncio.get_running_loop().create_task(self._rotate_periodically())
+        return self
+
+    async def _rotate_periodically(self):
+        while True:
+            started = self._file_started
+            due = self.rotate_seconds if started is None else started + self.rotate_seconds - time.monotonic()
+            await asyncio.sleep(max(due, 0))
+            # A file begun during the sleep is checked again on the next pass
+            if (self._file_started is not None
+                    and time.monotonic() - self._file_started >= self.rotate_seconds):
+                self._submit(rotate=True)
+
+    def flush(self):
+        """Write buffered rows as one row group and wait for every pending write"""
+        self._submit().result()
+
+    def _write(self, columns, rotate):
+        """Write one row group, then close the file if ``rotate`` (writer thread)"""
+        if columns["version"]:
+            if self._writer is None:
+                self._open()
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(columns[field.name], type=field.type) for field in self.schema],
+                schema=self.schema
+            )
+            self._writer.write_batch(batch)
+        if rotate and self._writer:
+            self._close_file()
+
+    def _open(self):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
+        self._path = os.path.join(self.directory, f"pools_{stamp}.{self.fmt}")
+        sink = self._path + _IN_PROGRESS_SUFFIX
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(sink, self.schema, compression=self.compression)
+        else:
+            self._writer = pa.ipc.new_file(
+                sink, self.schema, options=pa.ipc.IpcWriteOptions(compression=self.compression)
+            )
+
+    def _close_file(self):
+        self._writer.close()
+        os.replace(self._path + _IN_PROGRESS_SUFFIX, self._path)
+        self._writer = None
+
+    def close(self):
+        if self._timer:
+            self._timer.cancel()
+        self._submit(rotate=True)
+        self._executor.shutdown(wait=True)
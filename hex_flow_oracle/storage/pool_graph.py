@@ -0,0 +1,157 @@
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..core.address import Address, to_address
+from ..output.binary_format import FLAG_APPROVED, PoolRecord
+
+class Hop(NamedTuple):
+    pool: Address
+    token_in: Address
+    token_out: Address
+    version: int
+    fee: int
+
+class PoolGraph:
+    """Live token graph: tokens are nodes, pools are edges, updated per pool.
+
+    Edge attributes are columns of compact arrays indexed by edge id, and each
+    node's adjacency is an ``array('I')`` of edge ids appended as pools arrive,
+    so nothing is rebuilt when the graph grows. The far end of edge ``e`` from
+    node ``n`` is ``ends0[e] ^ ends1[e] ^ n``. Pools are also posted under
+    their token pair, so the last hop of a path query is one dict probe rather
+    than a scan of a hub token's (e.g. WETH's) adjacency.
+    """
+    def __init__(self):
+        self.node_ids: Dict[Address, int] = {}
+        self.nodes: List[Address] = []
+        self.adjacency: List[array] = []
+
+        self.ends0 = array('I')
+        self.ends1 = array('I')
+        self.versions = array('B')
+        self.fees = array('I')
+        self.flags = array('B')
+        self.pools: List[Address] = []
+        self.edge_ids: Dict[Address, int] = {}
+        self.by_pair: Dict[Tuple[int, int], array] = {}
+
+    def __len__(self):
+        return len(self.pools)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    def _node(self, token: Address) -> int:
+        node = self.node_ids.get(token)
+        if node is None:
+            node = self.node_ids[token] = len(self.nodes)
+            self.nodes.append(token)
+            self.adjacency.append(array('I'))
+        return node
+
+    @staticmethod
+    def _pair(a: int, b: int) -> Tuple[int, int]:
+        return (a, b) if a <= b else (b, a)
+
+    def add(self, record: PoolRecord) -> bool:
+        """Add a pool as an edge; False if it was already in the graph"""
+        pool = to_address(record.pool)
+        if pool in self.edge_ids:
+            return False
+        u, v = self._node(to_address(record.token0)), self._node(to_address(record.token1))
+        edge = self.edge_ids[pool] = len(self.pools)
+        self.pools.append(pool)
+        self.ends0.append(u)
+        self.ends1.append(v)
+        self.versions.append(record.version)
+        self.fees.append(record.fee)
+        self.flags.append(record.flags)
+        self.adjacency[u].append(edge)
+        if v != u:
+            self.adjacency[v].append(edge)
+        pair = self.by_pair.get(self._pair(u, v))
+        if pair is None:
+            pair = self.by_pair[self._pair(u, v)] = array('I')
+        pair.append(edge)
+        return True
+
+    def _hop(self, edge: int, node: int) -> Hop:
+        other = self.ends0[edge] ^ self.ends1[edge] ^ node
+        return Hop(self.pools[edge], self.nodes[node], self.nodes[other], self.versions[edge], self.fees[edge])
+
+    def _usable(self, edge: int, approved_only: bool) -> bool:
+        return not approved_only or self.flags[edge] & FLAG_APPROVED == FLAG_APPROVED
+
+    def pools_between(self, token_a, token_b, approved_only: bool = False) -> List[Hop]:
+        a, b = self.node_ids.get(to_address(token_a)), self.node_ids.get(to_address(token_b))
+        if a is None or b is None:
+            return []
+        return [self._hop(edge, a) for edge in self.by_pair.get(self._pair(a, b), ())
+                if self._usable(edge, approved_only)]
+
+    def neighbors(self, token) -> List[Address]:
+        node = self.node_ids.get(to_address(token))
+        if node is None:
+            return []
+        ends0, ends1 = self.ends0, self.ends1
+        return [self.nodes[other] for other in dict.fromkeys(ends0[e] ^ ends1[e] ^ node for e in self.adjacency[node])]
+
+    def paths(self, source, target, max_hops: int = 2, approved_only: bool = False,
+              limit: Optional[int] = None, max_visits: Optional[int] = None) -> List[List[Hop]]:
+        """Simple paths from ``source`` to ``target`` of at most ``max_hops`` pools,
+        shortest first; parallel pools (e.g. fee tiers of one pair) give separate paths.
+
+        ``max_visits`` bounds the pools examined, since a walk through hub tokens
+        grows with their degree; a search that would exceed it raises ValueError
+        instead of returning a partial answer.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        s, t = self.node_ids.get(to_address(source)), self.node_ids.get(to_address(target))
+        if s is None or t is None or s == t or max_hops < 1:
+            return []
+        budget = [max_visits]
+        results = []
+        for hops in range(1, max_hops + 1):
+            for edges in self._walk(s, t, hops, approved_only, [s], budget):
+                path, node = [], s
+                for edge in edges:
+                    hop = self._hop(edge, node)
+                    path.append(hop)
+                    node = self.ends0[edge] ^ self.ends1[edge] ^ node
+                results.append(path)
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
+
+    @staticmethod
+    def _spend(budget: list, visits: int):
+        """Charge ``visits`` pools to the remaining ``max_visits`` (None: unbounded)"""
+        if budget[0] is None:
+            return
+        budget[0] -= visits
+        if budget[0] < 0:
+            raise ValueError("Path search examines too many pools; lower max_hops or set a limit")
+
+    def _walk(self, node: int, target: int, hops: int, approved_only: bool, visited: List[int],
+              budget: list) -> Iterator[tuple]:
+        """Edge sequences of exactly ``hops`` pools from ``node`` to ``target`` avoiding ``visited``"""
+        if hops == 1:
+            pair = self.by_pair.get(self._pair(node, target), ())
+            self._spend(budget, len(pair))
+            for edge in pair:
+                if self._usable(edge, approved_only):
+                    yield (edge,)
+            return
+        ends0, ends1 = self.ends0, self.ends1
+        adjacency = self.adjacency[node]
+        self._spend(budget, len(adjacency))
+        for edge in adjacency:
+            other = ends0[edge] ^ ends1[edge] ^ node
+            if other == target or other in visited or not self._usable(edge, approved_only):
+                continue
+            visited.append(other)
+            for rest in self._walk(other, target, hops - 1, approved_only, visited, budget):
+                yield (edge,) + rest
+            visited.pop()
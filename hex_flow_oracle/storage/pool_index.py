@@ -0,0 +1,260 @@
+import bisect
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from ..output.binary_format import PoolRecord
+
+_ADDRESS_SIZE = 20
+# Path queries fan out with the degree of every intermediate token, so depth is capped
+MAX_PATH_HOPS = 3
+
+def _parse_address(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+class PoolIndex:
+    """In-memory index of every pool seen, stored column-wise in compact arrays.
+
+    Rows are appended in arrival order. Each hash index maps a key to an ``array('I')``
+    of row ids, so a lookup such as "pools containing token X" is one dict probe.
+    Rows are added once their security checks finish, so ``received_ns`` is not
+    sorted by row; creation-time queries bisect the running maximum of that column,
+    which is, and check each row from there.
+    """
+    def __init__(self):
+        self.versions = array('B')
+        self.fees = array('I')
+        self.chain_ids = array('I')
+        self.flags = array('B')
+        self.blocks = array('Q')
+        self.received_ns = array('Q')
+        # Highest received_ns among rows 0..i, non-decreasing by construction
+        self.max_received_ns = array('Q')
+        # token0, token1 and pool address of each row, packed back to back
+        self.addresses = bytearray()
+
+        self.by_token: Dict[bytes, array] = {}
+        self.by_pair: Dict[tuple, array] = {}
+        self.by_fee: Dict[int, array] = {}
+        self.by_version: Dict[int, array] = {}
+        self.by_chain: Dict[int, array] = {}
+        self.by_pool: Dict[bytes, array] = {}
+
+    def __len__(self):
+        return len(self.versions)
+
+    @staticmethod
+    def _post(index, key, row):
+        rows = index.get(key)
+        if rows is None:
+            rows = index[key] = array('I')
+        rows.append(row)
+
+    def add(self, record: PoolRecord):
+        """Index a pool; a pool already seen on the same chain is ignored"""
+        if any(self.chain_ids[row] == record.chain_id for row in self.by_pool.get(record.pool, ())):
+            return
+        row = len(self.versions)
+        self.versions.append(record.version)
+        self.fees.append(record.fee)
+        self.chain_ids.append(record.chain_id)
+        self.flags.append(record.flags)
+        self.blocks.append(record.block_number)
+        self.received_ns.append(record.received_ns)
+        self.max_received_ns.append(max(record.received_ns, self.max_received_ns[-1]) if row else record.received_ns)
+        self.addresses += record.token0 + record.token1 + record.pool
+
+        self._post(self.by_pool, record.pool, row)
+        self._post(self.by_token, record.token0, row)
+        if record.token1 != record.token0:
+            self._post(self.by_token, record.token1, row)
+        self._post(self.by_pair, self.pair_key(record.token0, record.token1), row)
+        self._post(self.by_fee, record.fee, row)
+        self._post(self.by_version, record.version, row)
+        self._post(self.by_chain, record.chain_id, row)
+
+    @staticmethod
+    def pair_key(token_a: bytes, token_b: bytes) -> tuple:
+        return (token_a, token_b) if token_a <= token_b else (token_b, token_a)
+
+    def record(self, row: int) -> PoolRecord:
+        offset = row * 3 * _ADDRESS_SIZE
+        return PoolRecord(
+            version=self.versions[row],
+            token0=bytes(self.addresses[offset:offset + _ADDRESS_SIZE]),
+            token1=bytes(self.addresses[offset + _ADDRESS_SIZE:offset + 2 * _ADDRESS_SIZE]),
+            pool=bytes(self.addresses[offset + 2 * _ADDRESS_SIZE:offset + 3 * _ADDRESS_SIZE]),
+            fee=self.fees[row],
+            chain_id=self.chain_ids[row],
+            block_number=self.blocks[row],
+            received_ns=self.received_ns[row],
+            flags=self.flags[row],
+        )
+
+    def tokens(self, row: int) -> tuple:
+        offset = row * 3 * _ADDRESS_SIZE
+        return (bytes(self.addresses[offset:offset + _ADDRESS_SIZE]),
+                bytes(self.addresses[offset + _ADDRESS_SIZE:offset + 2 * _ADDRESS_SIZE]))
+
+    def find_rows(self, token: Optional[bytes] = None, pair: Optional[tuple] = None,
+                  fee: Optional[int] = None, version: Optional[int] = None,
+                  chain_id: Optional[int] = None, since_ns: Optional[int] = None) -> List[int]:
+        """Row ids matching every given criterion, oldest first"""
+        # Start from the shortest posting list, then check the other criteria per row
+        postings = []
+        checks = []
+        if token is not None:
+            postings.append(self.by_token.get(token, ()))
+            checks.append(lambda row: token in self.tokens(row))
+        if pair is not None:
+            pair = self.pair_key(*pair)
+            postings.append(self.by_pair.get(pair, ()))
+            checks.append(lambda row: self.pair_key(*self.tokens(row)) == pair)
+        if fee is not None:
+            postings.append(self.by_fee.get(fee, ()))
+            checks.append(lambda row: self.fees[row] == fee)
+        if version is not None:
+            postings.append(self.by_version.get(version, ()))
+            checks.append(lambda row: self.versions[row] == version)
+        if chain_id is not None:
+            postings.append(self.by_chain.get(chain_id, ()))
+            checks.append(lambda row: self.chain_ids[row] == chain_id)
+
+        first_row = 0
+        if since_ns is not None:
+            # Every row before the first whose running maximum reaches since_ns is older
+            first_row = bisect.bisect_left(self.max_received_ns, since_ns)
+            checks.append(lambda row: self.received_ns[row] >= since_ns)
+        if not postings:
+            return [row for row in range(first_row, len(self.versions)) if all(check(row) for check in checks)]
+
+        shortest = min(postings, key=len)
+        start = bisect.bisect_left(shortest, first_row)
+        return [row for row in shortest[start:] if all(check(row) for check in checks)]
+
+    def query(self, **criteria) -> List[PoolRecord]:
+        return [self.record(row) for row in self.find_rows(**criteria)]
+
+def hop_to_json(hop) -> dict:
+    return {
+        "pool": str(hop.pool),
+        "token_in": str(hop.token_in),
+        "token_out": str(hop.token_out),
+        "version": hop.version,
+        "fee": hop.fee,
+    }
+
+def record_to_json(record: PoolRecord) -> dict:
+    return {
+        "version": record.version,
+        "token0": "0x" + record.token0.hex(),
+        "token1": "0x" + record.token1.hex(),
+        "pool": "0x" + record.pool.hex(),
+        "fee": record.fee,
+        "chain_id": record.chain_id,
+        "block_number": record.block_number,
+        "received_ns": record.received_ns,
+        "approved": record.approved,
+    }
+
+class PoolIndexServer:
+    """Local HTTP query API over a ``PoolIndex``.
+
+    ``GET /pools`` accepts ``token``, ``token0`` + ``token1`` (pair), ``fee``, ``version``,
+    ``chain_id``, ``since`` (unix seconds), ``max_age`` (seconds) and ``limit``;
+    results are newest first. ``GET /pools/{address}`` returns one pool. Given a
+    ``PoolGraph``, ``GET /paths?from=&to=`` lists routes between two tokens, with
+    optional ``max_hops`` (default 2, at most 3), ``approved`` and ``limit``; a
+    search examining more than ``max_path_visits`` pools is rejected.
+    """
+    def __init__(self, index: PoolIndex, host="127.0.0.1", port=8766, graph=None, max_path_visits=100_000):
+        self.index = index
+        self.graph = graph
+        self.max_path_visits = max_path_visits
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    def make_app(self):
+        from aiohttp import web  # Deferred: only needed when the server is enabled
+        app = web.Application()
+        app.router.add_get("/pools", self.handle_query)
+        app.router.add_get("/pools/{address}", self.handle_pool)
+        if self.graph is not None:
+            app.router.add_get("/paths", self.handle_paths)
+        return app
+
+    async def start(self):
+        from aiohttp import web
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        return self
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def handle_query(self, request):
+        from aiohttp import web
+        params = request.query
+        criteria = {}
+        try:
+            if "token" in params:
+                criteria["token"] = _parse_address(params["token"])
+            if "token0" in params and "token1" in params:
+                criteria["pair"] = (_parse_address(params["token0"]), _parse_address(params["token1"]))
+            for name in ("fee", "version", "chain_id"):
+                if name in params:
+                    criteria[name] = int(params[name])
+            if "since" in params:
+                criteria["since_ns"] = int(float(params["since"]) * 1e9)
+            elif "max_age" in params:
+                criteria["since_ns"] = time.time_ns() - int(float(params["max_age"]) * 1e9)
+            limit = int(params.get("limit", 100))
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+
+        rows = self.index.find_rows(**criteria)
+        newest = rows[::-1][:limit]
+        return web.json_response({
+            "count": len(rows),
+            "pools": [record_to_json(self.index.record(row)) for row in newest]
+        })
+
+    async def handle_pool(self, request):
+        from aiohttp import web
+        try:
+            pool = _parse_address(request.match_info["address"])
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        matches = [record_to_json(self.index.record(row)) for row in self.index.by_pool.get(pool, ())]
+        if not matches:
+            raise web.HTTPNotFound()
+        return web.json_response(matches[0] if len(matches) == 1 else matches)
+
+    async def handle_paths(self, request):
+        from aiohttp import web
+        params = request.query
+        try:
+            source, target = _parse_address(params["from"]), _parse_address(params["to"])
+            max_hops = int(params.get("max_hops", 2))
+            limit = int(params.get("limit", 100))
+        except (KeyError, ValueError) as e:
+            raise web.HTTPBadRequest(text=f"Invalid or missing parameter: {e}")
+        if not 1 <= max_hops <= MAX_PATH_HOPS:
+            raise web.HTTPBadRequest(text=f"max_hops must be between 1 and {MAX_PATH_HOPS}")
+        if limit < 1:
+            raise web.HTTPBadRequest(text="limit must be at least 1")
+        approved_only = params.get("approved", "").lower() in ("1", "true")
+        try:
+            # Runs on the event loop, so the walk is bounded rather than offloaded:
+            # the graph is updated from the loop and is not safe to read from a thread
+            paths = self.graph.paths(source, target, max_hops=max_hops, approved_only=approved_only,
+                                     limit=limit, max_visits=self.max_path_visits)
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return web.json_response({
+            "count": len(paths),
+            "paths": [[hop_to_json(hop) for hop in path] for path in paths]
+        })
@@ -0,0 +1,221 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, List, Optional
+
+from ..output.binary_format import PoolRecord, FRAME_SIZE, iter_frames
+
+# Sparse index entry: highest block number and receive timestamp (ns) of every record
+# journaled before the entry's chunk, and the chunk's byte offset into the segment.
+# Records are appended as their checks finish, so neither key rises in append order;
+# these running maxima do, which is what lets readers bisect them.
+_INDEX_ENTRY = struct.Struct("<QQQ")
+
+_SEGMENT_SUFFIX = ".seg"
+_INDEX_SUFFIX = ".idx"
+# Lowest block whose events may not all be journaled yet, as decimal text
+_RESUME_FILE = "resume"
+
+def _segment_name(number: int) -> str:
+    return f"{number:08d}"
+
+class PoolJournal:
+    """Append-only, segmented journal of decoded pool events and their verdicts.
+
+    Segments hold back-to-back ``PoolRecord`` frames (see output/binary_format.py),
+    so a segment file can also be read with ``read_records``. Every ``index_interval``
+    records a ``(max block, max received_ns, offset)`` entry goes into the segment's
+    sparse index, which ``JournalReader`` bisects before scanning the memory-mapped
+    segment.
+
+    ``resume_block`` is where a listener should backfill from. Events finish out
+    of block order, so it is set by ``checkpoint`` rather than derived from
+    ``last_block``, which it only defaults to for journals without a checkpoint.
+    """
+    def __init__(self, directory, segment_records=100_000, index_interval=64, fsync=False):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.index_interval = index_interval
+        self.fsync = fsync
+        self.last_block: Optional[int] = None
+        self._max_received = 0
+        os.makedirs(directory, exist_ok=True)
+
+        segments = list_segments(directory)
+        self._segment = segments[-1] if segments else 0
+        self._records = self._recover() if segments else 0
+        self._open_segment()
+        self.resume_block = self._load_resume()
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, _segment_name(self._segment) + suffix)
+
+    def _recover(self) -> int:
+        """Drop a torn trailing frame and rebuild the index of the last segment"""
+        seg_path = self._path(_SEGMENT_SUFFIX)
+        size = os.path.getsize(seg_path)
+        records = size // FRAME_SIZE
+        if size != records * FRAME_SIZE:
+            with open(seg_path, "r+b") as f:
+                f.truncate(records * FRAME_SIZE)
+
+        max_block, self._max_received = self._prefix_maxima()
+        with open(self._path(_INDEX_SUFFIX), "wb") as index:
+            with open(seg_path, "rb") as f:
+                data = f.read()
+            for i, record in enumerate(iter_frames(data)):
+                if i % self.index_interval == 0:
+                    index.write(_INDEX_ENTRY.pack(max_block, self._max_received, i * FRAME_SIZE))
+                max_block = max(max_block, record.block_number)
+                self._max_received = max(self._max_received, record.received_ns)
+        if records or self._segment > 0:
+            self.last_block = max_block
+        return records
+
+    def _prefix_maxima(self) -> tuple:
+        """Running maxima at the start of the last segment, from its first index
+        entry or, if it has none yet, from the previous segment"""
+        reader = JournalReader(self.directory)
+        index = reader._load_index(self._segment)
+        if index:
+            return index[0][0], index[0][1]
+        if self._segment == 0:
+            return 0, 0
+        previous = reader._load_index(self._segment - 1)
+        max_block, max_received = (previous[0][0], previous[0][1]) if previous else (0, 0)
+        for record in reader._scan(self._segment - 1, 0):
+            max_block = max(max_block, record.block_number)
+            max_received = max(max_received, record.received_ns)
+        return max_block, max_received
+
+    def _load_resume(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.directory, _RESUME_FILE)) as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return self.last_block
+
+    def checkpoint(self, block_number: int):
+        """Record that every event before ``block_number`` is journaled; written
+        atomically, and only when the value changes"""
+        if block_number == self.resume_block:
+            return
+        self.resume_block = block_number
+        path = os.path.join(self.directory, _RESUME_FILE)
+        with open(path + ".tmp", "w") as f:
+            f.write(str(block_number))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _open_segment(self):
+        self._seg_file = open(self._path(_SEGMENT_SUFFIX), "ab")
+        self._idx_file = open(self._path(_INDEX_SUFFIX), "ab")
+
+    def _roll(self):
+        self.close()
+        self._segment += 1
+        self._records = 0
+        self._open_segment()
+
+    def append(self, record: PoolRecord):
+        if self._records >= self.segment_records:
+            self._roll()
+        if self._records % self.index_interval == 0:
+            self._idx_file.write(_INDEX_ENTRY.pack(
+                self.last_block or 0, self._max_received, self._records * FRAME_SIZE
+            ))
+            self._idx_file.flush()
+        self._seg_file.write(record.to_frame())
+        self._seg_file.flush()
+        if self.fsync:
+            os.fsync(self._seg_file.fileno())
+        self._records += 1
+        if self.last_block is None or record.block_number > self.last_block:
+            self.last_block = record.block_number
+        if record.received_ns > self._max_received:
+            self._max_received = record.received_ns
+
+    def close(self):
+        self._seg_file.close()
+        self._idx_file.close()
+
+def list_segments(directory) -> List[int]:
+    return sorted(
+        int(name[:-len(_SEGMENT_SUFFIX)])
+        for name in os.listdir(directory)
+        if name.endswith(_SEGMENT_SUFFIX)
+    )
+
+class JournalReader:
+    """Query a journal directory through memory-mapped segments, without parsing logs.
+
+    Safe to use while a ``PoolJournal`` is appending: each query maps the segments
+    at their current size and only decodes complete frames.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _load_index(self, segment):
+        path = os.path.join(self.directory, _segment_name(segment) + _INDEX_SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % _INDEX_ENTRY.size
+        return list(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+    def _scan(self, segment, start_offset) -> Iterator[PoolRecord]:
+        path = os.path.join(self.directory, _segment_name(segment) + _SEGMENT_SUFFIX)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= start_offset:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield from iter_frames(view[start_offset:size - size % FRAME_SIZE])
+                finally:
+                    view.release()
+
+    def _query(self, field, lower_bound) -> Iterator[PoolRecord]:
+        """Yield records whose ``field`` (0=block, 1=received_ns) is >= lower_bound"""
+        segments = list_segments(self.directory)
+        indexes = [self._load_index(segment) for segment in segments]
+        # Index keys are running maxima over everything journaled before an entry,
+        # so every record before an entry below the bound is itself below it
+        first = 0
+        for i in range(len(segments) - 1):
+            if indexes[i + 1] and indexes[i + 1][0][field] < lower_bound:
+                first = i + 1
+        attr = "block_number" if field == 0 else "received_ns"
+        for segment, index in zip(segments[first:], indexes[first:]):
+            keys = [entry[field] for entry in index]
+            position = bisect.bisect_left(keys, lower_bound) - 1
+            start_offset = index[position][2] if position >= 0 else 0
+            for record in self._scan(segment, start_offset):
+                if getattr(record, attr) >= lower_bound:
+                    yield record
+
+    def since_block(self, block_number: int) -> Iterator[PoolRecord]:
+        """All pools created at or after ``block_number``"""
+        return self._query(0, block_number)
+
+    def since_time(self, seconds_ago: float) -> Iterator[PoolRecord]:
+        """All pools received within the last ``seconds_ago`` seconds"""
+        return self._query(1, time.time_ns() - int(seconds_ago * 1e9))
+
+    def last_block(self) -> Optional[int]:
+        """Highest journaled block, the listener's resume point"""
+        for segment in reversed(list_segments(self.directory)):
+            index = self._load_index(segment)
+            start_offset = index[-1][2] if index else 0
+            blocks = [record.block_number for record in self._scan(segment, start_offset)]
+            if blocks:
+                # The last entry holds the maximum of every record before its chunk
+                return max(blocks + [index[-1][0]] if index else blocks)
+        return None
@@ -28,24 +28,73 @@ def calculate_optimal_amounts(
     """
     Calculate optimal trade amounts to achieve target price within slippage.
     JIT compiled for performance.
+
+    The impact of adding [m, m * price] is quadratic in m, so the largest m
+    within ``max_slippage`` is its positive root (in the cancellation-free
+    form), capped at half the smaller reserve.
     """
     current_price = reserves[0] / reserves[1]
-    diff = abs(target_price - current_price)
-    
-    # Binary search for optimal amounts
-    left = 0
-    right = min(reserves) * 0.5
     optimal = np.zeros(2)
-    
-    while left < right:
-        mid = (left + right) / 2
-        test_amounts = np.array([mid, mid * current_price])
-        impact = calculate_price_impact(test_amounts, reserves)
-        
-        if impact <= max_slippage:
-            optimal = test_amounts
-            left = mid + 1
-        else:
-            right = mid - 1
-            
-    return optimal 
\ No newline at end of file
+    if max_slippage <= 0:
+        return optimal
+
+    # (r0 + m)(r1 + m * p) = k * (1 + s / 100)  =>  p m^2 + b m - k s / 100 = 0
+    k = reserves[0] * reserves[1]
+    b = reserves[0] * current_price + reserves[1]
+    c = k * max_slippage / 100
+    mid = min(2 * c / (b + np.sqrt(b * b + 4 * current_price * c)), min(reserves) * 0.5)
+    optimal[0] = mid
+    optimal[1] = mid * current_price
+    return optimal
+
+@jit(nopython=True)
+def batch_price_impact(reserves: np.ndarray, amounts_in: np.ndarray, fee: float = 0.003):
+    """
+    Price impact and output of M trade sizes against N constant-product pools.
+
+    Args:
+        reserves: (N, 2) array of [reserve_in, reserve_out] per pool
+        amounts_in: (M,) array of input amounts, in reserve_in units
+        fee: pool fee as a fraction (0.003 for Uniswap V2)
+    Returns:
+        (impact, amount_out): two (N, M) arrays. Impact is the percentage by
+        which the execution price falls short of the spot price, fee included:
+        1 - g * r_in / (r_in + g * a) with g = 1 - fee.
+    """
+    n = reserves.shape[0]
+    m = amounts_in.shape[0]
+    gamma = 1.0 - fee
+    impact = np.empty((n, m))
+    amount_out = np.empty((n, m))
+    for i in range(n):
+        reserve_in = reserves[i, 0]
+        reserve_out = reserves[i, 1]
+        for j in range(m):
+            if reserve_in <= 0 or reserve_out <= 0:
+                impact[i, j] = 100.0
+                amount_out[i, j] = 0.0
+                continue
+            effective_in = gamma * amounts_in[j]
+            denominator = reserve_in + effective_in
+            amount_out[i, j] = reserve_out * effective_in / denominator
+            impact[i, j] = (1.0 - gamma * reserve_in / denominator) * 100
+    return impact, amount_out
+
+@jit(nopython=True)
+def batch_max_trade_size(reserves: np.ndarray, max_impact: float, fee: float = 0.003) -> np.ndarray:
+    """
+    Largest input per pool whose price impact (as in ``batch_price_impact``)
+    stays within ``max_impact`` percent: r_in * (1 / q - 1 / g) with
+    q = 1 - max_impact / 100. Zero when the fee alone exceeds ``max_impact``.
+    """
+    n = reserves.shape[0]
+    gamma = 1.0 - fee
+    q = 1.0 - max_impact / 100
+    sizes = np.zeros(n)
+    if q >= gamma or q <= 0:
+        return sizes
+    factor = 1.0 / q - 1.0 / gamma
+    for i in range(n):
+        if reserves[i, 0] > 0 and reserves[i, 1] > 0:
+            sizes[i] = reserves[i, 0] * factor
+    return sizes
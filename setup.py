@@ -11,9 +11,13 @@ setup(
         "aiohttp>=3.8.0",
         "tqdm>=4.65.0",
     ],
+    extras_require={
+        "export": ["pyarrow>=14.0.0"],
+        "fast": ["uvloop>=0.17.0"],
+    },
     entry_points={
         'console_scripts': [
-            'hex-flow-oracle=hex_flow_oracle.main:main',
+            'hex-flow-oracle=hex_flow_oracle.main:cli',
         ],
     },
     python_requires='>=3.8',
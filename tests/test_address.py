@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from hex_flow_oracle.core.address import Address, to_address
+from hex_flow_oracle.security import security_cache as security_cache_module
+from hex_flow_oracle.security.security_cache import SecurityCache
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+def test_spellings_intern_to_one_object():
+    raw = bytes.fromhex(WETH[2:])
+    spellings = [WETH, WETH.lower(), WETH.upper().replace("0X", "0x"), WETH[2:], "0x" + "0" * 24 + WETH[2:].lower(), raw]
+    addresses = {id(to_address(spelling)) for spelling in spellings}
+    assert len(addresses) == 1
+    address = to_address(WETH)
+    assert Address(raw) is address
+    assert address == raw and hash(address) == hash(raw)
+    assert str(address) == WETH.lower()
+    assert address.checksum == WETH
+
+def test_rejects_wrong_length():
+    with pytest.raises(ValueError):
+        to_address("0x1234")
+
+@pytest.mark.asyncio
+async def test_security_cache_coalesces_lookups_and_skips_failures(monkeypatch):
+    calls = []
+
+    async def check(address):
+        calls.append(address)
+        await asyncio.sleep(0.01)
+        return None if address.endswith("dead") else True
+
+    monkeypatch.setattr(security_cache_module, "check_token_security", check)
+    cache = SecurityCache()
+    results = await asyncio.gather(cache.get_or_check(WETH), cache.get_or_check(WETH.lower()))
+    assert results == [True, True]
+    assert len(calls) == 1
+    assert await cache.get_or_check(WETH[2:]) is True
+    assert len(calls) == 1
+
+    failing = "0x" + "0" * 36 + "dead"
+    assert await cache.get_or_check(failing) is None
+    assert to_address(failing) not in cache.cache
+    await cache.get_or_check(failing)
+    assert len(calls) == 3
@@ -0,0 +1,56 @@
+import io
+import asyncio
+import pytest
+from hex_flow_oracle.output.binary_format import (
+    PoolRecord, FLAG_APPROVED, FLAG_TOKEN0_TRUSTED, FRAME_SIZE,
+    write_record, read_records, iter_frames, read_records_async
+)
+
+V3_LOG = {
+    "address": "0x1f98431c8ad98523631ae4a59f267346ea31f984",
+    "topics": [
+        "0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118",
+        "0x000000000000000000000000a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",
+        "0x000000000000000000000000c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2",
+        "0x0000000000000000000000000000000000000000000000000000000000000bb8"
+    ],
+    "data": "0x000000000000000000000000000000000000000000000000000000000000003c"
+            "0000000000000000000000008ad599c3a0ff1de082011efddc58f1908eb6e6d8",
+    "blockNumber": "0xbc9f5e"
+}
+
+def test_record_from_log_roundtrip():
+    record = PoolRecord.from_log(V3_LOG, 3, True, True, chain_id=1, received_ns=123)
+
+    assert record.token0.hex() == "a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+    assert record.token1.hex() == "c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+    assert record.fee == 3000
+    assert record.pool.hex() == "8ad599c3a0ff1de082011efddc58f1908eb6e6d8"
+    assert record.block_number == 0xbc9f5e
+    assert record.flags == FLAG_APPROVED and record.approved
+
+    frame = record.to_frame()
+    assert len(frame) == FRAME_SIZE
+    assert list(iter_frames(frame)) == [record]
+
+def test_stream_reader_handles_partial_frames():
+    stream = io.BytesIO()
+    first = PoolRecord.from_log(V3_LOG, 3, True, False)
+    second = PoolRecord.from_log(V3_LOG, 2, True, True, received_ns=7)
+    write_record(stream, first)
+    write_record(stream, second)
+    data = stream.getvalue()
+
+    assert first.flags == FLAG_TOKEN0_TRUSTED and not first.approved
+    assert list(read_records(io.BytesIO(data))) == [first, second]
+    # A truncated trailing frame is left for the next read
+    assert list(iter_frames(data[:-5])) == [first]
+
+@pytest.mark.asyncio
+async def test_async_reader():
+    record = PoolRecord.from_log(V3_LOG, 3, True, True)
+    reader = asyncio.StreamReader()
+    reader.feed_data(record.to_frame() * 3)
+    reader.feed_eof()
+
+    assert [r async for r in read_records_async(reader)] == [record] * 3
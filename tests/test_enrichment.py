@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from eth_abi import decode, encode
+
+from hex_flow_oracle.events.enrichment import PoolEnricher
+from hex_flow_oracle.network.multicall import AGGREGATE3_SELECTOR, Multicall
+from hex_flow_oracle.network.rpc import RpcError
+from hex_flow_oracle.output.binary_format import FLAG_APPROVED, PoolRecord
+
+WETH = bytes.fromhex("c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2")
+USDC = bytes.fromhex("a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48")
+MKR = bytes.fromhex("9f8f72aa9304c8b593d555f12ef6589cc3a579a2")
+V2_PAIR = bytes.fromhex("b4e16d0168e52d35cacd2c6185b44281ec28c9dc")
+V3_POOL = bytes.fromhex("88e6a0c2ddd26feeb64f039a2c41296fcb3f5640")
+
+RETURNS = {
+    (WETH, "06fdde03"): encode(["string"], ["Wrapped Ether"]),
+    (WETH, "95d89b41"): encode(["string"], ["WETH"]),
+    (WETH, "313ce567"): encode(["uint8"], [18]),
+    (WETH, "18160ddd"): encode(["uint256"], [3 * 10**24]),
+    (USDC, "06fdde03"): encode(["string"], ["USD Coin"]),
+    (USDC, "95d89b41"): encode(["string"], ["USDC"]),
+    (USDC, "313ce567"): encode(["uint8"], [6]),
+    (USDC, "18160ddd"): encode(["uint256"], [25 * 10**15]),
+    (MKR, "06fdde03"): b"Maker".ljust(32, b"\0"),
+    (MKR, "95d89b41"): b"MKR".ljust(32, b"\0"),
+    (MKR, "313ce567"): encode(["uint8"], [18]),
+    (V2_PAIR, "0902f1ac"): encode(["uint112", "uint112", "uint32"], [5 * 10**13, 2 * 10**22, 1]),
+    (V3_POOL, "3850c7bd"): encode(
+        ["uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool"],
+        [2**96, -201000, 0, 1, 1, 0, True]
+    ),
+    (V3_POOL, "1a686502"): encode(["uint128"], [10**18]),
+}
+
+class StubRpc:
+    """Answers aggregate3 eth_calls from RETURNS; unknown calls revert"""
+    def __init__(self):
+        self.round_trips = 0
+
+    async def batch(self, calls):
+        self.round_trips += 1
+        replies = []
+        for method, (call, block) in calls:
+            data = bytes.fromhex(call["data"][2:])
+            assert method == "eth_call" and data[:4] == AGGREGATE3_SELECTOR
+            results = []
+            for target, _, call_data in decode(["(address,bool,bytes)[]"], data[4:])[0]:
+                returned = RETURNS.get((bytes.fromhex(target[2:]), call_data.hex()))
+                results.append((returned is not None, returned or b""))
+            replies.append("0x" + encode(["(bool,bytes)[]"], [results]).hex())
+        return replies
+
+def record(version, token0, token1, pool):
+    return PoolRecord(version=version, token0=token0, token1=token1, pool=pool,
+                      fee=3000 if version == 3 else 0, flags=FLAG_APPROVED)
+
+@pytest.mark.asyncio
+async def test_pools_in_one_window_share_a_round_trip():
+    rpc = StubRpc()
+    enricher = PoolEnricher(Multicall(rpc, chunk_size=8), window=0.01)
+    v2, v3 = await asyncio.gather(
+        enricher.enrich(record(2, USDC, WETH, V2_PAIR)),
+        enricher.enrich(record(3, MKR, WETH, V3_POOL)),
+    )
+    # 9 metadata + 4 supply + 1 reserves + 2 V3 calls, split in 2 chunks of one batch
+    assert rpc.round_trips == 1 and enricher.batches == 1
+    assert (v2.token0.symbol, v2.token0.decimals, v2.token1.name) == ("USDC", 6, "Wrapped Ether")
+    assert (v2.reserve0, v2.reserve1) == (5 * 10**13, 2 * 10**22)
+    assert v3.token0.name == "Maker" and v3.total_supply0 is None
+    assert (v3.sqrt_price_x96, v3.tick, v3.liquidity) == (2**96, -201000, 10**18)
+    assert v3.to_dict()["token1"]["address"] == "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+    # Immutable metadata is cached; only supplies and pool state are read again
+    again = await enricher.enrich(record(2, USDC, WETH, V2_PAIR))
+    assert again.token0.symbol == "USDC" and rpc.round_trips == 2
+
+@pytest.mark.asyncio
+async def test_failed_chunk_marks_its_calls_failed():
+    class FailingRpc:
+        async def batch(self, calls):
+            return [RpcError({"message": "execution reverted"}) for _ in calls]
+
+    enricher = PoolEnricher(Multicall(FailingRpc()), window=0)
+    result = await enricher.enrich(record(2, USDC, WETH, V2_PAIR))
+    assert result.token0.symbol is None and result.reserve0 is None
+    assert not enricher.metadata
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from hex_flow_oracle.core.event_buffer import AsyncEventBuffer, OverflowPolicy
+
+@pytest.mark.asyncio
+async def test_ring_buffer_wraps_in_order():
+    buffer = AsyncEventBuffer(max_size=3)
+    for i in range(3):
+        await buffer.put(i)
+    assert buffer.get_nowait() == 0
+    await buffer.put(3)
+    assert await buffer.get_many(10) == [1, 2, 3]
+    assert buffer.empty()
+    assert buffer.enqueued == buffer.dequeued == 4
+
+@pytest.mark.asyncio
+async def test_drop_policies():
+    oldest = AsyncEventBuffer(max_size=2, policy=OverflowPolicy.DROP_OLDEST)
+    newest = AsyncEventBuffer(max_size=2, policy=OverflowPolicy.DROP_NEWEST)
+    for i in range(4):
+        await oldest.put(i)
+        await newest.put(i)
+    assert await oldest.get_many(5) == [2, 3]
+    assert await newest.get_many(5) == [0, 1]
+    assert oldest.dropped_oldest == 2 and newest.dropped_newest == 2
+
+@pytest.mark.asyncio
+async def test_coalesce_replaces_in_place():
+    buffer = AsyncEventBuffer(max_size=3, policy=OverflowPolicy.COALESCE, key=lambda e: e[0])
+    for event in [("a", 1), ("b", 1), ("a", 2), ("c", 1), ("d", 1)]:
+        await buffer.put(event)
+    # "a" was updated in place, then evicted as the oldest when "d" arrived
+    assert buffer.coalesced == 1 and buffer.dropped_oldest == 1
+    assert await buffer.get_many(5) == [("b", 1), ("c", 1), ("d", 1)]
+    await buffer.put(("b", 2))
+    assert buffer.get_nowait() == ("b", 2)
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_space():
+    buffer = AsyncEventBuffer(max_size=1)
+    await buffer.put("first")
+    producer = asyncio.create_task(buffer.put("second"))
+    await asyncio.sleep(0)
+    assert not producer.done()
+    assert buffer.get_nowait() == "first"
+    await asyncio.wait_for(producer, 1)
+    assert buffer.get_nowait() == "second"
+
+@pytest.mark.asyncio
+async def test_watermarks_fire_once_per_crossing():
+    events = []
+    buffer = AsyncEventBuffer(
+        max_size=10, high_watermark=0.5, low_watermark=0.2,
+        on_high_watermark=lambda: events.append("high"),
+        on_low_watermark=lambda: events.append("low")
+    )
+    for i in range(7):
+        buffer.put_nowait(i)
+    assert events == ["high"]
+    assert buffer.occupancy == 0.7
+    await buffer.get_many(4)
+    assert events == ["high"]
+    await buffer.get_many(1)
+    assert events == ["high", "low"]
+
+@pytest.mark.asyncio
+async def test_get_many_timeout_and_close():
+    buffer = AsyncEventBuffer(max_size=4)
+    assert await buffer.get_many(5, timeout=0.01) == []
+    waiter = asyncio.create_task(buffer.get_many(5))
+    await asyncio.sleep(0)
+    buffer.put_nowait("x")
+    buffer.put_nowait("y")
+    assert await waiter == ["x", "y"]
+    buffer.put_nowait("z")
+    buffer.close()
+    assert [event async for event in buffer] == ["z"]
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+
+from hex_flow_oracle.core.event_buffer import AsyncEventBuffer, OverflowPolicy
+from hex_flow_oracle.events.address_lookup import AddressLookup
+from hex_flow_oracle.events.event_processor import EventProcessor
+
+@pytest.mark.asyncio
+async def test_slow_event_does_not_hold_back_others():
+    finished = []
+
+    async def handler(event):
+        await asyncio.sleep(0.2 if event == "slow" else 0)
+        finished.append(event)
+
+    processor = EventProcessor(None, handler=handler, concurrency=4)
+    worker = asyncio.create_task(processor.process_events())
+    for event in ["slow", "a", "b", "c"]:
+        await processor.submit(event)
+    await asyncio.sleep(0.05)
+    assert finished == ["a", "b", "c"]
+    await asyncio.sleep(0.3)
+    assert finished[-1] == "slow"
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    assert processor.processed == 4
+    assert processor.queue_wait.count == 4
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    running = peak = 0
+
+    async def handler(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    processor = EventProcessor(None, handler=handler, concurrency=3)
+    await processor.process_batch(range(10))
+    assert peak == 3
+    assert processor.processed == 10
+    assert processor.throughput() > 0
+
+@pytest.mark.asyncio
+async def test_backlog_stays_in_the_buffer():
+    release = asyncio.Event()
+
+    async def handler(event):
+        await release.wait()
+
+    buffer = AsyncEventBuffer(max_size=4, policy=OverflowPolicy.DROP_OLDEST)
+    processor = EventProcessor(None, buffer=buffer, handler=handler, concurrency=8, max_batch_size=3)
+    worker = asyncio.create_task(processor.process_events())
+    for event in range(3):
+        await processor.submit(event)
+    await asyncio.sleep(0.01)
+    for event in range(3, 10):
+        await processor.submit(event)
+    await asyncio.sleep(0.01)
+    # Only the in-flight limit is claimed; the buffer's policy sees the rest
+    assert processor.in_flight == 3
+    assert len(buffer) == 4 and buffer.dropped_oldest == 3
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert processor.processed == 7
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+
+@pytest.mark.asyncio
+async def test_batch_size_backs_off_only_under_congestion():
+    processor = EventProcessor(None, handler=None, concurrency=8, target_latency=0.1)
+    assert processor.batch_size == 8 and processor.min_batch_size == 4
+    # Slow but steady handlers: above target, yet no slower than uncongested
+    for _ in range(20):
+        processor._record_service(0.5)
+        processor._adjust_batch_size()
+    assert processor.batch_size == 8
+    # Service time climbing well past its baseline: back off, down to the floor
+    for _ in range(20):
+        processor._record_service(2.0)
+    processor._adjust_batch_size()
+    assert processor.batch_size == 4
+    processor._adjust_batch_size()
+    assert processor.batch_size == 4
+
+@pytest.mark.asyncio
+async def test_slow_handlers_keep_full_concurrency():
+    async def handler(event):
+        await asyncio.sleep(0.12)
+
+    # Every handler is slower than the target, as a slow GoPlus answer would be
+    processor = EventProcessor(None, handler=handler, concurrency=8, target_latency=0.1)
+    worker = asyncio.create_task(processor.process_events())
+    started = time.perf_counter()
+    for event in range(40):
+        await processor.submit(event)
+    while processor.processed < 40:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    # Five rounds of eight, not forty handlers one after another
+    assert elapsed < 1.5
+    assert processor.batch_size == 8
+
+@pytest.mark.asyncio
+async def test_routes_frames_and_counts_failures():
+    routed = []
+
+    async def handle(log):
+        routed.append(log["address"])
+
+    async def broken(log):
+        raise ValueError("boom")
+
+    aa, bb, topic = "0x" + "aa" * 20, "0x" + "bb" * 20, "0x" + "01" * 32
+    processor = EventProcessor(AddressLookup({(aa, topic): handle, (bb, topic): broken}))
+    await processor.process_batch([
+        {"params": {"result": {"address": aa.upper().replace("0X", "0x"), "topics": [topic]}}},
+        {"params": {"result": {"address": aa, "topics": ["0x" + "02" * 32]}}},
+        {"params": {"result": {"address": bb, "topics": [topic]}}},
+        {"method": "heartbeat"},
+    ])
+    assert routed == [aa.upper().replace("0X", "0x")]
+    assert processor.failed == 1
+    assert processor.processed == 3
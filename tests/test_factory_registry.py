@@ -0,0 +1,58 @@
+import pytest
+
+from hex_flow_oracle.config import FACTORIES
+from hex_flow_oracle.core.address import to_address
+from hex_flow_oracle.events.address_lookup import AddressLookup
+from hex_flow_oracle.events.factory_registry import (
+    FactoryRegistry,
+    V2_PAIR_CREATED_TOPIC,
+    V3_POOL_CREATED_TOPIC,
+    decode_v3_log,
+)
+
+PANCAKE_V3 = "0x0BFbCF9fa4f9C56B0F40a671Ad40E0805A091865"
+SUSHI_V2 = "0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac"
+
+def pool_created(factory):
+    return {
+        "address": factory.lower(),
+        "topics": [
+            V3_POOL_CREATED_TOPIC,
+            "0x000000000000000000000000a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",
+            "0x000000000000000000000000c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2",
+            "0x00000000000000000000000000000000000000000000000000000000000009c4",
+        ],
+        # (int24 tickSpacing, address pool)
+        "data": "0x0000000000000000000000000000000000000000000000000000000000000032"
+                "0000000000000000000000001ac1a8feaaea1900c4166deeed0c11cc10669d36",
+    }
+
+def test_routes_by_address_and_topic():
+    registry = FactoryRegistry.from_config(FACTORIES)
+    assert {"sushiswap_v2", "pancakeswap_v2", "pancakeswap_v3"} <= {factory.name for factory in registry.factories}
+
+    factory = registry.lookup(pool_created(PANCAKE_V3))
+    assert (factory.name, factory.version) == ("pancakeswap_v3", 3)
+    token0, token1, fee, pool = factory.decode(pool_created(PANCAKE_V3))
+    assert (fee, pool) == (2500, to_address("0x1ac1a8feaaea1900c4166deeed0c11cc10669d36"))
+
+    # A V2 factory never emits PoolCreated, and other contracts are not routed
+    assert registry.lookup(pool_created(SUSHI_V2)) is None
+    assert registry.lookup(dict(pool_created(PANCAKE_V3), address="0x" + "11" * 20)) is None
+    assert registry.lookup({"address": PANCAKE_V3, "topics": []}) is None
+
+    async def v2(log): pass
+    async def v3(log): pass
+    lookup = AddressLookup.from_registry(registry, {2: v2, 3: v3})
+    assert lookup.get(pool_created(PANCAKE_V3)) is v3
+    assert lookup.get(dict(pool_created(SUSHI_V2), topics=[V2_PAIR_CREATED_TOPIC])) is v2
+
+def test_filters_cover_every_factory_within_the_address_limit():
+    registry = FactoryRegistry.from_config({f"fork_{i}": ("v2", f"0x{i + 1:040x}") for i in range(5)})
+    filters = registry.log_filters(max_addresses=2)
+    assert [len(f["address"]) for f in filters] == [2, 2, 1]
+    assert all(f["topics"] == [[V2_PAIR_CREATED_TOPIC]] for f in filters)
+    assert len(FactoryRegistry.from_config(FACTORIES).log_filters()) == 1
+
+    with pytest.raises(ValueError):
+        FactoryRegistry.from_config({"curve": ("stableswap", SUSHI_V2)})
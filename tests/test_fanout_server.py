@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from hex_flow_oracle.network.fanout_server import FanoutServer, SubscriberFilter, Subscriber, SlowConsumerPolicy, subscribe
+from hex_flow_oracle.output.binary_format import PoolRecord, FLAG_APPROVED
+
+WETH = bytes.fromhex("c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2")
+
+def make_record(fee, token0=b"\x01" * 20, flags=FLAG_APPROVED):
+    return PoolRecord(version=3, token0=token0, token1=WETH, pool=b"\x02" * 20, fee=fee, flags=flags)
+
+async def wait_for_subscribers(server, count):
+    while len(server.subscribers) < count:
+        await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_fanout_filters_per_subscriber(tmp_path):
+    path = str(tmp_path / "fanout.sock")
+    server = await FanoutServer(path=path).start()
+    everything = subscribe(path=path)
+    low_fee = subscribe(path=path, fee=[500])
+
+    first_all = asyncio.ensure_future(everything.__anext__())
+    first_low = asyncio.ensure_future(low_fee.__anext__())
+    await wait_for_subscribers(server, 2)
+
+    server.publish(make_record(3000, flags=0))  # Not approved, never fanned out
+    server.publish(make_record(3000))
+    server.publish(make_record(500))
+
+    assert (await first_all).fee == 3000
+    assert (await everything.__anext__()).fee == 500
+    assert (await first_low).fee == 500
+
+    await everything.aclose()
+    await low_fee.aclose()
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_slow_consumer_policies():
+    drop = Subscriber(None, SubscriberFilter(), queue_size=1, policy=SlowConsumerPolicy.DROP)
+    disconnect = Subscriber(None, SubscriberFilter(), queue_size=1, policy=SlowConsumerPolicy.DISCONNECT)
+    record = make_record(3000)
+
+    assert drop.offer(record, b"frame") and drop.offer(record, b"frame")
+    assert drop.dropped == 1
+    assert disconnect.offer(record, b"frame")
+    assert not disconnect.offer(record, b"frame")
+
+def test_base_token_filter():
+    record_filter = SubscriberFilter.from_request({"base_token": ["0x" + WETH.hex()]})
+
+    assert record_filter.matches(make_record(500))
+    assert not record_filter.matches(PoolRecord(3, b"\x01" * 20, b"\x03" * 20, b"\x02" * 20))
@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+from eth_abi import decode, encode
+from eth_hash.auto import keccak
+
+from hex_flow_oracle.core.address import to_address
+from hex_flow_oracle.network.multicall import AGGREGATE3_SELECTOR, Multicall
+from hex_flow_oracle.network.rpc import RpcError
+from hex_flow_oracle.security import token_security
+from hex_flow_oracle.security.honeypot import HoneypotSimulator, SimulationResult, SYNTHETIC_ACCOUNT
+
+ROUTER = to_address("0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D")
+WETH = to_address("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
+TAXED = to_address("0x00000000000000000000000000000000000000a1")
+HONEYPOT = to_address("0x00000000000000000000000000000000000000a2")
+ODD_LAYOUT = to_address("0x00000000000000000000000000000000000000a3")
+UNLISTED = to_address("0x00000000000000000000000000000000000000a4")
+
+# Per token: buy tax, sell tax, sellable, (balance slot, allowance slot) of a Solidity layout
+TOKENS = {
+    TAXED: (0.05, 0.1, True, (2, 3)),
+    HONEYPOT: (0.0, 0.0, False, (0, 1)),
+    ODD_LAYOUT: (0.0, 0.0, True, (40, 41)),
+}
+
+def balance_key(holder, slot):
+    return "0x" + keccak(encode(["address", "uint256"], [str(holder), slot])).hex()
+
+def allowance_key(holder, spender, slot):
+    inner = keccak(encode(["address", "uint256"], [str(holder), slot]))
+    return "0x" + keccak(encode(["address", "bytes32"], [str(spender), inner])).hex()
+
+class StubChain:
+    """Answers eth_calls like a V2 router over 1 WETH : 1000 token pairs"""
+    def __init__(self):
+        self.round_trips = 0
+
+    def storage(self, overrides, token, key):
+        value = overrides.get(str(token), {}).get("stateDiff", {}).get(key)
+        return int(value, 16) if value else 0
+
+    def execute(self, call, overrides):
+        to, data = to_address(call["to"]), bytes.fromhex(call["data"][2:])
+        selector, args = data[:4].hex(), data[4:]
+        if to in TOKENS:
+            balance_slot, allowance_slot = TOKENS[to][3]
+            if selector == "70a08231":
+                (holder,) = decode(["address"], args)
+                return encode(["uint256"], [self.storage(overrides, to, balance_key(holder, balance_slot))])
+            if selector == "dd62ed3e":
+                holder, spender = decode(["address", "address"], args)
+                return encode(["uint256"], [self.storage(overrides, to, allowance_key(holder, spender, allowance_slot))])
+        if to != ROUTER:
+            return b""  # No code at the address
+        if selector == "d06ca61f":
+            amount, path = decode(["uint256", "address[]"], args)
+            token = to_address(path[1] if to_address(path[0]) == WETH else path[0])
+            if token not in TOKENS:
+                raise RpcError({"message": "execution reverted"})
+            out = amount * 1000 if to_address(path[0]) == WETH else amount // 1000
+            return encode(["uint256[]"], [[amount, out]])
+        if selector == "b6f9de95":
+            min_out, path, _, _ = decode(["uint256", "address[]", "address", "uint256"], args)
+            buy_tax = TOKENS[to_address(path[1])][0]
+            received = int(call["value"], 16) * 1000
+            received -= received * round(buy_tax * 100) // 100
+            if received < min_out:
+                raise RpcError({"message": "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT"})
+            return b""
+        if selector == "791ac947":
+            amount, min_out, path, sender, _ = decode(["uint256", "uint256", "address[]", "address", "uint256"], args)
+            token = to_address(path[0])
+            _, sell_tax, sellable, (balance_slot, allowance_slot) = TOKENS[token]
+            if (self.storage(overrides, token, balance_key(SYNTHETIC_ACCOUNT, balance_slot)) < amount
+                    or not self.storage(overrides, token, allowance_key(SYNTHETIC_ACCOUNT, ROUTER, allowance_slot))):
+                raise RpcError({"message": "TransferHelper: TRANSFER_FROM_FAILED"})
+            if not sellable:
+                raise RpcError({"message": "execution reverted"})
+            arrived = amount - amount * round(sell_tax * 100) // 100
+            if arrived // 1000 < min_out:
+                raise RpcError({"message": "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT"})
+            return b""
+        raise AssertionError(selector)
+
+    def aggregate3(self, data, overrides):
+        results = []
+        for target, _, call_data in decode(["(address,bool,bytes)[]"], data[4:])[0]:
+            try:
+                results.append((True, self.execute({"to": target, "data": "0x" + call_data.hex()}, overrides)))
+            except RpcError:
+                results.append((False, b""))
+        return "0x" + encode(["(bool,bytes)[]"], [results]).hex()
+
+    async def batch(self, calls):
+        self.round_trips += 1
+        replies = []
+        for method, params in calls:
+            assert method == "eth_call"
+            call, overrides = params[0], params[2] if len(params) > 2 else {}
+            data = bytes.fromhex(call["data"][2:])
+            try:
+                if data[:4] == AGGREGATE3_SELECTOR:
+                    replies.append(self.aggregate3(data, overrides))
+                else:
+                    replies.append("0x" + self.execute(call, overrides).hex())
+            except RpcError as e:
+                replies.append(e)
+        return replies
+
+@pytest.mark.asyncio
+async def test_simulation_measures_taxes_and_sellability_in_batches():
+    chain = StubChain()
+    simulator = HoneypotSimulator(chain, Multicall(chain), ROUTER, WETH, window=0)
+    results = await simulator.simulate_many([TAXED, HONEYPOT, ODD_LAYOUT, UNLISTED])
+    # Layout probe and buy quotes, sell quotes, then every trade in one batch
+    assert chain.round_trips == 3
+
+    assert results[TAXED] == SimulationResult(TAXED, True, True, 0.05, 0.1)
+    assert results[TAXED].is_safe(max_tax=0.1) and not results[TAXED].is_safe()
+    assert results[HONEYPOT] == SimulationResult(HONEYPOT, True, False, 0.0, None)
+    assert results[HONEYPOT].conclusive and not results[HONEYPOT].is_safe(max_tax=1.0)
+    # Balances outside the probed slots cannot be funded, so the sell stays unknown
+    assert results[ODD_LAYOUT].sellable is None and not results[ODD_LAYOUT].conclusive
+    assert results[UNLISTED] == SimulationResult(UNLISTED)
+
+@pytest.mark.asyncio
+async def test_concurrent_simulations_share_a_batch():
+    chain = StubChain()
+    simulator = HoneypotSimulator(chain, Multicall(chain), ROUTER, WETH, window=0.01)
+    taxed, honeypot = await asyncio.gather(simulator.simulate(TAXED), simulator.simulate(HONEYPOT))
+    assert simulator.batches == 1 and chain.round_trips == 3
+    assert taxed.sell_tax == 0.1 and honeypot.sellable is False
+
+def test_simulation_verdict_is_combined_with_goplus():
+    goplus_clean = str({"result": {str(TAXED): {
+        "is_honeypot": "0", "is_blacklisted": "0", "can_take_back_ownership": "0", "cannot_buy": "0",
+        "cannot_sell_all": "0", "personal_slippage_modifiable": "0", "slippage_modifiable": "0",
+        "sell_tax": "0", "buy_tax": "0", "is_airdrop_scam": "0", "is_proxy": "0",
+        "trading_cooldown": "0", "transfer_pausable": "0", "is_in_dex": "1",
+    }}})
+    no_data = str({"result": {}})
+    passed = SimulationResult(TAXED, True, True, 0.0, 0.0)
+    honeypot = SimulationResult(TAXED, True, False, 0.0, None)
+    unknown = SimulationResult(TAXED, True, None, 0.0, None)
+
+    assert token_security.is_token_safe(goplus_clean)
+    assert not token_security.is_token_safe(no_data)
+    assert token_security.is_token_safe(no_data, passed)
+    assert not token_security.is_token_safe(goplus_clean, honeypot)
+    assert token_security.is_token_safe(goplus_clean, unknown)
+    assert not token_security.is_token_safe(no_data, unknown)
+
+@pytest.mark.asyncio
+async def test_simulation_decides_when_goplus_fails(monkeypatch):
+    class StubSimulator:
+        def __init__(self, result):
+            self.result = result
+
+        async def simulate(self, token):
+            return self.result
+
+    def goplus_down(token_address, span=None):
+        raise ConnectionError("GoPlus unavailable")
+    monkeypatch.setattr(token_security, "_query_token_security", goplus_down)
+
+    monkeypatch.setattr(token_security, "honeypot_simulator", StubSimulator(SimulationResult(TAXED, True, True, 0.0, 0.0)))
+    assert await token_security.check_token_security(str(TAXED)) is True
+    monkeypatch.setattr(token_security, "honeypot_simulator", StubSimulator(SimulationResult(TAXED, True, False, 0.0, None)))
+    assert await token_security.check_token_security(str(TAXED)) is False
+    monkeypatch.setattr(token_security, "honeypot_simulator", StubSimulator(SimulationResult(TAXED)))
+    assert await token_security.check_token_security(str(TAXED)) is None
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+import pytest
+
+from hex_flow_oracle.network.io_thread import NetworkThread, ThreadHandoff
+
+@pytest.mark.asyncio
+async def test_network_thread_runs_coroutines_off_loop():
+    network = NetworkThread().start()
+
+    async def whoami():
+        return threading.current_thread().name
+
+    try:
+        assert await network.run(whoami()) == "hex-flow-network"
+    finally:
+        await network.stop()
+    assert not network._thread.is_alive()
+
+@pytest.mark.asyncio
+async def test_handoff_delivers_in_order_across_threads():
+    received = []
+    done = asyncio.Event()
+
+    async def deliver(item):
+        received.append((threading.current_thread() is threading.main_thread(), item))
+        if item == 999:
+            done.set()
+
+    handoff = ThreadHandoff(asyncio.get_running_loop(), deliver)
+    network = NetworkThread().start()
+
+    async def produce():
+        for i in range(1000):
+            await handoff.submit(i)
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+
+    try:
+        await network.run(produce())
+        await asyncio.wait_for(done.wait(), 5)
+    finally:
+        await network.stop()
+        await handoff.close()
+    assert [item for _, item in received] == list(range(1000))
+    assert all(on_main for on_main, _ in received)
+    assert handoff.latency.count == handoff.handed_off == 1000
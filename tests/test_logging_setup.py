@@ -0,0 +1,34 @@
+import json
+import logging
+import os
+import time
+from hex_flow_oracle.monitoring.logging_setup import JsonFormatter, SizeAndTimeRotatingFileHandler
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord("hex_flow_oracle", logging.ERROR, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_is_lazy_and_structured():
+    line = JsonFormatter().format(make_record("Subscription attempt failed: %s", "429", attempt=3))
+    entry = json.loads(line)
+
+    assert entry["message"] == "Subscription attempt failed: 429"
+    assert entry["level"] == "ERROR"
+    assert entry["attempt"] == 3
+
+def test_rotation_by_size_and_age(tmp_path):
+    path = str(tmp_path / "oracle.log")
+    handler = SizeAndTimeRotatingFileHandler(path, maxBytes=64, backupCount=2, interval=3600)
+    for i in range(4):
+        handler.emit(make_record("x" * 40))
+    assert os.path.exists(path + ".1") and os.path.exists(path + ".2")
+    assert not os.path.exists(path + ".3")
+
+    handler.maxBytes = 0
+    handler.emit(make_record("old"))
+    handler.rollover_at = time.time() - 1
+    handler.emit(make_record("new"))
+    handler.close()
+    with open(path) as f:
+        assert f.read().strip() == "new"
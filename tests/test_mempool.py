@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from hex_flow_oracle.core.address import to_address
+from hex_flow_oracle.events.mempool import MempoolWatcher, decode_factory_call
+from hex_flow_oracle.output.binary_format import PoolRecord
+from hex_flow_oracle.security import security_cache, token_security
+
+V2_FACTORY = to_address("0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f")
+V3_FACTORY = to_address("0x1F98431c8aD98523631AE4a59f267346ea31F984")
+TOKEN_A = to_address("0x00000000000000000000000000000000000000bb")
+TOKEN_B = to_address("0x00000000000000000000000000000000000000aa")
+
+SAFE = {
+    "is_honeypot": "0", "is_blacklisted": "0", "can_take_back_ownership": "0", "cannot_buy": "0",
+    "cannot_sell_all": "0", "personal_slippage_modifiable": "0", "slippage_modifiable": "0",
+    "sell_tax": "0", "buy_tax": "0", "is_airdrop_scam": "0", "is_proxy": "0",
+    "trading_cooldown": "0", "transfer_pausable": "0",
+}
+
+def word(value):
+    return value.hex().rjust(64, "0") if isinstance(value, bytes) else f"{value:064x}"
+
+def create_pair_tx(tx_hash="0x01"):
+    return {"hash": tx_hash, "to": str(V2_FACTORY), "input": "0xc9c65396" + word(TOKEN_A) + word(TOKEN_B)}
+
+def test_decodes_factory_calls_with_sorted_tokens():
+    factories = {V2_FACTORY: 2, V3_FACTORY: 3}
+    pending = decode_factory_call(create_pair_tx(), factories)
+    assert (pending.version, pending.token0, pending.token1, pending.fee) == (2, TOKEN_B, TOKEN_A, 0)
+
+    create_pool = {"hash": "0x02", "to": V3_FACTORY.checksum,
+                   "input": "0xa1671295" + word(TOKEN_B) + word(TOKEN_A) + word(3000)}
+    assert decode_factory_call(create_pool, factories).fee == 3000
+    # Other selectors, other contracts and contract creations are ignored
+    assert decode_factory_call(dict(create_pool, input="0xa9059cbb" + word(TOKEN_A) + word(1)), factories) is None
+    assert decode_factory_call(dict(create_pair_tx(), to=str(TOKEN_A)), factories) is None
+    assert decode_factory_call(dict(create_pair_tx(), to=None), factories) is None
+
+@pytest.mark.asyncio
+async def test_prewarms_verdicts_and_matches_the_mined_log(monkeypatch):
+    checked = []
+    async def fake_check(address, in_dex=False):
+        checked.append(address)
+        return {"is_honeypot": "0"}
+    monkeypatch.setattr(security_cache, "check_token_security", fake_check)
+    cache = security_cache.SecurityCache()
+    watcher = MempoolWatcher({V2_FACTORY: 2}, cache)
+
+    assert watcher.on_pending_tx(create_pair_tx())
+    assert watcher.on_pending_tx(create_pair_tx()) is None  # Same transaction seen twice
+    await asyncio.gather(*watcher._prewarm_tasks)
+    assert sorted(checked) == sorted([str(TOKEN_A), str(TOKEN_B)])
+    assert await cache.get_or_check(TOKEN_A) and len(checked) == 2
+
+    log = {"address": str(V2_FACTORY), "transactionHash": "0xother",
+           "topics": ["0x0d3648bd", "0x" + word(TOKEN_B), "0x" + word(TOKEN_A)]}
+    assert watcher.match_log(log).tx_hash == "0x01"
+    assert len(watcher) == 0 and watcher.matched == 1
+    assert watcher.match_log(log) is None
+    await watcher.close()
+
+@pytest.mark.asyncio
+async def test_mined_lookups_finish_speculative_verdicts(monkeypatch):
+    mined = False
+    checked = []
+    async def fake_check(address, in_dex=False):
+        # GoPlus only lists the token in a dex once the pool exists
+        checked.append(address)
+        honeypot = "1" if address == str(TOKEN_B) else "0"
+        data = dict(SAFE, is_honeypot=honeypot, is_in_dex="1" if mined else "0")
+        return token_security.is_token_safe(str({"result": {address: data}}), in_dex=in_dex)
+    monkeypatch.setattr(security_cache, "check_token_security", fake_check)
+    cache = security_cache.SecurityCache()
+    watcher = MempoolWatcher({V2_FACTORY: 2}, cache)
+
+    watcher.on_pending_tx(create_pair_tx())
+    assert sorted(await asyncio.gather(*watcher._prewarm_tasks)) == [False, True]
+
+    mined = True
+    assert await cache.get_or_check(TOKEN_A) is True
+    assert await cache.get_or_check(TOKEN_B) is False
+    assert len(checked) == 2
+
+    # A log that arrives mid-check shares the speculative request
+    cache.cache.clear()
+    token_c = to_address("0x" + "cc" * 20)
+    watcher.on_pending_tx({"hash": "0x02", "to": str(V2_FACTORY),
+                           "input": "0xc9c65396" + word(TOKEN_A) + word(token_c)})
+    assert await cache.get_or_check(TOKEN_A) is True
+    await asyncio.gather(*watcher._prewarm_tasks)
+    assert sorted(checked[2:]) == sorted([str(TOKEN_A), str(token_c)])
+    await watcher.close()
+
+class NoCache:
+    async def prewarm(self, token):
+        return None
+
+@pytest.mark.asyncio
+async def test_hash_only_notifications_are_fetched_in_one_batch():
+    class StubRpc:
+        def __init__(self):
+            self.batches = []
+
+        async def batch(self, calls):
+            self.batches.append(calls)
+            return [create_pair_tx(params[0]) if params[0] == "0x01" else None for _, params in calls]
+
+    rpc = StubRpc()
+    watcher = MempoolWatcher({V2_FACTORY: 2}, NoCache(), fetch_window=0.01)
+    for tx_hash in ("0x01", "0x02", "0x03"):
+        await watcher._on_message({"params": {"subscription": "0xs", "result": tx_hash}}, rpc)
+    await asyncio.sleep(0.05)
+    assert len(rpc.batches) == 1 and len(rpc.batches[0]) == 3
+    assert len(watcher) == 1
+    record = PoolRecord(version=2, token0=bytes(TOKEN_B), token1=bytes(TOKEN_A), pool=b"\1" * 20)
+    assert watcher.match_record(record).tx_hash == "0x01"
+    await watcher.close()
+
+@pytest.mark.asyncio
+async def test_unmined_entries_expire():
+    watcher = MempoolWatcher({V2_FACTORY: 2}, NoCache(), ttl=60, max_pending=2)
+    first = watcher.on_pending_tx(create_pair_tx("0x01"))
+    watcher.expire(first.seen_ns + 59 * 10**9)
+    assert len(watcher) == 1
+    watcher.expire(first.seen_ns + 61 * 10**9)
+    assert len(watcher) == 0 and not watcher._by_key
+
+    for tx_hash in ("0x02", "0x03", "0x04"):
+        watcher.on_pending_tx(create_pair_tx(tx_hash))
+    assert list(watcher._by_tx) == ["0x03", "0x04"]
+    await watcher.close()
@@ -0,0 +1,42 @@
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from hex_flow_oracle.monitoring.metrics import LatencyHistogram, MetricsRegistry, MetricsServer
+
+def test_histogram_quantiles_within_precision():
+    histogram = LatencyHistogram()
+    for micros in range(1, 10001):
+        histogram.record(micros / 1e6)
+
+    assert histogram.count == 10000
+    for q in (0.5, 0.99):
+        expected = q * 10000 / 1e6
+        assert abs(histogram.percentile(q) - expected) / expected < 0.04
+    assert histogram.percentile(1.0) == pytest.approx(0.01)
+
+def test_registry_render():
+    registry = MetricsRegistry(namespace="test")
+    registry.stage("decode").record(0.002)
+    registry.inc("goplus_errors_total", help_text="Failed requests")
+    registry.inc("goplus_errors_total")
+    registry.gauge("buffer_depth", lambda: 7)
+    registry.gauge("broken", lambda: 1 / 0)
+
+    text = registry.render()
+    assert '# TYPE test_stage_latency_seconds summary' in text
+    assert 'test_stage_latency_seconds_count{stage="decode"} 1' in text
+    assert 'test_stage_latency_seconds{stage="decode",quantile="0.99"}' in text
+    assert '# HELP test_goplus_errors_total Failed requests' in text
+    assert 'test_goplus_errors_total 2' in text
+    assert 'test_buffer_depth 7.0' in text
+    assert not [line for line in text.splitlines() if line.startswith('test_broken')]
+    assert registry.counter_value("goplus_errors_total") == 2
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    registry = MetricsRegistry(namespace="test")
+    with registry.stage("handle").time():
+        pass
+    async with TestClient(TestServer(MetricsServer(registry).make_app())) as client:
+        response = await client.get("/metrics")
+        assert response.status == 200
+        assert 'test_stage_latency_seconds_count{stage="handle"} 1' in await response.text()
@@ -0,0 +1,79 @@
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from hex_flow_oracle.storage.pool_graph import PoolGraph
+from hex_flow_oracle.storage.pool_index import PoolIndex, PoolIndexServer
+from hex_flow_oracle.output.binary_format import PoolRecord, FLAG_APPROVED
+
+WETH = bytes.fromhex("c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2")
+USDC = bytes.fromhex("a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48")
+PEPE = bytes.fromhex("6982508145454ce325ddbe47a25d4ec3d2311933")
+DAI = bytes.fromhex("6b175474e89094c44da98b954eedeac495271d0f")
+
+def make_record(n, token0, token1, fee=3000, version=3, flags=FLAG_APPROVED):
+    return PoolRecord(version=version, token0=token0, token1=token1, pool=n.to_bytes(20, "big"), fee=fee, flags=flags)
+
+@pytest.fixture
+def graph():
+    graph = PoolGraph()
+    graph.add(make_record(1, PEPE, WETH))
+    graph.add(make_record(2, PEPE, WETH, fee=10000))
+    graph.add(make_record(3, PEPE, USDC, fee=0, version=2))
+    graph.add(make_record(4, USDC, WETH, fee=500))
+    graph.add(make_record(5, DAI, USDC, fee=100, flags=0))
+    graph.add(make_record(6, DAI, WETH))
+    return graph
+
+def pools(path):
+    return [int.from_bytes(hop.pool, "big") for hop in path]
+
+def test_paths_are_updated_incrementally(graph):
+    assert len(graph) == 6 and graph.node_count == 4
+    assert not graph.add(make_record(1, PEPE, WETH))  # Duplicate delivery
+    assert set(graph.neighbors(PEPE)) == {WETH, USDC}
+
+    paths = graph.paths(PEPE, WETH, max_hops=2)
+    assert [pools(path) for path in paths] == [[1], [2], [3, 4]]
+    hop = paths[2][0]
+    assert (hop.token_in, hop.token_out, hop.version, hop.fee) == (PEPE, USDC, 2, 0)
+    # Each hop is oriented along the path, whichever token the pool lists first
+    assert [(h.token_in, h.token_out) for h in graph.paths(WETH, PEPE)[2]] == [(WETH, USDC), (USDC, PEPE)]
+
+    assert [pools(p) for p in graph.paths(PEPE, DAI, max_hops=3)] == [[1, 6], [2, 6], [3, 5], [1, 4, 5], [2, 4, 5], [3, 4, 6]]
+    assert [pools(p) for p in graph.paths(PEPE, DAI, max_hops=3, approved_only=True)] == [[1, 6], [2, 6], [3, 4, 6]]
+    assert graph.paths(PEPE, DAI, max_hops=1) == []
+
+    graph.add(make_record(7, DAI, PEPE))
+    assert [pools(p) for p in graph.paths(PEPE, DAI, limit=2)] == [[7], [1, 6]]
+    assert graph.paths(PEPE, bytes(20)) == [] and graph.pools_between(USDC, WETH)[0].fee == 500
+    with pytest.raises(ValueError):
+        graph.paths(PEPE, DAI, limit=0)
+
+def test_path_search_is_bounded():
+    graph = PoolGraph()
+    graph.add(make_record(1, USDC, WETH))
+    for n in range(2, 1002):
+        graph.add(make_record(n, n.to_bytes(20, "big"), WETH))
+    graph.add(make_record(1002, PEPE, USDC))
+    graph.add(make_record(1003, DAI, (1001).to_bytes(20, "big")))
+    # PEPE -> USDC -> WETH -> DAI's quote token walks all of WETH's pools
+    assert len(graph.paths(PEPE, DAI, max_hops=4)) == 1
+    with pytest.raises(ValueError):
+        graph.paths(PEPE, DAI, max_hops=4, max_visits=500)
+    assert len(graph.paths(PEPE, WETH, max_hops=3, max_visits=500)) == 1
+
+@pytest.mark.asyncio
+async def test_http_paths(graph):
+    server = PoolIndexServer(PoolIndex(), graph=graph)
+    async with TestClient(TestServer(server.make_app())) as client:
+        response = await client.get("/paths", params={"from": "0x" + PEPE.hex(), "to": "0x" + WETH.hex()})
+        body = await response.json()
+        assert body["count"] == 3
+        assert body["paths"][2][1] == {
+            "pool": "0x" + (4).to_bytes(20, "big").hex(), "token_in": "0x" + USDC.hex(),
+            "token_out": "0x" + WETH.hex(), "version": 3, "fee": 500,
+        }
+        assert (await client.get("/paths", params={"from": "0x" + PEPE.hex()})).status == 400
+        assert (await client.get("/paths", params={"from": "0x" + PEPE.hex(), "to": "0x" + WETH.hex(),
+                                                   "limit": "0"})).status == 400
+        assert (await client.get("/paths", params={"from": "0x" + PEPE.hex(), "to": "0x" + WETH.hex(),
+                                                   "max_hops": "5"})).status == 400
@@ -0,0 +1,55 @@
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from hex_flow_oracle.storage.pool_index import PoolIndex, PoolIndexServer
+from hex_flow_oracle.output.binary_format import PoolRecord, FLAG_APPROVED
+
+WETH = bytes.fromhex("c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2")
+USDC = bytes.fromhex("a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48")
+
+def make_record(n, token0, token1=WETH, fee=3000, version=3, chain_id=1):
+    return PoolRecord(
+        version=version, token0=token0, token1=token1, pool=n.to_bytes(20, "big"),
+        fee=fee, chain_id=chain_id, block_number=100 + n, received_ns=n * 10**9, flags=FLAG_APPROVED
+    )
+
+@pytest.fixture
+def index():
+    index = PoolIndex()
+    index.add(make_record(1, USDC))
+    index.add(make_record(2, USDC, fee=500))
+    index.add(make_record(3, bytes(20), version=2, fee=0))
+    index.add(make_record(4, USDC, chain_id=137))
+    index.add(make_record(4, USDC, chain_id=137))  # Duplicate delivery
+    return index
+
+def test_lookups(index):
+    assert len(index) == 4
+    assert [r.block_number for r in index.query(token=WETH)] == [101, 102, 103, 104]
+    assert [r.fee for r in index.query(pair=(WETH, USDC), chain_id=1)] == [3000, 500]
+    assert [r.block_number for r in index.query(version=2)] == [103]
+    assert [r.block_number for r in index.query(token=USDC, since_ns=2 * 10**9)] == [102, 104]
+    assert index.query(token=USDC, fee=10000) == []
+    assert index.record(0) == make_record(1, USDC)
+
+@pytest.mark.asyncio
+async def test_http_api(index):
+    async with TestClient(TestServer(PoolIndexServer(index).make_app())) as client:
+        response = await client.get("/pools", params={"token": "0x" + USDC.hex(), "limit": "2"})
+        body = await response.json()
+        assert body["count"] == 3
+        assert [p["block_number"] for p in body["pools"]] == [104, 102]
+
+        response = await client.get("/pools/0x" + (3).to_bytes(20, "big").hex())
+        assert (await response.json())["version"] == 2
+
+        assert (await client.get("/pools", params={"fee": "abc"})).status == 400
+        assert (await client.get("/pools/0x" + "ff" * 20)).status == 404
+
+def test_since_with_out_of_order_arrivals():
+    # Rows are added as checks finish, so a later row can carry an earlier timestamp
+    index = PoolIndex()
+    for n in (1, 5, 2, 4, 3, 6):
+        index.add(make_record(n, USDC))
+    assert sorted(r.block_number for r in index.query(since_ns=3 * 10**9)) == [103, 104, 105, 106]
+    assert sorted(r.block_number for r in index.query(token=USDC, since_ns=4 * 10**9)) == [104, 105, 106]
+    assert index.query(since_ns=7 * 10**9) == []
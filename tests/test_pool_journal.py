@@ -0,0 +1,85 @@
+import os
+import time
+from hex_flow_oracle.storage.pool_journal import PoolJournal, JournalReader, list_segments
+from hex_flow_oracle.output.binary_format import PoolRecord, FLAG_APPROVED, read_records
+
+def make_record(block, received_ns=0):
+    return PoolRecord(
+        version=2, token0=b"\x01" * 20, token1=b"\x02" * 20,
+        pool=block.to_bytes(20, "big"), block_number=block,
+        received_ns=received_ns, flags=FLAG_APPROVED
+    )
+
+def test_since_block_across_segments(tmp_path):
+    journal = PoolJournal(str(tmp_path), segment_records=10, index_interval=4)
+    for block in range(100, 135):
+        journal.append(make_record(block))
+    journal.close()
+
+    assert list_segments(str(tmp_path)) == [0, 1, 2, 3]
+    reader = JournalReader(str(tmp_path))
+    assert [r.block_number for r in reader.since_block(117)] == list(range(117, 135))
+    assert [r.block_number for r in reader.since_block(0)] == list(range(100, 135))
+    assert list(reader.since_block(1000)) == []
+    assert reader.last_block() == 134
+
+def test_since_time(tmp_path):
+    journal = PoolJournal(str(tmp_path), index_interval=2)
+    now = time.time_ns()
+    for i, age in enumerate([7200, 5400, 1800, 60, 1]):
+        journal.append(make_record(i, now - age * 10**9))
+    journal.close()
+
+    recent = list(JournalReader(str(tmp_path)).since_time(3600))
+    assert [r.block_number for r in recent] == [2, 3, 4]
+
+def test_recovery_truncates_torn_frame(tmp_path):
+    journal = PoolJournal(str(tmp_path))
+    for block in range(5):
+        journal.append(make_record(block))
+    journal.close()
+    segment = os.path.join(str(tmp_path), "00000000.seg")
+    with open(segment, "ab") as f:
+        f.write(b"\x58\x00partial")
+
+    journal = PoolJournal(str(tmp_path))
+    assert journal.last_block == 4
+    journal.append(make_record(5))
+    journal.close()
+
+    with open(segment, "rb") as f:
+        assert [r.block_number for r in read_records(f)] == list(range(6))
+
+def test_out_of_order_appends(tmp_path):
+    # Records reach the journal when their checks finish, not in block order
+    blocks = [100, 104, 101, 103, 102, 110, 105, 109, 106, 108, 107, 111]
+    journal = PoolJournal(str(tmp_path), segment_records=4, index_interval=2)
+    now = time.time_ns()
+    for block in blocks:
+        journal.append(make_record(block, now - (200 - block) * 10**9))
+    journal.close()
+
+    reader = JournalReader(str(tmp_path))
+    for bound in range(99, 113):
+        assert sorted(r.block_number for r in reader.since_block(bound)) == [b for b in sorted(blocks) if b >= bound]
+    assert sorted(r.block_number for r in reader.since_time(95.5)) == [105, 106, 107, 108, 109, 110, 111]
+    assert reader.last_block() == 111
+
+    journal = PoolJournal(str(tmp_path), segment_records=4, index_interval=2)
+    assert journal.last_block == 111
+    journal.append(make_record(99, now))
+    journal.close()
+    assert [r.block_number for r in JournalReader(str(tmp_path)).since_block(111)] == [111]
+
+def test_resume_block_survives_restart(tmp_path):
+    journal = PoolJournal(str(tmp_path))
+    assert journal.resume_block is None
+    journal.append(make_record(105))
+    journal.close()
+    # Without a checkpoint the last journaled block is the best guess
+    journal = PoolJournal(str(tmp_path))
+    assert journal.resume_block == 105
+    # Block 100 was still being handled when 105 was journaled
+    journal.checkpoint(100)
+    journal.close()
+    assert PoolJournal(str(tmp_path)).resume_block == 100
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from price_utils import (
+    batch_max_trade_size,
+    batch_price_impact,
+    calculate_optimal_amounts,
+    calculate_price_impact,
+)
+
+RESERVES = np.array([[5_000.0, 10_000_000.0], [1_000_000.0, 2_000_000.0], [0.0, 1.0]])
+AMOUNTS = np.array([1.0, 10.0, 100.0])
+
+def test_batch_matches_constant_product_with_fee():
+    impact, amount_out = batch_price_impact(RESERVES, AMOUNTS)
+    assert impact.shape == amount_out.shape == (3, 3)
+    for i, (reserve_in, reserve_out) in enumerate(RESERVES[:2]):
+        for j, amount in enumerate(AMOUNTS):
+            effective = amount * 997 / 1000
+            out = reserve_out * effective / (reserve_in + effective)
+            assert amount_out[i, j] == pytest.approx(out)
+            spot = reserve_out / reserve_in
+            assert impact[i, j] == pytest.approx((1 - out / amount / spot) * 100)
+    assert list(impact[2]) == [100.0] * 3 and not amount_out[2].any()
+
+def test_max_trade_size_hits_impact_limit():
+    sizes = batch_max_trade_size(RESERVES, 1.0)
+    for i in range(2):
+        impact, _ = batch_price_impact(RESERVES[i:i + 1], sizes[i:i + 1])
+        assert impact[0, 0] == pytest.approx(1.0)
+    assert sizes[2] == 0.0
+    # The 0.3% fee alone exceeds a 0.2% limit
+    assert not batch_max_trade_size(RESERVES, 0.2).any()
+
+def test_optimal_amounts_reach_slippage_exactly():
+    reserves = np.array([3_000.0, 1_000.0])
+    for slippage in (0.1, 1.0, 5.0):
+        amounts = calculate_optimal_amounts(3.0, reserves, slippage)
+        assert calculate_price_impact(amounts, reserves) == pytest.approx(slippage)
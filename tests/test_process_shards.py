@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from hex_flow_oracle.core.process_shards import ShardPool
+from hex_flow_oracle.events.frame_decoder import decode_frame, encode_payload, partition_key
+from hex_flow_oracle.output.binary_format import iter_frames
+from hex_flow_oracle.config import v2_pair_created_topic
+
+TOKEN0 = "c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+TOKEN1 = "a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+PAIR = "b4e16d0168e52d35cacd2c6185b44281ec28c9dc"
+
+def v2_frame(token0=TOKEN0):
+    log = {
+        "address": "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f",
+        "topics": [v2_pair_created_topic, "0x" + "0" * 24 + token0, "0x" + "0" * 24 + TOKEN1],
+        "data": "0x" + "0" * 24 + PAIR + "0" * 63 + "1",
+        "blockNumber": "0x10",
+    }
+    return json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                       "params": {"subscription": "0x1", "result": log}})
+
+def test_decode_frame_and_partition_key():
+    payload = encode_payload(v2_frame(), 123)
+    record, = iter_frames(decode_frame(payload))
+    assert record.pool.hex() == PAIR and record.token0.hex() == TOKEN0
+    assert record.received_ns == 123 and record.block_number == 16
+    assert partition_key(payload, "token") == TOKEN0.encode()
+    assert partition_key(payload, "chain") == b"1"
+    assert decode_frame(encode_payload('{"jsonrpc": "2.0", "id": 1, "result": "0xabc"}', 0)) == b""
+
+@pytest.mark.asyncio
+async def test_shard_pool_decodes_in_workers():
+    pool = await ShardPool("hex_flow_oracle.events.frame_decoder:decode_frame",
+                           workers=2, slots=4, slot_size=4096).start()
+    try:
+        tokens = [f"{i:040x}" for i in range(20)]
+        payloads = [encode_payload(v2_frame(token), i) for i, token in enumerate(tokens)]
+        futures = [await pool.submit(payload, partition_key(payload, "token")) for payload in payloads]
+        for i, future in enumerate(futures):
+            record, = iter_frames(await future)
+            assert record.token0.hex() == tokens[i] and record.received_ns == i
+        assert pool.submitted == 20 and pool.local_fallbacks == 0
+
+        # Oversized payloads are decoded in-process; stage errors surface on the future
+        big = encode_payload(v2_frame()[:-1] + ', "padding": "' + "x" * 5000 + '"}', 7)
+        record, = iter_frames(await pool.run(big))
+        assert record.received_ns == 7 and pool.local_fallbacks == 1
+        with pytest.raises(RuntimeError):
+            await pool.run(encode_payload("not json", 0))
+    finally:
+        await pool.close()
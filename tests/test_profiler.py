@@ -0,0 +1,28 @@
+import asyncio
+import time
+import pytest
+from hex_flow_oracle.monitoring.profiler import LoopProfiler
+
+def busy_format(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+@pytest.mark.asyncio
+async def test_profile_reports_lag_and_slow_callbacks(tmp_path):
+    profiler = LoopProfiler(str(tmp_path), interval=0.001, slow_callback_duration=0.02)
+    profiler.start()
+    await asyncio.sleep(0.05)
+    asyncio.get_running_loop().call_soon(busy_format, 0.1)
+    await asyncio.sleep(0.05)
+    collapsed_path, summary_path = await profiler.stop()
+
+    assert profiler.lag.max >= 0.05
+    assert any("busy_format" in callback for _, callback in profiler.slow_callbacks.callbacks)
+    with open(collapsed_path) as f:
+        stacks = f.read().splitlines()
+    assert any("busy_format (test_profiler.py" in line for line in stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+    with open(summary_path) as f:
+        summary = f.read()
+    assert "Event-loop lag" in summary and "Slow callbacks" in summary
@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from hex_flow_oracle.core.di_container import DIContainer
+from hex_flow_oracle.core.startup import StartupOrchestrator
+from hex_flow_oracle.core.state_machine import ContractState
+from hex_flow_oracle.security.factory_validation import ValidationCache, validate_factories
+
+V2_FACTORY = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
+V3_FACTORY = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+
+class StubRpc:
+    def __init__(self, code="0x6080"):
+        self.code = code
+        self.calls = []
+
+    async def call(self, method, params):
+        self.calls.append(method)
+        if method == "eth_getCode":
+            return self.code
+        if params[0]["data"].startswith("0x22afcccb"):
+            return "0x" + f"{10:064x}"
+        return "0x" + "0" * 63 + "1"
+
+@pytest.mark.asyncio
+async def test_steps_run_concurrently_after_dependencies():
+    order = []
+
+    def step(name, delay):
+        async def run():
+            await asyncio.sleep(delay)
+            order.append(name)
+            return name
+        return run
+
+    startup = StartupOrchestrator()
+    startup.add_step("services", step("services", 0.05))
+    startup.add_step("subscribe", step("subscribe", 0.01), depends_on=["services"])
+    startup.add_step("validate", step("validate", 0.1))
+    startup.add_step("warm", step("warm", 0.1))
+    started = time.perf_counter()
+    results = await startup.run()
+    assert time.perf_counter() - started < 0.2
+    assert order.index("services") < order.index("subscribe")
+    assert results["validate"] == "validate"
+    assert startup.state is ContractState.ACTIVE
+
+@pytest.mark.asyncio
+async def test_required_failure_cancels_other_steps():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def broken():
+        raise ValueError("invalid factory")
+
+    async def optional():
+        raise RuntimeError("ignored")
+
+    startup = StartupOrchestrator()
+    startup.add_step("subscribe", slow)
+    startup.add_step("validate", broken)
+    startup.add_step("warm", optional, required=False)
+    with pytest.raises(ValueError):
+        await startup.run()
+    assert cancelled.is_set()
+    assert startup.state is ContractState.ERROR
+
+@pytest.mark.asyncio
+async def test_concurrent_resolves_share_one_singleton():
+    created = []
+
+    async def factory():
+        await asyncio.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    container = DIContainer()
+    container.register(object, factory)
+    first, second = await container.resolve_all(object, object)
+    assert first is second and len(created) == 1
+    assert container.get(object) is first
+
+@pytest.mark.asyncio
+async def test_validation_is_cached_by_code_hash(tmp_path):
+    path = str(tmp_path / "validation.json")
+    factories = {"uniswap_v2": ("v2", V2_FACTORY), "uniswap_v3": ("v3", V3_FACTORY)}
+    rpc = StubRpc()
+    assert await validate_factories(rpc, 1, factories, ValidationCache(path)) == {"uniswap_v2": True, "uniswap_v3": True}
+    assert rpc.calls.count("eth_call") == 4
+
+    # A restart re-reads the code only
+    rpc = StubRpc()
+    await validate_factories(rpc, 1, factories, ValidationCache(path))
+    assert rpc.calls == ["eth_getCode", "eth_getCode"]
+
+    # Changed code is validated again
+    rpc = StubRpc(code="0x6081")
+    await validate_factories(rpc, 1, factories, ValidationCache(path))
+    assert rpc.calls.count("eth_call") == 4
+
+    with pytest.raises(ValueError):
+        await validate_factories(StubRpc(code="0x"), 1, factories, ValidationCache(path))
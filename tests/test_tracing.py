@@ -0,0 +1,75 @@
+import json
+import pytest
+from hex_flow_oracle.events import event_handlers
+from hex_flow_oracle.monitoring.tracing import TraceRecorder, traced, current_span
+from hex_flow_oracle.security import security_cache, token_security
+
+V2_LOG = {
+    "address": "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f",
+    "topics": [
+        "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9",
+        "0x000000000000000000000000a0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",
+        "0x000000000000000000000000c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+    ],
+    "data": "0x000000000000000000000000b4e16d0168e52d35cacd2c6185b44281ec28c9dc"
+            "0000000000000000000000000000000000000000000000000000000000000001",
+    "blockNumber": "0xa2d3ac",
+    "blockTimestamp": "0x5f0b1b8e"
+}
+
+@pytest.mark.asyncio
+async def test_handler_trace_records_lookups_and_emit(monkeypatch, capsys):
+    async def fake_check(token):
+        current_span.get()["executor_start"] = current_span.get()["start"] + 2_000_000
+        return True
+    monkeypatch.setattr(security_cache, "check_token_security", fake_check)
+    monkeypatch.setattr(event_handlers, "security_cache", security_cache.SecurityCache())
+
+    recorder = TraceRecorder(sample_rate=1.0)
+    trace = recorder.start()
+    trace.attach_log(V2_LOG)
+    await event_handlers.handle_v2_event(V2_LOG)
+    recorder.finish(trace)
+
+    (kept,) = recorder.traces
+    summary = kept.to_dict()
+    assert summary["block_number"] == 0xa2d3ac
+    assert summary["block_timestamp"] == 0x5f0b1b8e
+    assert [span["name"] for span in summary["spans"]] == ["security_token0", "security_token1"]
+    assert summary["spans"][1]["executor_wait_ms"] == 2.0
+    assert "emitted" in summary["marks"]
+
+@pytest.mark.asyncio
+async def test_records_keep_the_provider_receive_time(monkeypatch, capsys):
+    async def fake_check(token):
+        return True
+    monkeypatch.setattr(security_cache, "check_token_security", fake_check)
+    monkeypatch.setattr(event_handlers, "security_cache", security_cache.SecurityCache())
+    published = []
+    monkeypatch.setattr(event_handlers, "pool_sinks", [published.append])
+
+    await event_handlers.handle_v2_event(V2_LOG, received_ns=1_234)
+    assert published[0].received_ns == 1_234
+
+def test_sampling_keeps_slow_traces(tmp_path):
+    recorder = TraceRecorder(sample_rate=0.0, slow_threshold_ms=100.0, stream_path=str(tmp_path / "stream.jsonl"))
+    fast = recorder.start()
+    recorder.finish(fast)
+    slow = recorder.start(received_ns=fast.received_ns - 200_000_000)
+    recorder.finish(slow)
+    recorder.close()
+
+    assert list(recorder.traces) == [slow]
+    assert recorder.dump(str(tmp_path / "dump.jsonl")) == 1
+    with open(tmp_path / "stream.jsonl") as f:
+        assert json.loads(f.readline())["total_ms"] >= 200
+
+def test_executor_start_is_recorded(monkeypatch):
+    monkeypatch.setattr(token_security.get_token_checker(), "token_security", lambda **kwargs: {})
+    span = {"name": "security_token0", "start": 0}
+    token_security._query_token_security("0x00", span)
+    assert span["executor_start"] > 0
+
+def test_traced_is_noop_without_trace():
+    with traced("security_token0") as span:
+        assert span is None
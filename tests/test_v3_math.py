@@ -0,0 +1,68 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from v3_math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    Q96,
+    PoolState,
+    batch_swap,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    nearest_usable_tick,
+    simulate_swap,
+    tick_spacing,
+)
+
+LIQUIDITY = 10**18
+POOL = PoolState(
+    sqrt_price_x96=get_sqrt_ratio_at_tick(5),
+    tick=5,
+    liquidity=2 * LIQUIDITY,
+    fee=3000,
+    ticks=[(-600, LIQUIDITY), (-120, LIQUIDITY), (120, -LIQUIDITY), (600, -LIQUIDITY)]
+)
+
+def test_tick_math_bounds_and_round_trip():
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(0) == Q96
+    rng = random.Random(0)
+    for tick in [MIN_TICK, MAX_TICK - 1] + [rng.randint(MIN_TICK, MAX_TICK - 1) for _ in range(500)]:
+        sqrt_price = get_sqrt_ratio_at_tick(tick)
+        assert get_tick_at_sqrt_ratio(sqrt_price) == tick
+        assert get_tick_at_sqrt_ratio(sqrt_price + 1) == tick
+    assert tick_spacing(3000) == 60 and tick_spacing(100) == 1
+    assert nearest_usable_tick(MIN_TICK, 60) == -887220
+
+def test_swap_step_matches_core_contract_vector():
+    # SwapMath.spec: exact amount in that gets capped at price target in one for zero
+    target = math.isqrt(101 * 2**192 // 100)
+    assert compute_swap_step(Q96, target, 2 * 10**18, 10**18, 600) == (
+        target, 9975124224178055, 9925619580021728, 5988667735148
+    )
+
+def test_swap_crosses_initialized_ticks():
+    small = simulate_swap(POOL, 10**15, True)
+    assert small.liquidity == 2 * LIQUIDITY and small.amount_in == 10**15
+    crossing = simulate_swap(POOL, 2 * 10**16, True)
+    assert crossing.tick < -120 and crossing.liquidity == LIQUIDITY
+    exact_out = simulate_swap(POOL, -crossing.amount_out, True)
+    assert exact_out.amount_out == crossing.amount_out
+    assert abs(exact_out.amount_in - 2 * 10**16) <= 1
+
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_float_batch_matches_exact_path(zero_for_one):
+    amounts = [10**15, 10**16, 10**17]
+    amount_out, impact = batch_swap([POOL, POOL], np.array(amounts, dtype=float), zero_for_one)
+    assert amount_out.shape == impact.shape == (2, 3)
+    for j, amount in enumerate(amounts):
+        exact = simulate_swap(POOL, amount, zero_for_one).amount_out
+        assert amount_out[0, j] == pytest.approx(exact, rel=1e-9)
+    assert 0.3 < impact[0, 0] < impact[0, 1] < impact[0, 2] <= 100
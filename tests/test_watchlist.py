@@ -0,0 +1,196 @@
+import asyncio
+import json
+
+import pytest
+
+from hex_flow_oracle.core.address import to_address
+from hex_flow_oracle.events.watchlist import (
+    PoolWatchlist,
+    V2_MINT_TOPIC,
+    V2_SYNC_TOPIC,
+    V3_BURN_TOPIC,
+    V3_MINT_TOPIC,
+)
+
+def pool(i):
+    return to_address(f"0x{i:040x}")
+
+def words(*values):
+    return "0x" + "".join(f"{value:064x}" for value in values)
+
+def test_shards_fill_in_order_and_reject_when_full():
+    watchlist = PoolWatchlist(shard_capacity=2, max_shards=2)
+    assert all(watchlist.add(pool(i), 2, now=0) for i in range(4))
+    assert not watchlist.add(pool(4), 2, now=0)
+    assert [len(shard.addresses) for shard in watchlist.shards] == [2, 2]
+    assert watchlist.rejected == 1
+
+def test_window_expiry_and_refresh():
+    watchlist = PoolWatchlist(window=10)
+    watchlist.add(pool(1), 2, now=0)
+    watchlist.add(pool(2), 2, now=5)
+    version = watchlist.shards[0].version
+    watchlist.add(pool(1), 2, now=8)  # Still active: pushes the deadline, filter unchanged
+    assert watchlist.shards[0].version == version
+    assert watchlist.expire(now=12) == []
+    assert watchlist.expire(now=16) == [pool(2)]
+    assert watchlist.expire(now=18) == [pool(1)]
+    assert len(watchlist) == 0 and watchlist.shards[0].log_filter()["address"] == []
+
+def test_activity_flags_first_liquidity_and_rugs():
+    seen = []
+    watchlist = PoolWatchlist(on_activity=lambda activity, kind: seen.append(kind))
+    watchlist.add(pool(1), 2, now=0)
+    watchlist.add(pool(2), 3, now=0)
+
+    address = str(pool(1))
+    watchlist.record_log({"address": address, "topics": [V2_MINT_TOPIC], "data": words(10, 10), "blockNumber": "0x10"})
+    watchlist.record_log({"address": address, "topics": [V2_SYNC_TOPIC], "data": words(1000, 5000)})
+    watchlist.record_log({"address": address, "topics": [V2_SYNC_TOPIC], "data": words(50, 250)})
+    v2 = watchlist.activity[pool(1)]
+    assert v2.first_liquidity_block == 16 and v2.rug_suspected
+    assert seen == ["mint", "sync", "sync", "rug"]
+
+    address = str(pool(2))
+    watchlist.record_log({"address": address, "topics": [V3_MINT_TOPIC], "data": words(0, 1000, 1, 1)})
+    watchlist.record_log({"address": address, "topics": [V3_BURN_TOPIC], "data": words(500, 1, 1)})
+    assert not watchlist.activity[pool(2)].rug_suspected
+    watchlist.record_log({"address": address, "topics": [V3_BURN_TOPIC], "data": words(450, 1, 1)})
+    assert watchlist.activity[pool(2)].rug_suspected
+    assert watchlist.record_log({"address": str(pool(3)), "topics": [V2_SYNC_TOPIC], "data": words(1, 1)}) is None
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send(self, message):
+        message = json.loads(message)
+        self.sent.append(message)
+        if message["method"] == "eth_subscribe":
+            self.incoming.put_nowait(json.dumps({"id": message["id"], "result": f"0xsub{message['id']}"}))
+
+    async def recv(self):
+        return await self.incoming.get()
+
+@pytest.mark.asyncio
+async def test_filter_updates_are_batched_per_interval():
+    watchlist = PoolWatchlist()
+    for i in range(3):
+        watchlist.add(pool(i), 2)
+    ws = FakeSocket()
+    follow = asyncio.create_task(watchlist._follow(ws, watchlist.shards[0], update_interval=0.1))
+    await asyncio.sleep(0.02)
+    for i in range(3, 6):
+        watchlist.add(pool(i), 2)
+    await asyncio.sleep(0.2)
+    follow.cancel()
+    await asyncio.gather(follow, return_exceptions=True)
+
+    methods = [message["method"] for message in ws.sent]
+    assert methods == ["eth_subscribe", "eth_subscribe", "eth_unsubscribe"]
+    assert len(ws.sent[1]["params"][1]["address"]) == 6
+    assert ws.sent[2]["params"] == ["0xsub1"]
+
+class HeldSocket(FakeSocket):
+    """Holds subscribe replies until the test releases them"""
+    def __init__(self):
+        super().__init__()
+        self.held = []
+
+    async def send(self, message):
+        message = json.loads(message)
+        self.sent.append(message)
+        if message["method"] == "eth_subscribe":
+            self.held.append(json.dumps({"id": message["id"], "result": f"0xsub{message['id']}"}))
+
+    def release(self):
+        for reply in self.held:
+            self.incoming.put_nowait(reply)
+        self.held.clear()
+
+    def notify(self, subscription, pool_address, tx_hash):
+        self.incoming.put_nowait(json.dumps({"params": {"subscription": subscription, "result": {
+            "address": str(pool_address), "topics": [V2_SYNC_TOPIC], "data": words(10, 10),
+            "transactionHash": tx_hash, "logIndex": "0x0"}}}))
+
+@pytest.mark.asyncio
+async def test_filter_swap_keeps_logs_from_the_old_subscription():
+    seen = []
+    watchlist = PoolWatchlist(on_activity=lambda activity, kind: seen.append(activity.pool))
+    watchlist.add(pool(1), 2)
+    ws = HeldSocket()
+    follow = asyncio.create_task(watchlist._follow(ws, watchlist.shards[0], update_interval=0.05))
+    await asyncio.sleep(0.01)
+    ws.release()
+    await asyncio.sleep(0.01)
+
+    watchlist.add(pool(2), 2)
+    await asyncio.sleep(0.08)
+    assert [m["method"] for m in ws.sent] == ["eth_subscribe", "eth_subscribe"]
+    # Replacement not confirmed yet: the old subscription still delivers
+    ws.notify("0xsub1", pool(1), "0x01")
+    await asyncio.sleep(0.01)
+    assert seen == [pool(1)]
+
+    ws.release()
+    ws.notify("0xsub1", pool(1), "0x02")
+    ws.notify("0xsub2", pool(1), "0x02")  # Same log through both filters
+    ws.notify("0xsub2", pool(2), "0x03")
+    await asyncio.sleep(0.01)
+    follow.cancel()
+    await asyncio.gather(follow, return_exceptions=True)
+
+    assert [m["method"] for m in ws.sent] == ["eth_subscribe", "eth_subscribe", "eth_unsubscribe"]
+    assert seen == [pool(1), pool(1), pool(2)]
+
+class BackfillSocket(FakeSocket):
+    """Answers eth_getLogs with ``logs`` once the test releases it"""
+    def __init__(self, logs):
+        super().__init__()
+        self.logs = logs
+        self.held = []
+
+    async def send(self, message):
+        await super().send(message)
+        message = self.sent[-1]
+        if message["method"] == "eth_getLogs":
+            self.held.append(json.dumps({"id": message["id"], "result": self.logs}))
+
+    def release(self):
+        for reply in self.held:
+            self.incoming.put_nowait(reply)
+        self.held.clear()
+
+@pytest.mark.asyncio
+async def test_new_pools_are_backfilled_from_their_creation_block():
+    seen = []
+    watchlist = PoolWatchlist(on_activity=lambda activity, kind: seen.append(kind))
+    address = str(pool(1))
+    mint = {"address": address, "topics": [V2_MINT_TOPIC], "data": words(10, 10),
+            "blockNumber": "0x10", "transactionHash": "0x01", "logIndex": "0x0"}
+    sync = {"address": address, "topics": [V2_SYNC_TOPIC], "data": words(1000, 5000),
+            "blockNumber": "0x10", "transactionHash": "0x01", "logIndex": "0x1"}
+    later = {"address": address, "topics": [V2_SYNC_TOPIC], "data": words(900, 4500),
+             "blockNumber": "0x11", "transactionHash": "0x02", "logIndex": "0x0"}
+    # Launched through the router: created and minted in one transaction
+    watchlist.add(pool(1), 2, from_block=0x10)
+    ws = BackfillSocket([sync, later, mint])
+    follow = asyncio.create_task(watchlist._follow(ws, watchlist.shards[0], update_interval=0.05))
+    await asyncio.sleep(0.01)
+    assert [m["method"] for m in ws.sent] == ["eth_subscribe", "eth_getLogs"]
+    assert ws.sent[1]["params"][0]["fromBlock"] == "0x10"
+
+    # A live log waits for the backfill, which also delivers it
+    ws.incoming.put_nowait(json.dumps({"params": {"subscription": "0xsub1", "result": later}}))
+    await asyncio.sleep(0.01)
+    assert seen == []
+    ws.release()
+    await asyncio.sleep(0.01)
+    follow.cancel()
+    await asyncio.gather(follow, return_exceptions=True)
+
+    activity = watchlist.activity[pool(1)]
+    assert seen == ["mint", "sync", "sync"]
+    assert activity.first_liquidity_block == 0x10 and activity.peak_reserve0 == 1000
+    assert activity.reserve0 == 900 and watchlist.shards[0].backfill == {}
@@ -0,0 +1,418 @@
+"""
+Uniswap V3 concentrated-liquidity math.
+
+Two paths over the same model:
+
+* An exact path on Python integers that reproduces the core contracts'
+  TickMath, SqrtPriceMath and SwapMath bit for bit, for when the exact
+  amounts matter (``simulate_swap``).
+* A float path JIT-compiled with Numba that simulates M trade sizes against
+  N pools in one pass for scoring (``batch_swap``), accurate to float
+  precision.
+
+Prices are sqrt(token1 / token0) in Q64.96 (``sqrt_price_x96``), amounts are
+raw token units, and fees are in hundredths of a basis point (3000 = 0.3%).
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from math import log
+from typing import List, NamedTuple, Sequence, Tuple
+
+from numba import jit
+import numpy as np
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 1 << 96
+MAX_UINT256 = (1 << 256) - 1
+FEE_DENOMINATOR = 1_000_000
+
+# Fee tier -> tick spacing, as returned by the factory's feeAmountTickSpacing(fee)
+TICK_SPACINGS = {
+    100: 1,
+    500: 10,
+    3000: 60,
+    10000: 200,
+}
+
+def tick_spacing(fee: int) -> int:
+    try:
+        return TICK_SPACINGS[fee]
+    except KeyError:
+        raise ValueError(f"Unknown V3 fee tier {fee}") from None
+
+def nearest_usable_tick(tick: int, spacing: int) -> int:
+    """Closest tick to ``tick`` that can be initialized with ``spacing``"""
+    rounded = round(tick / spacing) * spacing
+    if rounded < MIN_TICK:
+        return rounded + spacing
+    if rounded > MAX_TICK:
+        return rounded - spacing
+    return rounded
+
+# Exact integer path (TickMath, FullMath, SqrtPriceMath, SwapMath)
+
+# ratio multipliers for bits 1..19 of |tick|, from TickMath.getSqrtRatioAtTick
+_TICK_FACTORS = (
+    0xfff97272373d413259a46990580e213a,
+    0xfff2e50f5f656932ef12357cf3c7fdcc,
+    0xffe5caca7e10e4e61c3624eaa0941cd0,
+    0xffcb9843d60f6159c9db58835c926644,
+    0xff973b41fa98c081472e6896dfb254c0,
+    0xff2ea16466c96a3843ec78b326b52861,
+    0xfe5dee046a99a2a811c461f1969c3053,
+    0xfcbe86c7900a88aedcffc83b479aa3a4,
+    0xf987a7253ac413176f2b074cf7815e54,
+    0xf3392b0822b70005940c7a398e4b70f3,
+    0xe7159475a2c29b7443b29c7fa6e889d9,
+    0xd097f3bdfd2022b8845ad8f792aa5825,
+    0xa9f746462d870fdf8a65dc1f90e061e5,
+    0x70d869a156d2a1b890bb3df62baf32f7,
+    0x31be135f97d08fd981231505542fcfa6,
+    0x9aa508b5b7a84e1c677de54f3e99bc9,
+    0x5d6af8dedb81196699c329225ee604,
+    0x2216e584f5fa1ea926041bedfe98,
+    0x48a170391f7dc42444e8fa2,
+)
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"Tick {tick} out of range")
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 1 else 1 << 128
+    for bit, factor in enumerate(_TICK_FACTORS, start=1):
+        if abs_tick & (1 << bit):
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+    # Q128.128 -> Q64.96, rounding up
+    return (ratio >> 32) + (1 if ratio & 0xffffffff else 0)
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Greatest tick whose sqrt ratio is at most ``sqrt_price_x96``"""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrt price {sqrt_price_x96} out of range")
+    ratio = sqrt_price_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+    # log2(ratio) in Q64.64, refined to 14 fractional bits by repeated squaring
+    log_2 = (msb - 128) << 64
+    for bit in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << bit
+        r >>= f
+    log_sqrt10001 = log_2 * 255738958999603826347141
+    tick_low = (log_sqrt10001 - 3402992956809132418596140100660247210) >> 128
+    tick_high = (log_sqrt10001 + 291339464771989622907027621153398088495) >> 128
+    if tick_low == tick_high or get_sqrt_ratio_at_tick(tick_high) > sqrt_price_x96:
+        return tick_low
+    return tick_high
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    return -(-a * b // denominator)
+
+def div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+def _next_sqrt_price_from_amount0(sqrt_price_x96, liquidity, amount, add):
+    if amount == 0:
+        return sqrt_price_x96
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price_x96
+    if add:
+        denominator = numerator1 + product
+        # The contract falls back to a less precise form when these overflow 256 bits
+        if product <= MAX_UINT256 and denominator <= MAX_UINT256:
+            return mul_div_rounding_up(numerator1, sqrt_price_x96, denominator)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("Insufficient liquidity for output amount")
+    return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+
+def _next_sqrt_price_from_amount1(sqrt_price_x96, liquidity, amount, add):
+    if add:
+        return sqrt_price_x96 + (amount << 96) // liquidity
+    quotient = div_rounding_up(amount << 96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("Insufficient liquidity for output amount")
+    return sqrt_price_x96 - quotient
+
+def get_next_sqrt_price_from_input(sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount0(sqrt_price_x96, liquidity, amount_in, True)
+    return _next_sqrt_price_from_amount1(sqrt_price_x96, liquidity, amount_in, True)
+
+def get_next_sqrt_price_from_output(sqrt_price_x96: int, liquidity: int, amount_out: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount1(sqrt_price_x96, liquidity, amount_out, False)
+    return _next_sqrt_price_from_amount0(sqrt_price_x96, liquidity, amount_out, False)
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+def compute_swap_step(
+    sqrt_price_x96: int,
+    sqrt_target_x96: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee: int
+) -> Tuple[int, int, int, int]:
+    """
+    One swap step within a single liquidity range, as SwapMath.computeSwapStep.
+
+    ``amount_remaining`` is positive for exact input, negative for exact output.
+    Returns (sqrt_price_next_x96, amount_in, amount_out, fee_amount).
+    """
+    zero_for_one = sqrt_price_x96 >= sqrt_target_x96
+    exact_in = amount_remaining >= 0
+    amount_in = amount_out = 0
+
+    if exact_in:
+        remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR - fee, FEE_DENOMINATOR)
+        if zero_for_one:
+            amount_in = get_amount0_delta(sqrt_target_x96, sqrt_price_x96, liquidity, True)
+        else:
+            amount_in = get_amount1_delta(sqrt_price_x96, sqrt_target_x96, liquidity, True)
+        if remaining_less_fee >= amount_in:
+            sqrt_next = sqrt_target_x96
+        else:
+            sqrt_next = get_next_sqrt_price_from_input(sqrt_price_x96, liquidity, remaining_less_fee, zero_for_one)
+    else:
+        if zero_for_one:
+            amount_out = get_amount1_delta(sqrt_target_x96, sqrt_price_x96, liquidity, False)
+        else:
+            amount_out = get_amount0_delta(sqrt_price_x96, sqrt_target_x96, liquidity, False)
+        if -amount_remaining >= amount_out:
+            sqrt_next = sqrt_target_x96
+        else:
+            sqrt_next = get_next_sqrt_price_from_output(sqrt_price_x96, liquidity, -amount_remaining, zero_for_one)
+
+    reached_target = sqrt_next == sqrt_target_x96
+    if zero_for_one:
+        if not (reached_target and exact_in):
+            amount_in = get_amount0_delta(sqrt_next, sqrt_price_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount1_delta(sqrt_next, sqrt_price_x96, liquidity, False)
+    else:
+        if not (reached_target and exact_in):
+            amount_in = get_amount1_delta(sqrt_price_x96, sqrt_next, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount0_delta(sqrt_price_x96, sqrt_next, liquidity, False)
+
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+    if exact_in and not reached_target:
+        # Took the remainder of the input; whatever is left over is the fee
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee, FEE_DENOMINATOR - fee)
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+@dataclass
+class PoolState:
+    """Swap-relevant state of a V3 pool (slot0, liquidity and initialized ticks)"""
+    sqrt_price_x96: int
+    tick: int
+    liquidity: int
+    fee: int
+    # (tick, liquidityNet) of every initialized tick, sorted by tick
+    ticks: List[Tuple[int, int]] = field(default_factory=list)
+
+class SwapResult(NamedTuple):
+    amount_in: int  # Input consumed, fees included
+    amount_out: int
+    sqrt_price_x96: int
+    tick: int
+    liquidity: int
+
+def simulate_swap(pool: PoolState, amount_specified: int, zero_for_one: bool, sqrt_price_limit_x96: int = None) -> SwapResult:
+    """
+    Exact swap across initialized ticks, as UniswapV3Pool.swap.
+
+    ``amount_specified`` is positive for exact input and negative for exact
+    output. Stops at ``sqrt_price_limit_x96`` (default: the price bound) or
+    when the pool runs out of liquidity.
+    """
+    if sqrt_price_limit_x96 is None:
+        sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+    tick_indexes = [tick for tick, _ in pool.ticks]
+    exact_in = amount_specified > 0
+    remaining = amount_specified
+    calculated = 0
+    sqrt_price, tick, liquidity = pool.sqrt_price_x96, pool.tick, pool.liquidity
+
+    while remaining != 0 and sqrt_price != sqrt_price_limit_x96:
+        if zero_for_one:
+            position = bisect_right(tick_indexes, tick) - 1
+            initialized = position >= 0
+            next_tick = tick_indexes[position] if initialized else MIN_TICK
+        else:
+            position = bisect_right(tick_indexes, tick)
+            initialized = position < len(tick_indexes)
+            next_tick = tick_indexes[position] if initialized else MAX_TICK
+        sqrt_next_tick = get_sqrt_ratio_at_tick(next_tick)
+        if (sqrt_next_tick < sqrt_price_limit_x96) if zero_for_one else (sqrt_next_tick > sqrt_price_limit_x96):
+            target = sqrt_price_limit_x96
+        else:
+            target = sqrt_next_tick
+
+        step_start = sqrt_price
+        sqrt_price, amount_in, amount_out, fee_amount = compute_swap_step(
+            sqrt_price, target, liquidity, remaining, pool.fee
+        )
+        if exact_in:
+            remaining -= amount_in + fee_amount
+            calculated += amount_out
+        else:
+            remaining += amount_out
+            calculated += amount_in + fee_amount
+
+        if sqrt_price == sqrt_next_tick:
+            if initialized:
+                liquidity_net = pool.ticks[position][1]
+                liquidity += -liquidity_net if zero_for_one else liquidity_net
+            tick = next_tick - 1 if zero_for_one else next_tick
+        elif sqrt_price != step_start:
+            tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+    if exact_in:
+        return SwapResult(amount_specified - remaining, calculated, sqrt_price, tick, liquidity)
+    return SwapResult(calculated, -amount_specified + remaining, sqrt_price, tick, liquidity)
+
+# Float path
+
+_HALF_LOG_TICK_BASE = log(1.0001) / 2
+
+class PackedPools(NamedTuple):
+    """Pools as flat arrays for ``batch_swap``; pool i's ticks are
+    ``tick_values[tick_offsets[i]:tick_offsets[i + 1]]``"""
+    sqrt_prices: np.ndarray
+    liquidity: np.ndarray
+    ticks: np.ndarray
+    fees: np.ndarray
+    tick_offsets: np.ndarray
+    tick_values: np.ndarray
+    liquidity_net: np.ndarray
+
+def pack_pools(pools: Sequence[PoolState]) -> PackedPools:
+    offsets = np.zeros(len(pools) + 1, dtype=np.int64)
+    for i, pool in enumerate(pools):
+        offsets[i + 1] = offsets[i] + len(pool.ticks)
+    return PackedPools(
+        sqrt_prices=np.array([pool.sqrt_price_x96 / Q96 for pool in pools], dtype=np.float64),
+        liquidity=np.array([float(pool.liquidity) for pool in pools], dtype=np.float64),
+        ticks=np.array([pool.tick for pool in pools], dtype=np.int64),
+        fees=np.array([pool.fee for pool in pools], dtype=np.float64),
+        tick_offsets=offsets,
+        tick_values=np.array([tick for pool in pools for tick, _ in pool.ticks], dtype=np.int64),
+        liquidity_net=np.array([float(net) for pool in pools for _, net in pool.ticks], dtype=np.float64),
+    )
+
+@jit(nopython=True)
+def _batch_swap_kernel(sqrt_prices, liquidity, ticks, fees, tick_offsets, tick_values, liquidity_net,
+                       amounts_in, zero_for_one, min_sqrt, max_sqrt, half_log_base):
+    n = sqrt_prices.shape[0]
+    m = amounts_in.shape[0]
+    amount_out = np.zeros((n, m))
+    impact = np.empty((n, m))
+    for i in range(n):
+        start = tick_offsets[i]
+        end = tick_offsets[i + 1]
+        gamma = 1.0 - fees[i] / 1e6
+        # First initialized tick crossed in the swap direction
+        first = start
+        while first < end and tick_values[first] <= ticks[i]:
+            first += 1
+        if zero_for_one:
+            first -= 1
+        spot = sqrt_prices[i] * sqrt_prices[i]
+        if not zero_for_one and spot > 0:
+            spot = 1.0 / spot
+
+        for j in range(m):
+            sqrt_price = sqrt_prices[i]
+            active = liquidity[i]
+            remaining = amounts_in[j]
+            out = 0.0
+            k = first
+            while remaining > 0:
+                if zero_for_one:
+                    crossing = k >= start
+                    target = np.exp(tick_values[k] * half_log_base) if crossing else min_sqrt
+                else:
+                    crossing = k < end
+                    target = np.exp(tick_values[k] * half_log_base) if crossing else max_sqrt
+                if active > 0:
+                    net_in = remaining * gamma
+                    if zero_for_one:
+                        max_in = active * (1.0 / target - 1.0 / sqrt_price)
+                    else:
+                        max_in = active * (target - sqrt_price)
+                    if net_in < max_in:
+                        if zero_for_one:
+                            next_price = active * sqrt_price / (active + net_in * sqrt_price)
+                            out += active * (sqrt_price - next_price)
+                        else:
+                            next_price = sqrt_price + net_in / active
+                            out += active * (1.0 / sqrt_price - 1.0 / next_price)
+                        remaining = 0.0
+                        break
+                    remaining -= max_in / gamma
+                    if zero_for_one:
+                        out += active * (sqrt_price - target)
+                    else:
+                        out += active * (1.0 / sqrt_price - 1.0 / target)
+                sqrt_price = target
+                if not crossing:
+                    break
+                if zero_for_one:
+                    active -= liquidity_net[k]
+                    k -= 1
+                else:
+                    active += liquidity_net[k]
+                    k += 1
+            amount_out[i, j] = out
+            if amounts_in[j] > 0 and spot > 0:
+                impact[i, j] = (1.0 - out / amounts_in[j] / spot) * 100
+            else:
+                impact[i, j] = (1.0 - gamma) * 100
+    return amount_out, impact
+
+def batch_swap(pools, amounts_in: np.ndarray, zero_for_one: bool = True):
+    """
+    Float simulation of M exact-input swaps against N pools.
+
+    Args:
+        pools: sequence of PoolState, or the PackedPools from ``pack_pools``
+        amounts_in: (M,) array of input amounts (token0 if ``zero_for_one``)
+    Returns:
+        (amount_out, impact): two (N, M) arrays; impact is the percentage the
+        execution price falls short of the spot price, fee included. Input
+        beyond the pool's liquidity is consumed for no output.
+    """
+    packed = pools if isinstance(pools, PackedPools) else pack_pools(pools)
+    return _batch_swap_kernel(
+        packed.sqrt_prices, packed.liquidity, packed.ticks, packed.fees,
+        packed.tick_offsets, packed.tick_values, packed.liquidity_net,
+        np.asarray(amounts_in, dtype=np.float64), zero_for_one,
+        MIN_SQRT_RATIO / Q96, MAX_SQRT_RATIO / Q96, _HALF_LOG_TICK_BASE
+    )